@@ -1,8 +1,100 @@
 # gunicorn_config.py
 import multiprocessing
+import os
+import subprocess
+import sys
+import threading
 
-bind = "127.0.0.1:9000"  # Or your desired IP and port
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "gthread"
-threads = 2
-timeout = 60
+# Imported under another name: gunicorn reads every module-level name as a
+# setting, and `config` is one of them
+from decouple import config as env
+
+# SERVER_PROFILE selects how requests are served:
+#   wsgi - threaded workers running league_manager.wsgi; every open request
+#          (including slow clients) holds one of the worker's threads
+#   asgi - uvicorn workers running league_manager.asgi; async views and live
+#          event streams wait on the event loop, so idle and slow connections
+#          cost no thread
+SERVER_PROFILE = env('SERVER_PROFILE', default='wsgi')
+
+bind = env('GUNICORN_BIND', default="127.0.0.1:9000")  # Or your desired IP and port
+workers = env('GUNICORN_WORKERS', default=multiprocessing.cpu_count() * 2 + 1, cast=int)
+timeout = env('GUNICORN_TIMEOUT', default=60, cast=int)
+
+if SERVER_PROFILE == 'asgi':
+    wsgi_app = 'league_manager.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'league_manager.wsgi:application'
+    worker_class = "gthread"
+    threads = env('GUNICORN_THREADS', default=2, cast=int)
+
+# Cache warm-up on start (GUNICORN_WARM). With GUNICORN_PRELOAD the
+# application is imported once in the master, which warms the caches before
+# forking; workers then start with the same warm local-memory cache and
+# imported modules, shared copy-on-write. Without preloading each worker
+# warms its own caches before taking requests.
+preload_app = env('GUNICORN_PRELOAD', default=False, cast=bool)
+WARM_ON_START = env('GUNICORN_WARM', default=False, cast=bool)
+
+# GUNICORN_JOB_WORKER runs `manage.py run_worker` (statistics and suspension
+# refreshes) as a child of the master, for single-container deployments. The
+# master restarts it if it exits and stops it on shutdown. Leave it off when
+# the worker runs as its own service.
+JOB_WORKER = env('GUNICORN_JOB_WORKER', default=False, cast=bool)
+JOB_WORKER_ARGS = env('GUNICORN_JOB_WORKER_ARGS', default='')
+_job_worker = {'process': None, 'stopping': threading.Event()}
+
+
+def _warm_caches(log):
+    from django.db import connections
+    from matches.warmup import warm_caches
+    try:
+        generation, timings = warm_caches()
+        log.info("Caches warm for data generation %s in %.0f ms", generation, sum(s for _, s in timings) * 1000)
+    except Exception:
+        log.exception("Cache warm-up failed")
+    finally:
+        # Connections must not be shared with forked workers
+        connections.close_all()
+
+
+def _supervise_job_worker(log):
+    manage = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage.py')
+    command = [sys.executable, manage, 'run_worker', *JOB_WORKER_ARGS.split()]
+    stopping = _job_worker['stopping']
+    while not stopping.is_set():
+        process = _job_worker['process'] = subprocess.Popen(command)
+        log.info("Started job worker (pid %s)", process.pid)
+        code = process.wait()
+        if not stopping.is_set():
+            log.warning("Job worker exited with status %s; restarting", code)
+            stopping.wait(5)
+
+
+def when_ready(server):
+    if preload_app and WARM_ON_START:
+        import gc
+        _warm_caches(server.log)
+        # Keep the garbage collector from touching (and so copying) the
+        # objects every worker inherits
+        gc.freeze()
+    if JOB_WORKER:
+        threading.Thread(target=_supervise_job_worker, args=(server.log,), daemon=True).start()
+
+
+def on_exit(server):
+    process = _job_worker['process']
+    _job_worker['stopping'].set()
+    if process is not None and process.poll() is None:
+        # run_worker finishes the jobs it is running before exiting
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def post_worker_init(worker):
+    if WARM_ON_START and not preload_app:
+        _warm_caches(worker.log)
@@ -21,7 +21,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 # SECURITY WARNING: keep the secret key used in production secret!
 import os
-from decouple import config
+from decouple import Csv, config
 
 SECRET_KEY = config('SECRET_KEY', default='django-insecure-_fa*hs4iir(xc9=s&n70vl=_wm0a#82$q-z-mi@$8#yb37a-y8')
 
@@ -34,6 +34,8 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*').split(',')
 # Application definition
 
 INSTALLED_APPS = [
+    # First, so that its collectstatic (which builds the stylesheet) replaces staticfiles'
+    'matches',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -42,11 +44,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'crispy_forms',
     'crispy_tailwind',
-    'matches',
 ]
 
 MIDDLEWARE = [
+    'matches.middleware.HealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'matches.middleware.StaticFilesMiddleware',
+    'matches.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -91,6 +95,72 @@ DATABASES = {
 }
 
 
+# SQLite production profile, applied to every new connection:
+# - WAL lets readers work while a write is in progress
+# - busy_timeout makes a writer wait for the write lock instead of failing
+#   with "database is locked"
+# Write requests and bulk rewrites begin IMMEDIATE instead (see
+# matches/transactions.py), taking the write lock up front so they never have
+# to upgrade a read lock, which fails without waiting; other transactions
+# stay DEFERRED so that reads never queue for the lock
+SQLITE_TUNING = config('SQLITE_TUNING', default=True, cast=bool)
+SQLITE_BUSY_TIMEOUT_MS = config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int)
+SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int)
+SQLITE_CACHE_SIZE_KB = config('SQLITE_CACHE_SIZE_KB', default=64 * 1024, cast=int)
+# Times a write request is retried when the lock could not be had within busy_timeout
+SQLITE_WRITE_RETRIES = config('SQLITE_WRITE_RETRIES', default=2, cast=int)
+
+if SQLITE_TUNING and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['OPTIONS'] = {
+        'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+        'init_command': ';'.join([
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',
+            f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}',
+            f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}',
+            f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}',
+            'PRAGMA temp_store=MEMORY',
+        ]),
+    }
+
+# Persistent connections are kept for DB_CONN_MAX_AGE seconds and checked
+# before reuse. Django does not reuse connections across async requests, so
+# the ASGI profile defaults to 0; use DB_POOL (psycopg 3) there instead.
+DB_CONN_MAX_AGE = config(
+    'DB_CONN_MAX_AGE', default=0 if config('SERVER_PROFILE', default='wsgi') == 'asgi' else 60, cast=int
+)
+DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+DATABASES['default']['CONN_HEALTH_CHECKS'] = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+if config('DB_POOL', default=False, cast=bool) and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = True
+
+# Read replicas: a comma-separated list of HOST[:PORT] for a server database,
+# or of database files for SQLite. Each one gets the primary's other settings.
+# GET and HEAD requests read from a healthy replica; a client that has just
+# written reads from the primary for DB_REPLICA_PIN_SECONDS afterwards.
+DB_REPLICAS = config('DB_REPLICAS', default='', cast=Csv())
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=15, cast=int)
+# A replica that fails its health check is skipped for this long
+DB_REPLICA_RETRY_SECONDS = config('DB_REPLICA_RETRY_SECONDS', default=30, cast=int)
+# PostgreSQL replicas further behind the primary than this are skipped
+DB_REPLICA_MAX_LAG_SECONDS = config('DB_REPLICA_MAX_LAG_SECONDS', default=10, cast=float)
+
+DATABASE_REPLICAS = []
+for number, replica in enumerate(DB_REPLICAS, 1):
+    alias = f'replica{number}'
+    # Tests run against the primary only
+    DATABASES[alias] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES[alias]['NAME'] = replica
+    else:
+        host, _, port = replica.partition(':')
+        DATABASES[alias].update(HOST=host, PORT=port or DATABASES['default']['PORT'])
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['matches.routers.ReplicaRouter']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -130,11 +200,80 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # collectstatic writes content-hashed copies and their .gz/.br variants,
+    # which StaticFilesMiddleware serves with far-future caching
+    'staticfiles': {'BACKEND': 'matches.storage.CompressedManifestStaticFilesStorage'},
+}
+# Tests refer to static files by their plain names, without collecting them
+TEST_RUNNER = 'league_manager.test_runner.TestRunner'
+# Tailwind CSS standalone CLI used by `manage.py build_css` and collectstatic
+# (a name on PATH or a path); `collectstatic --skip-css` collects the committed
+# build without it
+TAILWIND_CLI = config('TAILWIND_CLI', default='tailwindcss')
 
 # Media files
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# League rules
+# Competition fixtures are filed under when no season is given; a season is
+# started for the calendar year when none covers a fixture's date
+LEAGUE_NAME = config('LEAGUE_NAME', default='Wasl Village Premier League')
+# Minutes a fixture occupies its clubs and venue, used for clash detection
+MATCH_DURATION_MINUTES = config('MATCH_DURATION_MINUTES', default=45, cast=int)
+# A red card bans a player for SUSPENSION_RED_CARD_MATCHES club matches; every
+# SUSPENSION_YELLOW_CARD_LIMIT yellow cards ban for SUSPENSION_YELLOW_CARD_MATCHES
+SUSPENSION_RED_CARD_MATCHES = config('SUSPENSION_RED_CARD_MATCHES', default=1, cast=int)
+SUSPENSION_YELLOW_CARD_LIMIT = config('SUSPENSION_YELLOW_CARD_LIMIT', default=5, cast=int)
+SUSPENSION_YELLOW_CARD_MATCHES = config('SUSPENSION_YELLOW_CARD_MATCHES', default=1, cast=int)
+
+# Cache
+# Template fragments use versioned keys, so entries never need to be
+# invalidated and can live as long as the backend keeps them
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='league-manager'),
+    }
+}
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=86400, cast=int)
+# Tables as of a past date start from the nearest stored checkpoint, taken
+# every STANDINGS_CHECKPOINT_MATCHES results, and replay at most that many
+STANDINGS_CHECKPOINT_MATCHES = config('STANDINGS_CHECKPOINT_MATCHES', default=10, cast=int)
+
+# Live match updates (server-sent events, served by the ASGI application)
+# Every worker polls the event table this often for events saved by other workers
+LIVE_POLL_INTERVAL = config('LIVE_POLL_INTERVAL', default=2.0, cast=float)
+LIVE_KEEPALIVE_SECONDS = config('LIVE_KEEPALIVE_SECONDS', default=15, cast=int)
+LIVE_STREAM_MAX_SECONDS = config('LIVE_STREAM_MAX_SECONDS', default=600, cast=int)
+LIVE_RETRY_MS = config('LIVE_RETRY_MS', default=3000, cast=int)
+LIVE_EVENT_RETENTION_HOURS = config('LIVE_EVENT_RETENTION_HOURS', default=48, cast=int)
+
+# The player name typeahead is held in memory by each process, which checks at
+# most this often whether other processes changed players or clubs
+AUTOCOMPLETE_CHECK_SECONDS = config('AUTOCOMPLETE_CHECK_SECONDS', default=5.0, cast=float)
+
+# Background jobs (recomputing statistics after saves), run by `manage.py run_worker`.
+# JOB_QUEUE_INLINE runs them in the saving request instead, as when DEBUG is on.
+JOB_QUEUE_INLINE = config('JOB_QUEUE_INLINE', default=DEBUG, cast=bool)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+# Retries wait JOB_RETRY_DELAY_SECONDS, doubling after each failed attempt
+JOB_RETRY_DELAY_SECONDS = config('JOB_RETRY_DELAY_SECONDS', default=10, cast=int)
+# A job running longer than this is assumed lost with its worker and queued again
+JOB_TIMEOUT_SECONDS = config('JOB_TIMEOUT_SECONDS', default=600, cast=int)
+JOB_RETENTION_HOURS = config('JOB_RETENTION_HOURS', default=24, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=1.0, cast=float)
+
+# Time a worker may spend importing modules before its first request, checked
+# by `manage.py import_report` (and by the tests with IMPORT_TIME_CHECK=True)
+IMPORT_TIME_BUDGET_MS = config('IMPORT_TIME_BUDGET_MS', default=400, cast=float)
+
+# Public pages send ETag/Last-Modified and may be reused by a shared cache
+# (e.g. a local reverse proxy) for this many seconds without revalidating
+PAGE_PROXY_MAX_AGE = config('PAGE_PROXY_MAX_AGE', default=0, cast=int)
+
 # Crispy Forms Configuration
 CRISPY_ALLOWED_TEMPLATE_PACKS = "tailwind"
 CRISPY_TEMPLATE_PACK = "tailwind"
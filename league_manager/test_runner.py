@@ -0,0 +1,24 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    The default runner, with static files referred to by their plain names.
+
+    The manifest storage refuses to name a file that collectstatic has not
+    hashed, and tests render pages without collecting first; the tests of
+    the storage itself switch it back on.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.plain_static = override_settings(STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        })
+        self.plain_static.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.plain_static.disable()
+        super().teardown_test_environment(**kwargs)
@@ -18,13 +18,18 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from matches.transactions import serialize_writes
 
-urlpatterns = [
+# On SQLite, write requests to every view (the admin's too) run in one write
+# transaction and are retried while the database stays locked
+urlpatterns = serialize_writes([
     path('admin/', admin.site.urls),
     path('', include('matches.urls')),
-]
+])
 
-# Serve media files in development
+# Serve media files, and static files from their sources, in development;
+# otherwise StaticFilesMiddleware serves the collected static files
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    urlpatterns += staticfiles_urlpatterns()
@@ -1,8 +1,63 @@
+from collections import defaultdict
+from functools import partial
+from datetime import date
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.db.models.functions import Length
+from django.utils.functional import SimpleLazyObject, cached_property
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path, reverse
 from django.utils.safestring import mark_safe
-from .models import Club, Player, Fixture, MatchResult, Booking, Goal
+from django.utils import timezone
+from .models import Club, Player, Competition, Season, Fixture, MatchResult, Booking, Goal, PlayerSeasonStats, DisciplinaryRecord, SeasonArchive, Job
+from .aggregates import current_season
+from .suspensions import label_suspended_players, suspended_player_ids
+
+
+# Unfiltered changelists of PostgreSQL tables with more rows than this show
+# the planner's row estimate instead of counting the whole table
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that reads the size of a large unfiltered table from the PostgreSQL statistics"""
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                               [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings for tables that grow with every match played"""
+    paginator = EstimatedCountPaginator
+    # Skips the second COUNT(*) of the whole table on filtered changelists
+    show_full_result_count = False
+
+
+class IndexedSearchMixin:
+    """Changelist search through the full-text index instead of icontains scans over joins"""
+    search_kind = None
+    
+    def get_search_results(self, request, queryset, search_term):
+        from .search import matching_ids
+        ids = matching_ids(self.search_kind, search_term)
+        if ids is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=ids), False
 
 
 class PlayerInline(admin.TabularInline):
@@ -13,46 +68,92 @@ class PlayerInline(admin.TabularInline):
 
 
 @admin.register(Club)
-class ClubAdmin(admin.ModelAdmin):
+class ClubAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'manager', 'captain', 'logo_preview', 'player_count']
     list_filter = ['name']
     search_fields = ['name']
+    search_kind = 'club'
+    # Player.__str__ shows the club
+    list_select_related = ['manager__club', 'captain__club']
     inlines = [PlayerInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(player_count=Count('players'))
+    
     def logo_preview(self, obj):
+        from .logos import logo_sources
         if obj.logo:
             return format_html(
-                '<img src="{}" width="30" height="30" style="border-radius: 50%; object-fit: cover;" />',
-                obj.logo.url
+                '<img src="{}" srcset="{} 2x" width="30" height="30" style="border-radius: 50%; object-fit: cover;" />',
+                *logo_sources(obj.logo.name, 30)['webp']
             )
         return "No logo"
     logo_preview.short_description = "Logo"
     
     def player_count(self, obj):
-        return obj.players.count()
+        return obj.player_count
     player_count.short_description = "Players"
+    player_count.admin_order_field = 'player_count'
 
 
 @admin.register(Player)
-class PlayerAdmin(admin.ModelAdmin):
+class PlayerAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ['first_name', 'last_name', 'position', 'club', 'full_name']
     list_filter = ['club', 'position']
     search_fields = ['first_name', 'last_name', 'club__name']
+    search_kind = 'player'
+    list_select_related = ['club']
     ordering = ['club', 'position', 'last_name']
     
     def full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}"
     full_name.short_description = "Full Name"
+    full_name.admin_order_field = 'last_name'
 
 
-class BookingInline(admin.TabularInline):
+class SuspendedPlayerLabelMixin:
+    """
+    Mark players serving a ban in the squad dropdowns used for result entry,
+    counting the bans of the edited result's season (the current season while
+    adding one).
+    """
+    
+    def suspended_players(self, obj):
+        """
+        The set of suspended player IDs for obj, the MatchResult being edited
+        (or the inline's parent), fetched once the first dropdown is rendered
+        """
+        return SimpleLazyObject(
+            lambda: suspended_player_ids(obj.season_id if obj is not None else current_season())
+        )
+    
+    def get_form(self, request, obj=None, **kwargs):
+        kwargs.setdefault('formfield_callback', partial(
+            self.formfield_for_dbfield, request=request, suspended=self.suspended_players(obj),
+        ))
+        return super().get_form(request, obj, **kwargs)
+    
+    def get_formset(self, request, obj=None, **kwargs):
+        kwargs.setdefault('formfield_callback', partial(
+            self.formfield_for_dbfield, request=request, suspended=self.suspended_players(obj),
+        ))
+        return super().get_formset(request, obj, **kwargs)
+    
+    def formfield_for_dbfield(self, db_field, request, suspended=None, **kwargs):
+        field = super().formfield_for_dbfield(db_field, request, **kwargs)
+        if field is not None and suspended is not None and db_field.related_model is Player:
+            label_suspended_players(field, suspended)
+        return field
+
+
+class BookingInline(SuspendedPlayerLabelMixin, admin.TabularInline):
     model = Booking
     extra = 3
     fields = ['player', 'card_type', 'minute']
     ordering = ['minute']
 
 
-class GoalInline(admin.TabularInline):
+class GoalInline(SuspendedPlayerLabelMixin, admin.TabularInline):
     model = Goal
     extra = 5
     fields = ['scorer', 'minute', 'own_goal', 'penalty']
@@ -67,17 +168,56 @@ class MatchResultInline(admin.StackedInline):
     inlines = [GoalInline, BookingInline]
 
 
+class SeasonInline(admin.TabularInline):
+    model = Season
+    extra = 1
+    fields = ['name', 'start_date', 'end_date']
+
+
+@admin.register(Competition)
+class CompetitionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'season_count']
+    search_fields = ['name']
+    inlines = [SeasonInline]
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(season_count=Count('seasons'))
+    
+    def season_count(self, obj):
+        return obj.season_count
+    season_count.short_description = "Seasons"
+    season_count.admin_order_field = 'season_count'
+
+
+@admin.register(Season)
+class SeasonAdmin(admin.ModelAdmin):
+    list_display = ['name', 'competition', 'start_date', 'end_date', 'fixture_count']
+    list_filter = ['competition']
+    search_fields = ['name', 'competition__name']
+    list_select_related = ['competition']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(fixture_count=Count('fixtures'))
+    
+    def fixture_count(self, obj):
+        return obj.fixture_count
+    fixture_count.short_description = "Fixtures"
+    fixture_count.admin_order_field = 'fixture_count'
+
+
 @admin.register(Fixture)
-class FixtureAdmin(admin.ModelAdmin):
-    list_display = ['team1', 'vs_display', 'team2', 'date', 'venue', 'has_result']
-    list_filter = ['date', 'team1', 'team2']
+class FixtureAdmin(IndexedSearchMixin, LargeTableAdmin):
+    list_display = ['team1', 'vs_display', 'team2', 'date', 'venue', 'season', 'has_result']
+    list_filter = ['season', 'date', 'team1', 'team2']
     search_fields = ['team1__name', 'team2__name', 'venue']
+    search_kind = 'fixture'
+    list_select_related = ['team1', 'team2', 'season__competition']
     ordering = ['-date']
     inlines = [MatchResultInline]
     
     fieldsets = (
         ('Match Details', {
-            'fields': ('team1', 'team2', 'date', 'venue')
+            'fields': ('team1', 'team2', 'date', 'venue', 'season')
         }),
     )
     
@@ -85,17 +225,24 @@ class FixtureAdmin(admin.ModelAdmin):
         return "vs"
     vs_display.short_description = ""
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            has_result=Exists(MatchResult.objects.filter(fixture=OuterRef('pk')))
+        )
+    
     def has_result(self, obj):
-        return obj.result is not None
+        return obj.has_result
     has_result.boolean = True
     has_result.short_description = "Result"
+    has_result.admin_order_field = 'has_result'
 
 
 @admin.register(MatchResult)
-class MatchResultAdmin(admin.ModelAdmin):
+class MatchResultAdmin(SuspendedPlayerLabelMixin, LargeTableAdmin):
     list_display = ['fixture', 'score_display', 'winner_display', 'man_of_match']
-    list_filter = ['fixture__date']
+    list_filter = ['season', 'fixture__date']
     search_fields = ['fixture__team1__name', 'fixture__team2__name']
+    list_select_related = ['fixture__team1', 'fixture__team2', 'man_of_match__club']
     inlines = [GoalInline, BookingInline]
     
     fieldsets = (
@@ -113,6 +260,63 @@ class MatchResultAdmin(admin.ModelAdmin):
         return winner.name if winner else "Draw"
     winner_display.short_description = "Winner"
     
+    def get_urls(self):
+        return [
+            path('matchday/', self.admin_site.admin_view(self.matchday_view), name='matches_matchresult_matchday'),
+        ] + super().get_urls()
+    
+    def matchday_view(self, request):
+        """
+        Scores, man of the match, goals and bookings for every fixture on one
+        date. The squads are loaded in one query, and the whole matchday is
+        saved in one transaction, so the statistics refresh runs once.
+        """
+        from .forms import MatchdayEntry
+        
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        try:
+            day = date.fromisoformat(request.GET.get('date', ''))
+        except ValueError:
+            day = timezone.localdate()
+        
+        fixtures = list(
+            Fixture.objects.filter(date__date=day).order_by('date', 'pk')
+            .select_related('team1', 'team2', 'result')
+            .prefetch_related('result__goals', 'result__bookings')
+        )
+        squads = defaultdict(list)
+        club_ids = {club_id for fixture in fixtures for club_id in (fixture.team1_id, fixture.team2_id)}
+        for player in Player.objects.filter(club_id__in=club_ids).order_by('first_name', 'last_name').values(
+            'id', 'first_name', 'last_name', 'club_id'
+        ):
+            squads[player['club_id']].append(player)
+        # Bans apply within a season, and one day may have fixtures of several competitions
+        suspended = {season: suspended_player_ids(season) for season in {fixture.season_id for fixture in fixtures}}
+        
+        data = request.POST if request.method == 'POST' else None
+        entries = [MatchdayEntry(fixture, squads, suspended[fixture.season_id], data) for fixture in fixtures]
+        if data is not None and all([entry.is_valid() for entry in entries]):
+            with transaction.atomic():
+                saved = sum(entry.save() for entry in entries)
+            self.message_user(request, f"Saved {saved} result(s) for {day:%d %b %Y}.")
+            return HttpResponseRedirect(f"{request.path}?date={day.isoformat()}")
+        
+        matchdays = Fixture.objects.values_list('date', flat=True)
+        previous_fixture = matchdays.filter(date__date__lt=day).order_by('-date').first()
+        next_fixture = matchdays.filter(date__date__gt=day).order_by('date').first()
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f"Matchday {day:%d %b %Y}",
+            'day': day,
+            'entries': entries,
+            'errors': data is not None,
+            'previous_day': timezone.localtime(previous_fixture).date() if previous_fixture else None,
+            'next_day': timezone.localtime(next_fixture).date() if next_fixture else None,
+        }
+        return TemplateResponse(request, 'admin/matches/matchresult/matchday.html', context)
+    
     def get_readonly_fields(self, request, obj=None):
         if obj:  # editing an existing object
             return ['fixture']  # Make fixture read-only after creation
@@ -153,15 +357,17 @@ class MatchResultAdmin(admin.ModelAdmin):
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(LargeTableAdmin):
     list_display = ['get_match', 'player', 'card_type', 'minute', 'card_colored']
     list_filter = ['card_type', 'match__fixture__team1', 'match__fixture__team2']
     search_fields = ['player__first_name', 'player__last_name', 'player__club__name']
+    list_select_related = ['match__fixture__team1', 'match__fixture__team2', 'player__club']
     ordering = ['-match__fixture__date', 'minute']
     
     def get_match(self, obj):
         return obj.match.fixture.__str__()
     get_match.short_description = "Match"
+    get_match.admin_order_field = 'match__fixture__date'
     
     def card_colored(self, obj):
         if obj.card_type == 'red':
@@ -172,15 +378,17 @@ class BookingAdmin(admin.ModelAdmin):
 
 
 @admin.register(Goal)
-class GoalAdmin(admin.ModelAdmin):
+class GoalAdmin(LargeTableAdmin):
     list_display = ['get_match', 'scorer', 'minute', 'goal_type', 'scorer_club']
     list_filter = ['own_goal', 'penalty', 'match__fixture__team1', 'match__fixture__team2']
     search_fields = ['scorer__first_name', 'scorer__last_name', 'scorer__club__name']
+    list_select_related = ['match__fixture__team1', 'match__fixture__team2', 'scorer__club']
     ordering = ['-match__fixture__date', 'minute']
     
     def get_match(self, obj):
         return obj.match.fixture.__str__()
     get_match.short_description = "Match"
+    get_match.admin_order_field = 'match__fixture__date'
     
     def goal_type(self, obj):
         types = []
@@ -194,6 +402,90 @@ class GoalAdmin(admin.ModelAdmin):
     def scorer_club(self, obj):
         return obj.scorer.club.name
     scorer_club.short_description = "Club"
+    scorer_club.admin_order_field = 'scorer__club__name'
+
+
+@admin.register(PlayerSeasonStats)
+class PlayerSeasonStatsAdmin(LargeTableAdmin):
+    list_display = ['player', 'season', 'appearances', 'goals', 'penalties', 'own_goals',
+                    'assists', 'motm_awards', 'yellow_cards', 'red_cards']
+    list_filter = ['season']
+    search_fields = ['player__first_name', 'player__last_name']
+    list_select_related = ['player__club', 'season__competition']
+    ordering = ['-season__start_date', '-goals']
+    
+    # Maintained automatically from goals, bookings and results
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DisciplinaryRecord)
+class DisciplinaryRecordAdmin(LargeTableAdmin):
+    list_display = ['player', 'season', 'accumulated_yellows', 'carried_over', 'matches_banned', 'matches_served', 'is_suspended']
+    list_filter = ['season']
+    search_fields = ['player__first_name', 'player__last_name', 'player__club__name']
+    list_select_related = ['player__club', 'season__competition']
+    ordering = ['-season__start_date', 'player']
+    
+    def is_suspended(self, obj):
+        return obj.is_suspended
+    is_suspended.boolean = True
+    is_suspended.short_description = "Suspended"
+    
+    # Maintained automatically from bookings and results
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SeasonArchive)
+class SeasonArchiveAdmin(admin.ModelAdmin):
+    list_display = ['season', 'matches', 'size_display', 'purged', 'created_at']
+    list_select_related = ['season__competition']
+    fields = ['season', 'matches', 'size_display', 'purged', 'created_at']
+    readonly_fields = fields
+    
+    def get_queryset(self, request):
+        # The snapshot itself is never shown, only its size
+        return super().get_queryset(request).defer('data').annotate(size=Length('data'))
+    
+    def size_display(self, obj):
+        return f"{obj.size / 1024:.1f} KiB"
+    size_display.short_description = "Size"
+    size_display.admin_order_field = 'size'
+    
+    # Written by the archive_season command
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ['key', 'status', 'attempts', 'created_at', 'run_after', 'finished_at', 'locked_by']
+    list_filter = ['status', 'name']
+    search_fields = ['key']
+    readonly_fields = ['name', 'key', 'payload', 'status', 'attempts', 'run_after', 'locked_by',
+                       'started_at', 'finished_at', 'last_error', 'created_at']
+    actions = ['retry_jobs']
+    
+    @admin.action(description="Retry selected failed jobs")
+    def retry_jobs(self, request, queryset):
+        count = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f"{count} job(s) queued again.")
+    
+    # Created by saves and updated by the worker
+    def has_add_permission(self, request):
+        return False
 
 
 # Customize admin site
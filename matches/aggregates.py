@@ -0,0 +1,168 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Player, MatchResult, Booking, Goal, PlayerSeasonStats, Season
+from .transactions import write_transaction
+from .versioning import bump_versions
+
+
+STAT_FIELDS = [
+    'goals', 'penalties', 'own_goals', 'assists', 'motm_awards',
+    'yellow_cards', 'red_cards', 'appearances',
+]
+
+
+def _default_seasons():
+    """The default competition's seasons that have started, latest first, then those yet to start"""
+    seasons = Season.objects.filter(competition__name=settings.LEAGUE_NAME).values_list('pk', flat=True)
+    today = timezone.localdate()
+    return seasons.filter(start_date__lte=today).order_by('-start_date'), seasons.order_by('start_date')
+
+
+def current_season():
+    """ID of the season pages show by default, or None before there is one"""
+    started, upcoming = _default_seasons()
+    return started.first() or upcoming.first()
+
+
+async def acurrent_season():
+    started, upcoming = _default_seasons()
+    return await started.afirst() or await upcoming.afirst()
+
+
+def current_season_subquery():
+    """current_season() as an expression, so the season can be fetched in the same query"""
+    started, upcoming = _default_seasons()
+    return Coalesce(Subquery(started[:1]), Subquery(upcoming[:1]))
+
+
+def compute_player_stats(season, player_ids=None):
+    """
+    Compute season totals from the source tables.
+
+    Returns a dict of player_id -> {stat: value} for players with at least one
+    non-zero stat, limited to player_ids when given. Own goals are kept out of
+    goals and counted separately; appearances are the matches played by the
+    player's club, as line-ups are not recorded.
+    """
+    results = MatchResult.objects.filter(season=season)
+    goals = Goal.objects.filter(match__season=season)
+    bookings = Booking.objects.filter(match__season=season)
+    players = Player.objects.all()
+
+    scorer_goals = goals
+    assisted_goals = goals.filter(assist__isnull=False)
+    motm_results = results.filter(man_of_match__isnull=False)
+    if player_ids is not None:
+        player_ids = set(player_ids)
+        scorer_goals = scorer_goals.filter(scorer_id__in=player_ids)
+        assisted_goals = assisted_goals.filter(assist_id__in=player_ids)
+        motm_results = motm_results.filter(man_of_match_id__in=player_ids)
+        bookings = bookings.filter(player_id__in=player_ids)
+        players = players.filter(id__in=player_ids)
+
+    stats = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+
+    scorer_rows = scorer_goals.values('scorer_id').annotate(
+        scored=Count('id', filter=Q(own_goal=False)),
+        scored_penalties=Count('id', filter=Q(own_goal=False, penalty=True)),
+        scored_own_goals=Count('id', filter=Q(own_goal=True)),
+    ).order_by()
+    for row in scorer_rows:
+        player_stats = stats[row['scorer_id']]
+        player_stats['goals'] = row['scored']
+        player_stats['penalties'] = row['scored_penalties']
+        player_stats['own_goals'] = row['scored_own_goals']
+
+    for row in assisted_goals.values('assist_id').annotate(total=Count('id')).order_by():
+        stats[row['assist_id']]['assists'] = row['total']
+
+    for row in motm_results.values('man_of_match_id').annotate(total=Count('id')).order_by():
+        stats[row['man_of_match_id']]['motm_awards'] = row['total']
+
+    card_rows = bookings.values('player_id').annotate(
+        yellows=Count('id', filter=Q(card_type='yellow')),
+        reds=Count('id', filter=Q(card_type='red')),
+    ).order_by()
+    for row in card_rows:
+        stats[row['player_id']]['yellow_cards'] = row['yellows']
+        stats[row['player_id']]['red_cards'] = row['reds']
+
+    club_matches = defaultdict(int)
+    for team_field in ('fixture__team1_id', 'fixture__team2_id'):
+        for row in results.values(team_field).annotate(total=Count('id')).order_by():
+            club_matches[row[team_field]] += row['total']
+    if club_matches:
+        for player_id, club_id in players.filter(club_id__in=club_matches).values_list('id', 'club_id'):
+            stats[player_id]['appearances'] = club_matches[club_id]
+
+    return {
+        player_id: values for player_id, values in stats.items()
+        if any(values.values()) and (player_ids is None or player_id in player_ids)
+    }
+
+
+def refresh_player_stats(season, player_ids=None):
+    """
+    Bring the stored season totals in line with the source tables, for the
+    given players or, when player_ids is None, for everyone.
+    """
+    computed = compute_player_stats(season, player_ids)
+    existing = PlayerSeasonStats.objects.filter(season=season)
+    if player_ids is not None:
+        existing = existing.filter(player_id__in=player_ids)
+
+    changed, stale = [], []
+    for row in existing:
+        values = computed.pop(row.player_id, None)
+        if values is None:
+            stale.append(row.pk)
+        elif any(getattr(row, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(row, field, value)
+            changed.append(row)
+
+    with transaction.atomic():
+        if stale:
+            PlayerSeasonStats.objects.filter(pk__in=stale).delete()
+        if changed:
+            PlayerSeasonStats.objects.bulk_update(changed, STAT_FIELDS)
+        PlayerSeasonStats.objects.bulk_create([
+            PlayerSeasonStats(player_id=player_id, season_id=season, **values)
+            for player_id, values in computed.items()
+        ])
+        if stale or changed or computed:
+            bump_versions(PlayerSeasonStats)
+
+
+def seasons_with_results():
+    return sorted(MatchResult.objects.values_list('season_id', flat=True).distinct().order_by())
+
+
+def rebuild_player_stats():
+    """Recompute every season from scratch, e.g. after a bulk import"""
+    seasons = seasons_with_results()
+    with write_transaction():
+        PlayerSeasonStats.objects.exclude(season__in=seasons).delete()
+        for season in seasons:
+            refresh_player_stats(season)
+
+
+def leaderboard(season, field, limit=10):
+    """Top players of a season by one stat, read from the season stats index"""
+    return PlayerSeasonStats.objects.filter(
+        season=season, **{f'{field}__gt': 0}
+    ).select_related('player__club').order_by(f'-{field}', 'player_id')[:limit]
+
+
+def club_discipline(season, limit=10):
+    """Clubs of a season by disciplinary points (yellow=1, red=3), most first"""
+    return Booking.objects.filter(match__season=season).values('player__club__name').annotate(
+        yellow_cards=Count('id', filter=Q(card_type='yellow')),
+        red_cards=Count('id', filter=Q(card_type='red')),
+        total_cards=Count('id', filter=Q(card_type='yellow')) +
+                  Count('id', filter=Q(card_type='red')) * 3
+    ).order_by('-total_cards')[:limit]
@@ -0,0 +1,163 @@
+"""
+Season archives: a finished season's final table, leaderboards and match
+timelines frozen into one gzip-compressed JSON snapshot.
+
+Pages and API calls for an archived season are answered from the snapshot,
+so its fixtures, results, goals and bookings can be purged from the tables
+every current-season query reads.
+"""
+import gzip
+import json
+from datetime import datetime
+from django.db.models import F
+from .aggregates import STAT_FIELDS, club_discipline, leaderboard
+from .models import Club, Fixture, PlayerSeasonStats, DisciplinaryRecord, SeasonArchive
+from .transactions import write_transaction
+from .utils import build_table_data, get_season_summary
+from .versioning import bump_versions, season_label
+
+
+# Bumped when the snapshot layout changes; older snapshots are read as they were written
+SNAPSHOT_FORMAT = 1
+
+TABLE_FIELDS = [
+    'position', 'matches_played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+    'goal_difference', 'yellow_cards', 'red_cards', 'total_cards', 'points', 'form',
+    'avg_goals_per_match', 'avg_conceded_per_match', 'win_percentage',
+]
+LEADERBOARDS = ['goals', 'assists', 'motm_awards']
+
+
+def _player(player):
+    if player is None:
+        return None
+    return {
+        'id': player.pk, 'first_name': player.first_name, 'last_name': player.last_name,
+        'club': {'id': player.club_id, 'name': player.club.name},
+    }
+
+
+def _match(fixture):
+    result = getattr(fixture, 'result', None)
+    match = {
+        'id': fixture.pk,
+        'date': fixture.date.isoformat(),
+        'venue': fixture.venue,
+        'team1': {'id': fixture.team1_id, 'name': fixture.team1.name},
+        'team2': {'id': fixture.team2_id, 'name': fixture.team2.name},
+        'result': None,
+    }
+    if result is not None:
+        match['result'] = {
+            'id': result.pk,
+            'team1_goals': result.team1_goals,
+            'team2_goals': result.team2_goals,
+            'man_of_match': _player(result.man_of_match),
+            'goals': [
+                {'minute': goal.minute, 'scorer': _player(goal.scorer), 'assist': _player(goal.assist),
+                 'penalty': goal.penalty, 'own_goal': goal.own_goal}
+                for goal in result.goals.all()
+            ],
+            'bookings': [
+                {'minute': booking.minute, 'player': _player(booking.player), 'card_type': booking.card_type}
+                for booking in result.bookings.all()
+            ],
+        }
+    return match
+
+
+def build_snapshot(season):
+    """The snapshot of a season as it stands in the database"""
+    table_data = build_table_data(season.pk)
+    fixtures = Fixture.objects.filter(season=season).select_related(
+        'team1', 'team2', 'result__man_of_match__club',
+    ).prefetch_related(
+        'result__goals__scorer__club', 'result__goals__assist__club', 'result__bookings__player__club',
+    ).order_by('date', 'pk')
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'table': [
+            {'id': club_data['club'].pk, 'name': club_data['club'].name,
+             **{field: club_data[field] for field in TABLE_FIELDS}}
+            for club_data in table_data
+        ],
+        'summary': get_season_summary(table_data),
+        'leaderboards': {
+            field: [
+                {'player': _player(row.player), **{stat: getattr(row, stat) for stat in STAT_FIELDS}}
+                for row in leaderboard(season.pk, field)
+            ]
+            for field in LEADERBOARDS
+        },
+        'discipline': list(club_discipline(season.pk)),
+        'matches': [_match(fixture) for fixture in fixtures.iterator(chunk_size=500)],
+    }
+
+
+def archive_season(season, purge=False):
+    """
+    Freeze a season into its archive, replacing an earlier snapshot.
+
+    With purge=True the season's fixtures (with their results, goals and
+    bookings), player statistics and disciplinary records are deleted once
+    the snapshot is stored, except the records of bans still to be served.
+    A purged season cannot be archived again.
+    """
+    previous = SeasonArchive.objects.filter(season=season).first()
+    if previous is not None and previous.purged:
+        raise ValueError(f"{season} was purged; its snapshot can no longer be rebuilt")
+
+    with write_transaction():
+        snapshot = build_snapshot(season)
+        data = gzip.compress(json.dumps(snapshot, separators=(',', ':')).encode(), compresslevel=9, mtime=0)
+        archive, _created = SeasonArchive.objects.update_or_create(
+            season=season, defaults={'data': data, 'matches': len(snapshot['matches']), 'purged': purge},
+        )
+        if purge:
+            # Deleting fixtures cascades to their results, goals and bookings
+            Fixture.objects.filter(season=season).delete()
+            PlayerSeasonStats.objects.filter(season=season).delete()
+            # Unserved bans stay behind to carry over into the next season
+            DisciplinaryRecord.objects.filter(season=season, matches_banned__lte=F('matches_served')).delete()
+            bump_versions(PlayerSeasonStats, DisciplinaryRecord)
+        bump_versions(season_label(season.pk))
+    return archive
+
+
+def load_snapshot(archive):
+    return json.loads(gzip.decompress(bytes(archive.data)))
+
+
+def season_archive(season):
+    """The archive of a season, or None; use select_related('archive') to avoid a query"""
+    try:
+        return season.archive
+    except SeasonArchive.DoesNotExist:
+        return None
+
+
+def archived_table(snapshot):
+    """
+    Table rows from a snapshot in the shape build_table_data() returns, with
+    the clubs that still exist attached (for their logos).
+    """
+    clubs = Club.objects.in_bulk([row['id'] for row in snapshot['table']])
+    table_data = []
+    for row in snapshot['table']:
+        club_data = {key: value for key, value in row.items() if key not in ('id', 'name')}
+        club_data['club'] = clubs.get(row['id']) or Club(pk=row['id'], name=row['name'])
+        table_data.append(club_data)
+    return table_data
+
+
+def archived_matches(snapshot, date_filter='all', club_id=None, now=None):
+    """A snapshot's match timeline, filtered and ordered like the fixtures API"""
+    matches = snapshot['matches']
+    if club_id:
+        matches = [match for match in matches if club_id in (match['team1']['id'], match['team2']['id'])]
+    if date_filter == 'upcoming':
+        matches = [match for match in matches
+                   if datetime.fromisoformat(match['date']) >= now and match['result'] is None]
+    elif date_filter == 'past':
+        matches = [match for match in matches if datetime.fromisoformat(match['date']) < now][::-1]
+    return matches
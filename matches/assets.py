@@ -0,0 +1,122 @@
+import json
+import mimetypes
+import os
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+# Files up to this size are read into memory once and served without disk access
+MAX_IN_MEMORY_BYTES = 512 * 1024
+
+# Content-hashed names change whenever their content does, so they are never revalidated
+IMMUTABLE = f'public, max-age={365 * 24 * 60 * 60}, immutable'
+REVALIDATE = 'no-cache'
+
+# Precompressed variant suffix -> Content-Encoding, best first
+ENCODINGS = {'.br': 'br', '.gz': 'gzip'}
+
+
+def _variant(path, stat, encoding):
+    """(path, size, ETag, content or None when it is read from disk on each request)"""
+    etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}' + ('' if encoding == 'identity' else f'-{encoding}') + '"'
+    content = None
+    if stat.st_size <= MAX_IN_MEMORY_BYTES:
+        content = Path(path).read_bytes()
+    return path, stat.st_size, etag, content
+
+
+def index_static_root(root=None):
+    """
+    Map the URL path (below STATIC_URL) of every collected static file to
+    how it is served: {'content_type', 'cache_control', 'last_modified',
+    'variants': {content coding ('identity' for the file itself): variant}}.
+    Names listed as hashed in the staticfiles manifest are cached forever.
+    """
+    root = Path(root or settings.STATIC_ROOT)
+    if not root.is_dir():
+        return {}
+    manifest_path = root / 'staticfiles.json'
+    hashed = set()
+    if manifest_path.exists():
+        hashed = set(json.loads(manifest_path.read_text()).get('paths', {}).values())
+
+    files = {}
+    for directory, _dirnames, filenames in os.walk(root):
+        names = set(filenames)
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            base, suffix = os.path.splitext(filename)
+            if (suffix in ENCODINGS and base in names) or path == str(manifest_path):
+                continue
+            name = Path(path).relative_to(root).as_posix()
+            content_type, _encoding = mimetypes.guess_type(filename)
+            content_type = content_type or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+                content_type += '; charset=utf-8'
+            stat = os.stat(path)
+            variants = {'identity': _variant(path, stat, 'identity')}
+            for variant_suffix, encoding in ENCODINGS.items():
+                if filename + variant_suffix in names:
+                    variant_path = path + variant_suffix
+                    variants[encoding] = _variant(variant_path, os.stat(variant_path), encoding)
+            files[name] = {
+                'content_type': content_type,
+                'cache_control': IMMUTABLE if name in hashed else REVALIDATE,
+                'last_modified': stat.st_mtime,
+                'variants': variants,
+            }
+    return files
+
+
+def accepted_encodings(header):
+    """The content codings an Accept-Encoding header allows (q > 0)"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _semicolon, params = part.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve_static_file(request, static_file):
+    """The response for a static file, in the best encoding the client accepts"""
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    variants = static_file['variants']
+    encoding = next((encoding for encoding in ENCODINGS.values()
+                     if encoding in variants and encoding in accepted), 'identity')
+    path, size, etag, content = variants[encoding]
+
+    response = HttpResponse(content_type=static_file['content_type'])
+    response['Cache-Control'] = static_file['cache_control']
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(static_file['last_modified'])
+    if len(variants) > 1:
+        response['Vary'] = 'Accept-Encoding'
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    # 304 Not Modified (with the headers above) when the client's copy is current
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(static_file['last_modified']), response=response,
+    )
+    if response.status_code != 200:
+        return response
+
+    if request.method != 'HEAD':
+        if content is not None:
+            response.content = content
+        else:
+            file_response = FileResponse(open(path, 'rb'), content_type=static_file['content_type'])
+            for header, value in response.items():
+                file_response[header] = value
+            response = file_response
+    response['Content-Length'] = str(size)
+    return response
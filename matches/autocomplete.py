@@ -0,0 +1,149 @@
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from django.conf import settings
+from .models import Club, Player
+from .versioning import get_versions, versions_token
+
+
+# Data versions that make another process's copy of the index stale
+INDEX_MODELS = (Club, Player)
+
+
+def fold(text):
+    """Lower-case `text` and strip its accents, so 'Jörgen' is found by 'jorg'"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ' '.join(''.join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def name_keys(first_name, last_name):
+    """The folded full name from each word on: 'Anna de Vries' -> 'anna de vries', 'de vries', 'vries'"""
+    words = fold(f"{first_name} {last_name}").split()
+    return [' '.join(words[start:]) for start in range(len(words))]
+
+
+class PlayerNameIndex:
+    """
+    Process-local typeahead over player names, grouped by club.
+
+    Each club has a sorted array of (key, player ID), with one key per word
+    of a player's name, so a prefix lookup is a binary search per club and
+    the first `limit` matches across clubs come from merging those runs.
+    Lookups never query the database.
+
+    Saves in this process update the arrays of the affected clubs as they
+    commit. Saves in other processes are noticed through the Club and Player
+    data versions, read at most every AUTOCOMPLETE_CHECK_SECONDS, which
+    rebuild the index from scratch.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built = False
+        self.version = None
+        self.checked_at = None
+        self.players = {}
+        self.clubs = {}
+        self.keys = {}
+
+    def is_due(self):
+        return self.checked_at is None or time.monotonic() - self.checked_at >= settings.AUTOCOMPLETE_CHECK_SECONDS
+
+    def refresh(self):
+        """Rebuild the index if the data changed since it was built"""
+        self.checked_at = time.monotonic()
+        version = versions_token(get_versions(INDEX_MODELS))
+        if version != self.version:
+            self.build(version)
+
+    def build(self, version=None):
+        players = Player.objects.values_list('pk', 'first_name', 'last_name', 'position', 'club_id')
+        clubs = dict(Club.objects.values_list('pk', 'name'))
+        keys = {club_id: [] for club_id in clubs}
+        entries = {}
+        for pk, first_name, last_name, position, club_id in players.iterator():
+            entries[pk] = (first_name, last_name, position, club_id)
+            keys.setdefault(club_id, []).extend((key, pk) for key in name_keys(first_name, last_name))
+        for club_keys in keys.values():
+            club_keys.sort()
+        with self.lock:
+            self.players, self.clubs, self.keys = entries, clubs, keys
+            self.version = version
+            self.built = True
+
+    def update_player(self, pk, first_name, last_name, position, club_id):
+        """Add a player, or move an existing one to their new name or club"""
+        with self.lock:
+            if not self.built:
+                return
+            self._remove(pk)
+            self.players[pk] = (first_name, last_name, position, club_id)
+            # Arrays are replaced rather than changed in place, so lookups
+            # running meanwhile see either the old or the new squad
+            self.keys[club_id] = sorted(
+                self.keys.get(club_id, []) + [(key, pk) for key in name_keys(first_name, last_name)]
+            )
+
+    def remove_player(self, pk):
+        with self.lock:
+            if self.built:
+                self._remove(pk)
+
+    def _remove(self, pk):
+        previous = self.players.pop(pk, None)
+        if previous is not None:
+            club_id = previous[3]
+            self.keys[club_id] = [entry for entry in self.keys.get(club_id, []) if entry[1] != pk]
+
+    def update_club(self, pk, name):
+        with self.lock:
+            if self.built:
+                self.clubs[pk] = name
+                self.keys.setdefault(pk, [])
+
+    def remove_club(self, pk):
+        with self.lock:
+            if self.built:
+                self.clubs.pop(pk, None)
+                self.keys.pop(pk, None)
+
+    def _matches(self, club_keys, prefix):
+        """(key, player ID) of a club's players with a name word starting with `prefix`, in key order"""
+        for index in range(bisect_left(club_keys, (prefix,)), len(club_keys)):
+            key, pk = club_keys[index]
+            if not key.startswith(prefix):
+                return
+            yield key, pk
+
+    def lookup(self, query, club_ids=None, limit=10):
+        """
+        Up to `limit` players whose name, from any word on, starts with
+        `query`, ordered by the matched part of the name:
+        [{'id', 'first_name', 'last_name', 'position', 'club_id', 'club__name'}]
+        """
+        prefix = fold(query)
+        if not prefix:
+            return []
+        keys, players, clubs = self.keys, self.players, self.clubs
+        if club_ids is None:
+            club_ids = list(keys)
+        runs = [self._matches(keys[club_id], prefix) for club_id in club_ids if club_id in keys]
+        results, seen = [], set()
+        for _key, pk in heapq.merge(*runs):
+            player = players.get(pk)
+            if player is None or pk in seen:
+                continue
+            seen.add(pk)
+            first_name, last_name, position, club_id = player
+            results.append({
+                'id': pk, 'first_name': first_name, 'last_name': last_name, 'position': position,
+                'club_id': club_id, 'club__name': clubs.get(club_id, ''),
+            })
+            if len(results) == limit:
+                break
+        return results
+
+
+player_index = PlayerNameIndex()
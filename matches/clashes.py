@@ -0,0 +1,80 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from .models import Fixture
+
+
+def match_duration():
+    """How long a fixture occupies its clubs and venue"""
+    return timedelta(minutes=settings.MATCH_DURATION_MINUTES)
+
+
+def find_clashes(fixture, queryset=None):
+    """
+    Return fixtures that overlap the given one and share a club or the venue.
+
+    Every fixture lasts match_duration(), so two fixtures overlap exactly when
+    their kick-offs are less than one duration apart. That turns the check
+    into a single range query on the (team1, date), (team2, date) and
+    (venue, date) indexes.
+    """
+    if fixture.date is None:
+        return Fixture.objects.none()
+
+    duration = match_duration()
+    clubs = [club_id for club_id in (fixture.team1_id, fixture.team2_id) if club_id]
+    queryset = Fixture.objects.all() if queryset is None else queryset
+    clashes = queryset.filter(
+        Q(team1_id__in=clubs) | Q(team2_id__in=clubs) | Q(venue=fixture.venue),
+        date__gt=fixture.date - duration,
+        date__lt=fixture.date + duration,
+    )
+    if fixture.pk:
+        clashes = clashes.exclude(pk=fixture.pk)
+    return clashes.select_related('team1', 'team2').order_by('date')
+
+
+def describe_clash(fixture, other):
+    """Human readable reason why two fixtures clash"""
+    shared = {fixture.team1_id, fixture.team2_id} & {other.team1_id, other.team2_id}
+    if shared:
+        club = other.team1 if other.team1_id in shared else other.team2
+        return f"{club} is already playing in {other}."
+    return f"{other.venue} is already booked for {other}."
+
+
+def audit_clashes(queryset=None):
+    """
+    Find every clash in a set of fixtures with a sweep line.
+
+    Fixtures are visited in kick-off order. For each club and venue we keep a
+    heap of the fixtures still in progress, keyed by their end time; anything
+    that has finished by the current kick-off is popped, and whatever is left
+    overlaps. Sorting dominates, so a season is audited in O(n log n) plus the
+    number of clashes reported.
+
+    Returns a list of (resource, earlier_fixture, later_fixture) tuples, where
+    resource is the shared Club or venue name.
+    """
+    duration = match_duration()
+    queryset = Fixture.objects.all() if queryset is None else queryset
+    fixtures = queryset.select_related('team1', 'team2').order_by('date', 'pk')
+
+    active = defaultdict(list)
+    clashes = []
+    for fixture in fixtures.iterator():
+        resources = [
+            (('club', fixture.team1_id), fixture.team1),
+            (('club', fixture.team2_id), fixture.team2),
+            (('venue', fixture.venue), fixture.venue),
+        ]
+        for key, resource in resources:
+            in_progress = active[key]
+            while in_progress and in_progress[0][0] <= fixture.date:
+                heapq.heappop(in_progress)
+            for _end, _pk, other in sorted(in_progress, key=lambda item: item[1]):
+                clashes.append((resource, other, fixture))
+            heapq.heappush(in_progress, (fixture.date + duration, fixture.pk, fixture))
+    return clashes
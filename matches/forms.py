@@ -4,6 +4,7 @@ from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit, HTML, Fieldset, Div
 from crispy_forms.bootstrap import Accordion, AccordionGroup
 from .models import Club, Player, Fixture, MatchResult, Booking, Goal
+from .suspensions import label_suspended_players, suspended_player_ids
 
 
 class FixtureForm(forms.ModelForm):
@@ -82,6 +83,7 @@ class MatchResultForm(forms.ModelForm):
                 Q(club=fixture.team1) | Q(club=fixture.team2)
             ).order_by('first_name', 'last_name')
             self.fields['man_of_match'].queryset = man_of_match_players
+            label_suspended_players(self.fields['man_of_match'], suspended_player_ids(fixture.season_id))
         
         self.helper.layout = Layout(
             Fieldset(
@@ -133,6 +135,7 @@ class DynamicMatchResultForm(forms.ModelForm):
             self.fields['man_of_match'].widget = forms.Select(
                 attrs={'class': 'form-control', 'id': 'man-of-match-select'}
             )
+            label_suspended_players(self.fields['man_of_match'], suspended_player_ids(fixture.season_id))
         
         self.helper.layout = Layout(
             Fieldset(
@@ -211,6 +214,9 @@ class DynamicGoalForm(forms.ModelForm):
             
             self.fields['scorer'].queryset = all_players
             self.fields['assist'].queryset = all_players
+            suspended = suspended_player_ids(fixture.season_id)
+            label_suspended_players(self.fields['scorer'], suspended)
+            label_suspended_players(self.fields['assist'], suspended)
         
         self.helper = FormHelper()
         self.helper.form_tag = False  # We'll handle form submission manually
@@ -291,6 +297,7 @@ class DynamicBookingForm(forms.ModelForm):
             ).order_by('first_name', 'last_name')
             
             self.fields['player'].queryset = all_players
+            label_suspended_players(self.fields['player'], suspended_player_ids(fixture.season_id))
         
         
         self.helper = FormHelper()
@@ -410,3 +417,145 @@ class PlayerForm(forms.ModelForm):
             ),
             Submit('submit', 'Save Player', css_class='btn btn-primary btn-lg')
         )
+
+
+# Matchday editor (admin): every fixture of a date on one page. The player
+# fields are plain choice fields filled from squads loaded once for the whole
+# page, so rendering and validating them runs no queries.
+
+class MatchdayResultForm(forms.Form):
+    team1_goals = forms.IntegerField(min_value=0, max_value=99, required=False,
+                                     widget=forms.NumberInput(attrs={'class': 'vIntegerField'}))
+    team2_goals = forms.IntegerField(min_value=0, max_value=99, required=False,
+                                     widget=forms.NumberInput(attrs={'class': 'vIntegerField'}))
+    man_of_match = forms.TypedChoiceField(coerce=int, empty_value=None, required=False,
+                                          label="Man of the Match")
+    
+    def __init__(self, *args, player_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['man_of_match'].choices = [('', '---------')] + list(player_choices)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if (cleaned_data.get('team1_goals') is None) != (cleaned_data.get('team2_goals') is None):
+            raise forms.ValidationError("Enter both scores, or neither.")
+        return cleaned_data
+
+
+class MatchdayGoalForm(forms.Form):
+    id = forms.IntegerField(required=False, widget=forms.HiddenInput)
+    scorer = forms.TypedChoiceField(coerce=int)
+    assist = forms.TypedChoiceField(coerce=int, empty_value=None, required=False)
+    minute = forms.IntegerField(min_value=0, max_value=120,
+                                widget=forms.NumberInput(attrs={'class': 'vIntegerField'}))
+    own_goal = forms.BooleanField(required=False)
+    penalty = forms.BooleanField(required=False)
+    
+    def __init__(self, *args, player_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['scorer'].choices = [('', '---------')] + list(player_choices)
+        self.fields['assist'].choices = [('', '---------')] + list(player_choices)
+
+
+class MatchdayBookingForm(forms.Form):
+    id = forms.IntegerField(required=False, widget=forms.HiddenInput)
+    player = forms.TypedChoiceField(coerce=int)
+    card_type = forms.ChoiceField(choices=Booking.CARD_CHOICES)
+    minute = forms.IntegerField(min_value=0, max_value=120,
+                                widget=forms.NumberInput(attrs={'class': 'vIntegerField'}))
+    
+    def __init__(self, *args, player_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['player'].choices = [('', '---------')] + list(player_choices)
+
+
+MatchdayGoalFormSet = forms.formset_factory(MatchdayGoalForm, extra=4, can_delete=True)
+MatchdayBookingFormSet = forms.formset_factory(MatchdayBookingForm, extra=2, can_delete=True)
+
+
+class MatchdayEntry:
+    """The score, goal and booking forms of one fixture in the matchday editor"""
+    
+    def __init__(self, fixture, squads, suspended, data=None):
+        self.fixture = fixture
+        # Loaded with select_related; a fixture without a result caches None
+        self.result = getattr(fixture, 'result', None)
+        self.goals = list(self.result.goals.all()) if self.result else []
+        self.bookings = list(self.result.bookings.all()) if self.result else []
+        
+        player_choices = [
+            (club.name, [
+                (player['id'], f"{player['first_name']} {player['last_name']}"
+                               + (" (suspended)" if player['id'] in suspended else ""))
+                for player in squads.get(club.pk, [])
+            ])
+            for club in (fixture.team1, fixture.team2)
+        ]
+        prefix = f'fixture-{fixture.pk}'
+        result_initial = {}
+        if self.result:
+            result_initial = {
+                'team1_goals': self.result.team1_goals,
+                'team2_goals': self.result.team2_goals,
+                'man_of_match': self.result.man_of_match_id,
+            }
+        self.result_form = MatchdayResultForm(
+            data, prefix=prefix, initial=result_initial, player_choices=player_choices,
+        )
+        self.goal_formset = MatchdayGoalFormSet(
+            data, prefix=f'{prefix}-goals', form_kwargs={'player_choices': player_choices},
+            initial=[{'id': goal.pk, 'scorer': goal.scorer_id, 'assist': goal.assist_id, 'minute': goal.minute,
+                      'own_goal': goal.own_goal, 'penalty': goal.penalty} for goal in self.goals],
+        )
+        self.booking_formset = MatchdayBookingFormSet(
+            data, prefix=f'{prefix}-bookings', form_kwargs={'player_choices': player_choices},
+            initial=[{'id': booking.pk, 'player': booking.player_id, 'card_type': booking.card_type,
+                      'minute': booking.minute} for booking in self.bookings],
+        )
+    
+    def has_score(self):
+        return self.result_form.cleaned_data.get('team1_goals') is not None
+    
+    def is_valid(self):
+        valid = all([self.result_form.is_valid(), self.goal_formset.is_valid(), self.booking_formset.is_valid()])
+        if valid and not self.has_score():
+            if self.result is not None:
+                self.result_form.add_error(None, "Results cannot be removed here; delete them from the result page.")
+                return False
+            if self.goal_formset.has_changed() or self.booking_formset.has_changed():
+                self.result_form.add_error(None, "Enter the score to save goals and bookings.")
+                return False
+        return valid
+    
+    def save(self):
+        """Save the changed rows; returns whether anything was entered for this fixture"""
+        if not self.has_score():
+            return False
+        result = self.result or MatchResult(fixture=self.fixture)
+        if result.pk is None or self.result_form.has_changed():
+            result.team1_goals = self.result_form.cleaned_data['team1_goals']
+            result.team2_goals = self.result_form.cleaned_data['team2_goals']
+            result.man_of_match_id = self.result_form.cleaned_data['man_of_match']
+            result.save()
+        self._save_rows(self.goal_formset, {goal.pk: goal for goal in self.goals},
+                        lambda: Goal(match=result), ['scorer', 'assist', 'minute', 'own_goal', 'penalty'])
+        self._save_rows(self.booking_formset, {booking.pk: booking for booking in self.bookings},
+                        lambda: Booking(match=result), ['player', 'card_type', 'minute'])
+        return True
+    
+    @staticmethod
+    def _save_rows(formset, existing, new_row, fields):
+        deleted = formset.deleted_forms
+        for form in formset.forms:
+            if not form.has_changed():
+                continue
+            row = existing.get(form.cleaned_data.get('id'))
+            if form in deleted:
+                if row is not None:
+                    row.delete()
+                continue
+            row = row or new_row()
+            for field in fields:
+                value = form.cleaned_data[field]
+                setattr(row, f'{field}_id' if field in ('scorer', 'assist', 'player') else field, value)
+            row.save()
@@ -0,0 +1,200 @@
+"""
+League tables as they stood at a past date.
+
+Every STANDINGS_CHECKPOINT_MATCHES results (in kick-off order) a season's
+running totals are stored as a StandingsCheckpoint. A table as of a date
+starts from the latest checkpoint before it and replays the few results
+since, so it costs the same early or late in a season. Checkpoints the
+replay passes are stored on the way; signals delete the ones an edit makes
+stale.
+"""
+import random
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import Club, Season, Booking, MatchResult, StandingsCheckpoint
+from .utils import get_club_statistics
+
+
+TOTALS = [
+    'matches_played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'points',
+    'yellow_cards', 'red_cards', 'total_cards',
+]
+FORM_LENGTH = 5
+
+
+def parse_until(value):
+    """
+    The exclusive end of an as-of date: the following midnight for a day,
+    the moment itself for a date and time. None when it cannot be parsed.
+    """
+    try:
+        # parse_datetime() would also read a bare date, as midnight
+        day = parse_date(value)
+        moment = datetime.combine(day + timedelta(days=1), time.min) if day else parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def season_on(day):
+    """ID of the default competition's season covering a day, or None"""
+    return Season.objects.filter(
+        competition__name=settings.LEAGUE_NAME, start_date__lte=day, end_date__gte=day,
+    ).order_by('-start_date').values_list('pk', flat=True).first()
+
+
+def forget_checkpoints(season, since):
+    """Drop a season's checkpoints that include results kicked off at or after `since`"""
+    if season is not None and since is not None:
+        StandingsCheckpoint.objects.filter(season=season, through_date__gte=since).delete()
+
+
+def _results(season, after, until, limit):
+    """Up to `limit` results of a season, in kick-off order, after the (date, fixture ID) point and before `until`"""
+    results = MatchResult.objects.filter(fixture__season=season, fixture__date__lt=until)
+    if after is not None:
+        date, fixture_id = after
+        results = results.filter(Q(fixture__date__gt=date) | Q(fixture__date=date, fixture_id__gt=fixture_id))
+    rows = list(results.order_by('fixture__date', 'fixture_id').values_list(
+        'id', 'fixture_id', 'fixture__date', 'fixture__team1_id', 'fixture__team2_id', 'team1_goals', 'team2_goals',
+    )[:limit])
+
+    # Cards count for the booked player's club, as in calculate_table()
+    cards = defaultdict(list)
+    bookings = Booking.objects.filter(match_id__in=[row[0] for row in rows])
+    for match_id, club_id, card_type in bookings.values_list('match_id', 'player__club_id', 'card_type'):
+        cards[match_id].append((club_id, card_type))
+    return [
+        {'fixture_id': fixture_id, 'date': date, 'team1_id': team1_id, 'team2_id': team2_id,
+         'team1_goals': team1_goals, 'team2_goals': team2_goals, 'cards': cards[match_id]}
+        for match_id, fixture_id, date, team1_id, team2_id, team1_goals, team2_goals in rows
+    ]
+
+
+def _archived_results(snapshot, until):
+    """The results in an archive snapshot kicked off before `until`"""
+    for match in snapshot['matches']:
+        result = match['result']
+        if result is None or datetime.fromisoformat(match['date']) >= until:
+            continue
+        yield {
+            'team1_id': match['team1']['id'], 'team2_id': match['team2']['id'],
+            'team1_goals': result['team1_goals'], 'team2_goals': result['team2_goals'],
+            'cards': [(booking['player']['club']['id'], booking['card_type']) for booking in result['bookings']],
+        }
+
+
+def _blank():
+    return dict.fromkeys(TOTALS, 0) | {'form': ''}
+
+
+def _play(state, match):
+    """Add one result to the running totals, keyed by club ID as a string (as stored in JSON)"""
+    sides = [
+        (match['team1_id'], match['team1_goals'], match['team2_goals']),
+        (match['team2_id'], match['team2_goals'], match['team1_goals']),
+    ]
+    for club_id, scored, conceded in sides:
+        totals = state.setdefault(str(club_id), _blank())
+        totals['matches_played'] += 1
+        totals['goals_for'] += scored
+        totals['goals_against'] += conceded
+        if scored > conceded:
+            totals['wins'] += 1
+            totals['points'] += 3
+            outcome = 'W'
+        elif scored == conceded:
+            totals['draws'] += 1
+            totals['points'] += 1
+            outcome = 'D'
+        else:
+            totals['losses'] += 1
+            outcome = 'L'
+        # Latest first, like get_recent_form()
+        totals['form'] = (outcome + totals['form'])[:FORM_LENGTH]
+
+    for club_id, card_type in match['cards']:
+        totals = state.setdefault(str(club_id), _blank())
+        if card_type == 'yellow':
+            totals['yellow_cards'] += 1
+            totals['total_cards'] += 1
+        elif card_type == 'red':
+            totals['red_cards'] += 1
+            totals['total_cards'] += 3
+
+
+def _replay(season, until):
+    """Running totals of a season's results before `until`, storing the checkpoints passed"""
+    checkpoint = StandingsCheckpoint.objects.filter(
+        season=season, through_date__lt=until,
+    ).order_by('-matches').first()
+    if checkpoint is None:
+        state, played, after = {}, 0, None
+    else:
+        state, played = checkpoint.state, checkpoint.matches
+        after = (checkpoint.through_date, checkpoint.through_fixture_id)
+
+    every = max(settings.STANDINGS_CHECKPOINT_MATCHES, 1)
+    passed = []
+    while True:
+        matches = _results(season, after, until, every)
+        for match in matches:
+            _play(state, match)
+        if len(matches) < every:
+            break
+        played += every
+        after = (matches[-1]['date'], matches[-1]['fixture_id'])
+        passed.append(StandingsCheckpoint(
+            season_id=season, matches=played, through_date=after[0], through_fixture_id=after[1],
+            state={club_id: dict(totals) for club_id, totals in state.items()},
+        ))
+    # Another request may have stored the same checkpoints meanwhile
+    StandingsCheckpoint.objects.bulk_create(passed, ignore_conflicts=True)
+    return state
+
+
+def _tiebreaker_key(club_data):
+    # Same order as apply_tiebreakers(). Its head-to-head record is taken
+    # against every other club in the table, which comes to each club's own
+    # points and goal difference, already compared first.
+    random.seed(hash(club_data['club'].name))
+    return (-club_data['points'], -club_data['goal_difference'], -club_data['goals_for'],
+            club_data['total_cards'], random.random())
+
+
+def standings_as_of(season, until, snapshot=None):
+    """
+    A season's table counting only results kicked off before `until`, in the
+    layout of build_table_data(). An archived season's snapshot, when given,
+    is replayed in memory instead.
+    """
+    if snapshot is not None:
+        state = {}
+        for match in _archived_results(snapshot, until):
+            _play(state, match)
+    else:
+        state = _replay(season, until)
+
+    played = {int(club_id): totals for club_id, totals in state.items() if totals['matches_played']}
+    clubs = Club.objects.in_bulk(list(played))
+    table_data = []
+    for club_id, totals in played.items():
+        if club_id not in clubs:
+            continue
+        club_data = {'club': clubs[club_id], **totals}
+        club_data['goal_difference'] = club_data['goals_for'] - club_data['goals_against']
+        club_data.update(get_club_statistics(club_data))
+        table_data.append(club_data)
+
+    table_data.sort(key=_tiebreaker_key)
+    for position, club_data in enumerate(table_data, 1):
+        club_data['position'] = position
+    return table_data
@@ -0,0 +1,142 @@
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from .aggregates import refresh_player_stats
+from .logos import generate_logo_variants
+from .models import Job
+from .suspensions import refresh_suspensions
+
+
+# name -> (function, merge); merge combines the payloads of two coalesced
+# jobs, and without one the newer payload wins
+TASKS = {}
+
+
+def task(name, merge=None):
+    """Register a function that jobs can run; it is called with the job's payload as keyword arguments"""
+    def register(func):
+        TASKS[name] = (func, merge)
+        return func
+    return register
+
+
+def enqueue(name, payload, key=None):
+    """
+    Queue a task once the current transaction commits.
+
+    When a job with the same key is still waiting, the payloads are merged
+    into it instead of queuing another one, so a burst of saves for one
+    season is recomputed once. With JOB_QUEUE_INLINE the task runs straight
+    away in this process instead (development and tests).
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task {name!r}")
+    key = key or name
+
+    def send():
+        if settings.JOB_QUEUE_INLINE:
+            TASKS[name][0](**payload)
+        else:
+            _queue(name, payload, key)
+    transaction.on_commit(send)
+
+
+def _queue(name, payload, key):
+    merge = TASKS[name][1]
+    waiting = Job.objects.filter(key=key, status=Job.QUEUED).order_by('id').values('id', 'payload').first()
+    if waiting is not None:
+        merged = merge(waiting['payload'], payload) if merge else payload
+        # A worker may claim the job meanwhile; then this change needs a job of its own
+        if Job.objects.filter(pk=waiting['id'], status=Job.QUEUED).update(payload=merged):
+            return
+    Job.objects.create(name=name, key=key, payload=payload)
+
+
+def claim_jobs(worker, limit):
+    """Mark up to `limit` due jobs as running for `worker` and return their ids"""
+    claimed = []
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+    for job_id in due.values_list('id', flat=True)[:limit * 2]:
+        # The conditional update is the lock: only one worker can move the job out of queued
+        if Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker, started_at=now, attempts=F('attempts') + 1,
+        ):
+            claimed.append(job_id)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def run_job(job_id):
+    """
+    Run one claimed job, then mark it done, queue a retry with exponential
+    back-off or, after JOB_MAX_ATTEMPTS, mark it failed. Returns the status.
+    """
+    job = Job.objects.get(pk=job_id)
+    try:
+        TASKS[job.name][0](**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < settings.JOB_MAX_ATTEMPTS:
+            delay = settings.JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, locked_by='', run_after=timezone.now() + timedelta(seconds=delay), last_error=error,
+            )
+            return Job.QUEUED
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, finished_at=timezone.now(), last_error=error)
+        return Job.FAILED
+    Job.objects.filter(pk=job.pk).update(status=Job.DONE, finished_at=timezone.now())
+    return Job.DONE
+
+
+def requeue_stale_jobs():
+    """
+    Put back jobs whose worker died while running them, or mark them failed
+    once they have had JOB_MAX_ATTEMPTS. Returns the number requeued.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, started_at__lt=now - timedelta(seconds=settings.JOB_TIMEOUT_SECONDS))
+    stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status=Job.FAILED, finished_at=now,
+        last_error=f"Still running after {settings.JOB_TIMEOUT_SECONDS} seconds; its worker is assumed lost",
+    )
+    return stale.update(status=Job.QUEUED, locked_by='')
+
+
+def prune_jobs():
+    cutoff = timezone.now() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+    return Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).delete()[0]
+
+
+def queue_stats():
+    """Jobs per status and the age in seconds of the oldest queued job"""
+    counts = dict(Job.objects.order_by().values_list('status').annotate(total=Count('id')))
+    oldest = Job.objects.filter(status=Job.QUEUED).aggregate(oldest=Min('created_at'))['oldest']
+    stats = {status: counts.get(status, 0) for status, _label in Job.STATUS_CHOICES}
+    stats['oldest_queued_seconds'] = (timezone.now() - oldest).total_seconds() if oldest else 0
+    return stats
+
+
+def _merge_player_ids(queued, new):
+    if queued['player_ids'] is None or new['player_ids'] is None:
+        player_ids = None
+    else:
+        player_ids = sorted(set(queued['player_ids']) | set(new['player_ids']))
+    return dict(new, player_ids=player_ids)
+
+
+@task('refresh_player_data', merge=_merge_player_ids)
+def refresh_player_data(season, player_ids=None):
+    """Season statistics and suspensions of some players, or everyone when player_ids is None"""
+    refresh_player_stats(season, player_ids)
+    refresh_suspensions(season, player_ids)
+
+
+@task('generate_logo_variants')
+def resize_logo(name):
+    """Thumbnails of an uploaded club logo"""
+    generate_logo_variants(name)
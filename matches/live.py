@@ -0,0 +1,177 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import MatchEvent
+
+
+# Old events are pruned every this many events
+PRUNE_EVERY = 500
+# Events replayed to a reconnecting client at most
+REPLAY_LIMIT = 200
+
+
+def publish(fixture_id, kind, payload):
+    """
+    Record a live event for a fixture once the current transaction commits,
+    and wake the streams of this process. Other processes pick it up on
+    their next poll of the event table.
+    """
+    def send():
+        event = MatchEvent.objects.create(fixture_id=fixture_id, kind=kind, payload=payload)
+        if event.pk % PRUNE_EVERY == 0:
+            prune_events()
+        notify_hubs()
+    transaction.on_commit(send)
+
+
+def prune_events():
+    cutoff = timezone.now() - timedelta(hours=settings.LIVE_EVENT_RETENTION_HOURS)
+    MatchEvent.objects.filter(created_at__lt=cutoff).delete()
+
+
+def format_event(event):
+    """Serialize an event in the text/event-stream format"""
+    data = dict(event.payload, fixture=event.fixture_id)
+    return f"id: {event.pk}\nevent: {event.kind}\ndata: {json.dumps(data)}\n\n"
+
+
+class LiveHub:
+    """
+    Fans stored events out to the streams served by one event loop.
+
+    A single task reads new events from the MatchEvent table by sequence
+    number and puts them on the queues of the streams subscribed to that
+    fixture (or to every fixture), so an idle connection costs one queue and
+    the database sees one poll per interval however many clients are
+    connected. The task runs only while there are subscribers.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.subscribers = defaultdict(set)
+        self.wakeup = asyncio.Event()
+        self.last_seq = None
+        self.task = None
+
+    async def subscribe(self, fixture_id=None):
+        if self.last_seq is None:
+            self.last_seq = await latest_sequence()
+        queue = asyncio.Queue()
+        self.subscribers[fixture_id].add(queue)
+        if self.task is None:
+            self.task = self.loop.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, fixture_id, queue):
+        queues = self.subscribers.get(fixture_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[fixture_id]
+
+    async def run(self):
+        try:
+            while self.subscribers:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=settings.LIVE_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                await self.poll()
+        finally:
+            self.task = None
+            # The next subscriber starts from the latest event again
+            self.last_seq = None
+
+    async def poll(self):
+        events = MatchEvent.objects.filter(id__gt=self.last_seq).order_by('id')
+        async for event in events:
+            self.last_seq = event.pk
+            for queue in (*self.subscribers.get(event.fixture_id, ()), *self.subscribers.get(None, ())):
+                queue.put_nowait(event)
+
+
+_hubs = {}
+_hubs_lock = threading.Lock()
+
+
+def get_hub():
+    """The hub of the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _hubs_lock:
+        hub = _hubs.get(loop)
+        if hub is None:
+            hub = _hubs[loop] = LiveHub(loop)
+    return hub
+
+
+def notify_hubs():
+    """Wake every hub in this process; safe to call from any thread"""
+    with _hubs_lock:
+        hubs = list(_hubs.items())
+    for loop, hub in hubs:
+        try:
+            loop.call_soon_threadsafe(hub.wakeup.set)
+        except RuntimeError:
+            # Loop closed
+            with _hubs_lock:
+                _hubs.pop(loop, None)
+
+
+async def latest_sequence():
+    event = await MatchEvent.objects.order_by('-id').only('id').afirst()
+    return event.pk if event else 0
+
+
+async def event_stream(fixture_id=None, last_event_id=None, follow=True):
+    """
+    Yield server-sent events for one fixture, or all fixtures when
+    fixture_id is None.
+
+    A client reconnecting with Last-Event-ID first gets the events it
+    missed; a new client is given the current sequence number to resume
+    from. With follow, the stream then waits for new events, sending
+    comments to keep idle connections open through proxies, and ends after
+    LIVE_STREAM_MAX_SECONDS so clients reconnect and spread over workers
+    again. Without follow it ends straight away and the client's reconnects
+    act as polling.
+    """
+    hub = get_hub() if follow else None
+    queue = await hub.subscribe(fixture_id) if follow else None
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MS}\n\n"
+        if last_event_id is None:
+            last_sent = await latest_sequence()
+            yield f"id: {last_sent}\n\n"
+        else:
+            last_sent = last_event_id
+            missed = MatchEvent.objects.filter(id__gt=last_event_id)
+            if fixture_id is not None:
+                missed = missed.filter(fixture_id=fixture_id)
+            async for event in missed.order_by('id')[:REPLAY_LIMIT]:
+                yield format_event(event)
+                last_sent = event.pk
+        if not follow:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.LIVE_STREAM_MAX_SECONDS
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=min(settings.LIVE_KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event.pk > last_sent:
+                yield format_event(event)
+                last_sent = event.pk
+    finally:
+        if follow:
+            hub.unsubscribe(fixture_id, queue)
@@ -0,0 +1,78 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+
+# Square sizes (px) club logos are resized to. Pages show them at 24 to
+# 64px, and each size also serves as the 2x image for half its size
+LOGO_SIZES = (32, 48, 64, 96, 128)
+
+# Extension -> (Pillow format, save options, content type)
+LOGO_FORMATS = {
+    'webp': ('WEBP', {'quality': 85, 'method': 6}, 'image/webp'),
+    'png': ('PNG', {'optimize': True}, 'image/png'),
+}
+
+
+def variant_name(name, size, extension):
+    """Where a resized logo is stored: clubs/logos/a.png -> clubs/logos/variants/a-64.webp"""
+    path = PurePosixPath(name)
+    return str(path.parent / 'variants' / f'{path.stem}-{size}.{extension}')
+
+
+def variant_size(size):
+    """The smallest variant at least `size` pixels wide, or the largest one"""
+    return next((variant for variant in LOGO_SIZES if variant >= size), LOGO_SIZES[-1])
+
+
+def generate_logo_variants(name, force=False, storage=None):
+    """
+    Resize a logo to every size and format, cropped to a square like the
+    pages show it. Existing variants are kept unless `force` is given.
+
+    Returns the names of the variants written.
+    """
+    storage = storage or default_storage
+    missing = [
+        (size, extension) for size in LOGO_SIZES for extension in LOGO_FORMATS
+        if force or not storage.exists(variant_name(name, size, extension))
+    ]
+    if not missing:
+        return []
+
+    # Imported here so that serving pages does not load Pillow
+    from PIL import Image, ImageOps
+    with storage.open(name) as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image = image.convert('RGBA')
+
+    written = []
+    for size, extension in missing:
+        pillow_format, options, _content_type = LOGO_FORMATS[extension]
+        output = BytesIO()
+        ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS).save(output, pillow_format, **options)
+        target = variant_name(name, size, extension)
+        if storage.exists(target):
+            storage.delete(target)
+        saved = storage.save(target, ContentFile(output.getvalue()))
+        if saved != target:
+            # Another process wrote the same variant meanwhile
+            storage.delete(saved)
+        written.append(target)
+    return written
+
+
+def logo_url(name, size, extension):
+    """URL of a logo variant; the view behind it generates the variant on first request"""
+    return reverse('matches:club_logo', kwargs={'size': size, 'extension': extension, 'name': name})
+
+
+def logo_sources(name, size):
+    """1x and 2x URLs per format for showing a logo at `size` CSS pixels"""
+    sizes = (variant_size(size), variant_size(size * 2))
+    return {
+        extension: [logo_url(name, variant, extension) for variant in sizes]
+        for extension in LOGO_FORMATS
+    }
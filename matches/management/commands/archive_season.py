@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from matches.archive import archive_season
+from matches.models import Season
+
+
+class Command(BaseCommand):
+    help = "Freeze a finished season's table, leaderboards and match timelines into a read-only snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument('season', type=int, help='Season to archive (ID)')
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help="Delete the season's fixtures, results, goals, bookings and player stats once archived",
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Archive a season that has not ended yet',
+        )
+
+    def handle(self, *args, **options):
+        season = Season.objects.select_related('competition').filter(pk=options['season']).first()
+        if season is None:
+            raise CommandError(f"Unknown season {options['season']}")
+        if season.end_date >= timezone.localdate() and not options['force']:
+            raise CommandError(f"{season} ends on {season.end_date}; pass --force to archive it anyway")
+
+        try:
+            archive = archive_season(season, purge=options['purge'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        purged = ' and purged its rows' if archive.purged else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {season}: {archive.matches} matches in {len(archive.data) / 1024:.1f} KiB{purged}"
+        ))
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from matches.clashes import audit_clashes
+from matches.models import Fixture
+
+
+def _parse_date(value):
+    try:
+        return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = 'List every fixture clash: clubs scheduled twice at once or double-booked venues'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='Only audit fixtures on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Only audit fixtures before this date (YYYY-MM-DD)')
+        parser.add_argument(
+            '--fail',
+            action='store_true',
+            help='Exit with an error when clashes are found (useful in CI or deploy checks)',
+        )
+
+    def handle(self, *args, **options):
+        fixtures = Fixture.objects.all()
+        if options['date_from']:
+            fixtures = fixtures.filter(date__gte=_parse_date(options['date_from']))
+        if options['date_to']:
+            fixtures = fixtures.filter(date__lt=_parse_date(options['date_to']))
+
+        clashes = audit_clashes(fixtures)
+        for resource, earlier, later in clashes:
+            self.stdout.write(f"{resource}: [{earlier.pk}] {earlier}  <->  [{later.pk}] {later}")
+
+        if clashes:
+            message = f"Found {len(clashes)} clashes"
+            if options['fail']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No clashes found'))
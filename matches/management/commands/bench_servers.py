@@ -0,0 +1,157 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def _request(host, port, path, slow_seconds=0):
+    """
+    One HTTP/1.1 request on a fresh connection; returns the status code.
+
+    A slow client sends the first bytes of its request, then waits
+    slow_seconds before sending the rest, as a client on a poor mobile
+    connection would.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode()
+        if slow_seconds:
+            writer.write(request[:16])
+            await writer.drain()
+            await asyncio.sleep(slow_seconds)
+            request = request[16:]
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def _run_load(host, port, path, duration, concurrency, slow_clients, slow_seconds):
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+
+    async def fast_client():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                status = await asyncio.wait_for(_request(host, port, path), timeout=30)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = None
+            if status == 200:
+                latencies.append(time.monotonic() - started)
+            else:
+                errors += 1
+
+    async def slow_client():
+        while time.monotonic() < deadline:
+            try:
+                await asyncio.wait_for(_request(host, port, path, slow_seconds), timeout=slow_seconds + 30)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                await asyncio.sleep(0.1)
+
+    tasks = [asyncio.create_task(slow_client()) for _ in range(slow_clients)]
+    # Let the slow clients occupy their connections first
+    await asyncio.sleep(min(slow_seconds / 2, 1) if slow_clients else 0)
+    started = time.monotonic()
+    await asyncio.gather(*(fast_client() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50': _percentile(latencies, 0.50) * 1000,
+        'p99': _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _wait_for_port(host, port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError("Server exited during startup")
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server did not start listening on {host}:{port}")
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput and latency of the WSGI (gthread) and ASGI (uvicorn) server '
+        'profiles for one URL while many slow clients hold connections open'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/fixtures/?limit=20', help='URL to request')
+        parser.add_argument('--profiles', default='wsgi,asgi', help='Comma-separated server profiles to compare')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds of load per profile')
+        parser.add_argument('--concurrency', type=int, default=20, help='Clients sending requests back to back')
+        parser.add_argument('--slow-clients', type=int, default=50, help='Clients that trickle their requests')
+        parser.add_argument('--slow-seconds', type=float, default=2, help='How long a slow client takes to send its request')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers per profile')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        host, port = '127.0.0.1', options['port']
+        results = {}
+        for profile in [profile.strip() for profile in options['profiles'].split(',') if profile.strip()]:
+            if profile not in ('wsgi', 'asgi'):
+                raise CommandError(f"Unknown profile {profile!r}, expected wsgi or asgi")
+            env = dict(
+                os.environ,
+                SERVER_PROFILE=profile,
+                GUNICORN_BIND=f'{host}:{port}',
+                GUNICORN_WORKERS=str(options['workers']),
+                GUNICORN_THREADS=str(options['threads']),
+            )
+            self.stdout.write(f"Starting {profile} server...")
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '--config', str(Path(settings.BASE_DIR) / 'gunicorn_config.py')],
+                cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_for_port(host, port, server)
+                # Warm up imports and connections before measuring
+                asyncio.run(_run_load(host, port, options['path'], 1, 2, 0, 0))
+                results[profile] = asyncio.run(_run_load(
+                    host, port, options['path'], options['duration'], options['concurrency'],
+                    options['slow_clients'], options['slow_seconds'],
+                ))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+        self.stdout.write(
+            f"\n{options['path']}: {options['concurrency']} clients, "
+            f"{options['slow_clients']} slow clients ({options['slow_seconds']}s each), "
+            f"{options['workers']} workers\n"
+        )
+        self.stdout.write(f"{'profile':<8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<8}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10.1f}"
+                f"{result['p50']:>10.1f}{result['p99']:>10.1f}"
+            )
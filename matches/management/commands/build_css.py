@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from matches.stylesheet import build_stylesheet, stylesheet_path, write_stylesheet
+
+
+class Command(BaseCommand):
+    help = (
+        'Build static/css/site.css with the Tailwind CLI, keeping only the utilities the templates and '
+        'scripts use (commit the result)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Fail if the committed stylesheet is out of date')
+
+    def handle(self, *args, **options):
+        try:
+            if options['check']:
+                path = stylesheet_path()
+                if not path.exists() or path.read_text(encoding='utf-8') != build_stylesheet():
+                    raise CommandError(f"{path.name} is out of date; run build_css")
+                self.stdout.write(self.style.SUCCESS(f"{path.name} is up to date"))
+                return
+
+            path, size, changed = write_stylesheet()
+        except RuntimeError as error:
+            raise CommandError(str(error))
+        state = 'Built' if changed else 'Unchanged'
+        self.stdout.write(self.style.SUCCESS(f"{state} {path.name} ({size / 1024:.1f} KiB)"))
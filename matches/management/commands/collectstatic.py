@@ -0,0 +1,18 @@
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+from django.core.management import call_command
+
+
+class Command(CollectStaticCommand):
+    help = 'Build the site stylesheet, then collect static files in STATIC_ROOT'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--skip-css', action='store_true',
+            help='Collect the committed stylesheet as it is instead of rebuilding it (no Tailwind CLI needed)',
+        )
+
+    def handle(self, **options):
+        if not options['skip_css'] and not options['dry_run']:
+            call_command('build_css', verbosity=options['verbosity'], stdout=self.stdout)
+        return super().handle(**options)
@@ -0,0 +1,130 @@
+import time
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from matches.models import Club, Fixture, Season
+from matches.scheduling import generate_fixtures
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+def _parse_time(value):
+    try:
+        return datetime.strptime(value.strip(), '%H:%M').time()
+    except ValueError:
+        raise CommandError(f"Invalid kick-off time {value!r}, expected HH:MM")
+
+
+class Command(BaseCommand):
+    help = 'Generate a round-robin fixture schedule respecting kick-off slots, venues and matchdays'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First matchday (YYYY-MM-DD)')
+        parser.add_argument(
+            '--club',
+            action='append',
+            dest='clubs',
+            help='Club to include (repeatable). Defaults to every club.',
+        )
+        parser.add_argument(
+            '--slots',
+            default='06:00,06:45',
+            help='Comma separated kick-off times on each matchday (default: 06:00,06:45)',
+        )
+        parser.add_argument(
+            '--venue',
+            action='append',
+            dest='venues',
+            help='Venue available on each matchday (repeatable). Defaults to the fixture default venue.',
+        )
+        parser.add_argument(
+            '--interval-days',
+            type=int,
+            default=7,
+            help='Days between matchdays (default: 7)',
+        )
+        parser.add_argument(
+            '--skip-date',
+            action='append',
+            default=[],
+            dest='skip_dates',
+            help='Matchday to leave out, e.g. a public holiday (repeatable, YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--single',
+            action='store_true',
+            help='Generate a single round-robin instead of home and away legs',
+        )
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='ID of the season the fixtures belong to. Defaults to the season the first matchday falls in.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the schedule without saving it',
+        )
+
+    def handle(self, *args, **options):
+        clubs = Club.objects.all()
+        if options['clubs']:
+            clubs = clubs.filter(name__in=options['clubs'])
+            missing = set(options['clubs']) - set(clubs.values_list('name', flat=True))
+            if missing:
+                raise CommandError(f"Unknown clubs: {', '.join(sorted(missing))}")
+        club_names = dict(clubs.values_list('id', 'name'))
+        if len(club_names) < 2:
+            raise CommandError('At least two clubs are needed to build a schedule.')
+
+        if options['interval_days'] < 1:
+            raise CommandError('--interval-days must be at least 1.')
+
+        season = None
+        if options['season']:
+            season = Season.objects.filter(pk=options['season']).first()
+            if season is None:
+                raise CommandError(f"Unknown season {options['season']}")
+
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                fixtures = generate_fixtures(
+                    list(club_names),
+                    _parse_date(options['start']),
+                    [_parse_time(value) for value in options['slots'].split(',') if value.strip()],
+                    options['venues'] or [Fixture._meta.get_field('venue').default],
+                    interval_days=options['interval_days'],
+                    skip_dates=[_parse_date(value) for value in options['skip_dates']],
+                    double=not options['single'],
+                    batch_size=options['batch_size'],
+                    commit=not options['dry_run'],
+                    season=season,
+                )
+        except ValidationError as error:
+            raise CommandError(' '.join(error.messages))
+        elapsed = time.perf_counter() - started
+
+        if options['dry_run'] or options['verbosity'] > 1:
+            for fixture in fixtures:
+                self.stdout.write(
+                    f"  {timezone.localtime(fixture.date):%Y-%m-%d %H:%M}  {club_names[fixture.team1_id]} vs "
+                    f"{club_names[fixture.team2_id]} @ {fixture.venue}"
+                )
+
+        matchdays = len({timezone.localtime(fixture.date).date() for fixture in fixtures})
+        action = 'Planned' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {len(fixtures)} fixtures for {len(club_names)} clubs over {matchdays} matchdays "
+            f"in {elapsed:.2f}s"
+        ))
+
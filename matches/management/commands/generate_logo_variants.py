@@ -0,0 +1,39 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from matches.logos import generate_logo_variants
+from matches.models import Club
+
+
+class Command(BaseCommand):
+    help = 'Write the resized WebP and PNG variants of every club logo that is missing them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Logos resized in parallel (default: one per CPU)')
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        names = list(Club.objects.exclude(logo='').exclude(logo__isnull=True).values_list('logo', flat=True))
+
+        def generate(name):
+            try:
+                return name, generate_logo_variants(name, force=options['force']), None
+            except OSError as error:
+                return name, [], error
+
+        written = failed = 0
+        # Pillow releases the GIL while it decodes, resizes and encodes, so threads run in parallel
+        with ThreadPoolExecutor(max(options['workers'], 1)) as executor:
+            for name, variants, error in executor.map(generate, names):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error}")
+                elif variants and options['verbosity'] > 1:
+                    self.stdout.write(f"{name}: {len(variants)} variants")
+                written += len(variants)
+        message = f"Wrote {written} variants for {len(names)} logos"
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{message}; {failed} could not be read"))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,501 @@
+import csv
+import json
+import time
+from collections import defaultdict
+from datetime import datetime, time as dt_time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from matches.aggregates import rebuild_player_stats
+from matches.models import Club, Player, Season, Fixture, MatchResult, Booking, Goal, StandingsCheckpoint
+from matches.search import rebuild_index
+from matches.suspensions import rebuild_suspensions
+from matches.versioning import bump_versions, season_label
+
+
+# Import order matters: every kind only references kinds listed before it
+KINDS = ['clubs', 'players', 'fixtures', 'results', 'goals', 'bookings']
+KIND_MODELS = {
+    'clubs': Club, 'players': Player, 'fixtures': Fixture,
+    'results': MatchResult, 'goals': Goal, 'bookings': Booking,
+}
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _key(value):
+    return _text(value).casefold()
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return _key(value) in TRUE_VALUES
+
+
+def _split_name(row):
+    """Return (first_name, last_name) from either split columns or a single `name`"""
+    if _text(row.get('first_name')):
+        return _text(row.get('first_name')), _text(row.get('last_name'))
+    parts = _text(row.get('name')).split()
+    if not parts:
+        return '', ''
+    return parts[0], ' '.join(parts[1:])
+
+
+def _parse_when(row):
+    """Parse a kick-off from a `date` column, optionally combined with a `time` column"""
+    raw_date = _text(row.get('date'))
+    raw_time = _text(row.get('time'))
+    if raw_time:
+        raw_date = f"{raw_date} {raw_time}"
+
+    value = parse_datetime(raw_date)
+    if value is None:
+        day = parse_date(raw_date)
+        if day is None:
+            raise ValueError(f"invalid date {raw_date!r}")
+        value = datetime.combine(day, dt_time.min)
+
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def iter_rows(path, kind):
+    """
+    Stream rows for one kind from a file.
+
+    CSV and JSON Lines files are read row by row. A plain JSON file may hold
+    either a list of rows or an object keyed by kind.
+    """
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        with path.open(newline='', encoding='utf-8-sig') as handle:
+            yield from csv.DictReader(handle)
+    elif suffix in ('.jsonl', '.ndjson'):
+        with path.open(encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    elif suffix == '.json':
+        with path.open(encoding='utf-8') as handle:
+            data = json.load(handle)
+        if isinstance(data, dict):
+            data = data.get(kind, [])
+        yield from data
+    else:
+        raise CommandError(f"Unsupported file type: {path}")
+
+
+def detect_kinds(path):
+    """Work out which kinds a file holds from its name (e.g. `players.csv`, `2025_goals.jsonl`)"""
+    if path.suffix.lower() == '.json':
+        with path.open(encoding='utf-8') as handle:
+            data = json.load(handle)
+        if isinstance(data, dict):
+            return [kind for kind in KINDS if kind in data]
+
+    stem = path.stem.lower()
+    for kind in KINDS:
+        if kind in stem:
+            return [kind]
+    raise CommandError(
+        f"Cannot tell what {path.name} contains; name it after one of {', '.join(KINDS)} or pass --kind"
+    )
+
+
+class Command(BaseCommand):
+    help = 'Bulk import clubs, players, fixtures, results, goals and bookings from CSV or JSON files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help='CSV, JSON or JSON Lines files to import')
+        parser.add_argument(
+            '--kind',
+            choices=KINDS,
+            help='Treat every file as this kind instead of detecting it from the file name',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows written per bulk query and transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Update rows that already exist instead of skipping them; '
+                 'goals and bookings of re-imported matches are replaced rather than skipped',
+        )
+        parser.add_argument(
+            '--season',
+            type=int,
+            help='ID of the season new fixtures belong to. Defaults to the season each date falls in.',
+        )
+        parser.add_argument(
+            '--venue',
+            default=Fixture._meta.get_field('venue').default,
+            help='Venue used for fixtures that do not specify one',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = max(options['batch_size'], 1)
+        self.upsert = options['upsert']
+        self.default_venue = options['venue']
+        self.season = None
+        if options['season']:
+            self.season = Season.objects.filter(pk=options['season']).first()
+            if self.season is None:
+                raise CommandError(f"Unknown season {options['season']}")
+        self.date_seasons = {}
+
+        sources = defaultdict(list)
+        for name in options['files']:
+            path = Path(name)
+            if not path.exists():
+                raise CommandError(f"File not found: {path}")
+            for kind in ([options['kind']] if options['kind'] else detect_kinds(path)):
+                sources[kind].append(path)
+
+        # Name -> ID maps, built once from the database and kept up to date as rows are inserted
+        self.club_ids = None
+        self.player_ids = None
+        self.fixture_ids = None
+        self.fixture_seasons = None
+        self.result_ids = None
+        self.cleared_matches = {'goals': set(), 'bookings': set()}
+        self.recorded_matches = {}
+
+        started = time.perf_counter()
+        total = 0
+        for kind in KINDS:
+            for path in sources.get(kind, []):
+                kind_started = time.perf_counter()
+                stats = getattr(self, f'import_{kind}')(iter_rows(path, kind))
+                elapsed = time.perf_counter() - kind_started
+                total += stats['rows']
+                self.stdout.write(
+                    f"{path.name} ({kind}): {stats['created']} created, {stats['updated']} updated, "
+                    f"{stats['skipped']} skipped in {elapsed:.2f}s "
+                    f"({stats['rows'] / max(elapsed, 1e-9):,.0f} rows/s)"
+                )
+
+        # Bulk writes skip model signals, so versions are bumped and derived
+        # data is rebuilt once at the end
+        bump_versions(*(KIND_MODELS[kind] for kind in sources))
+        if any(kind in sources for kind in ('fixtures', 'results', 'goals', 'bookings')):
+            bump_versions(*(season_label(pk) for pk in Season.objects.values_list('pk', flat=True)))
+            StandingsCheckpoint.objects.all().delete()
+        if any(kind in sources for kind in ('results', 'goals', 'bookings')):
+            rebuild_player_stats()
+            rebuild_suspensions()
+        if any(kind in sources for kind in ('clubs', 'players', 'fixtures', 'results')):
+            rebuild_index()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {total} rows in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)"
+        ))
+
+    # Lookup maps
+
+    def load_club_ids(self):
+        if self.club_ids is None:
+            self.club_ids = {
+                name.casefold(): pk for pk, name in Club.objects.values_list('id', 'name').iterator()
+            }
+        return self.club_ids
+
+    def load_player_ids(self):
+        if self.player_ids is None:
+            self.player_ids = {}
+            rows = Player.objects.values_list('id', 'club_id', 'first_name', 'last_name').iterator()
+            for pk, club_id, first_name, last_name in rows:
+                self.player_ids[self.player_key(club_id, first_name, last_name)] = pk
+        return self.player_ids
+
+    def load_fixture_ids(self):
+        if self.fixture_ids is None:
+            self.fixture_ids, self.fixture_seasons = {}, {}
+            rows = Fixture.objects.values_list('id', 'team1_id', 'team2_id', 'date', 'season_id').iterator()
+            for pk, team1_id, team2_id, date, season_id in rows:
+                self.fixture_ids[(team1_id, team2_id, date)] = pk
+                self.fixture_seasons[pk] = season_id
+        return self.fixture_ids
+
+    def season_id(self, when):
+        """The --season given, or the season a kick-off falls in"""
+        if self.season is not None:
+            return self.season.pk
+        day = timezone.localtime(when).date()
+        if day not in self.date_seasons:
+            try:
+                self.date_seasons[day] = Season.for_date(day).pk
+            except ValidationError as error:
+                raise CommandError(' '.join(error.messages))
+        return self.date_seasons[day]
+
+    def load_result_ids(self):
+        if self.result_ids is None:
+            self.result_ids = dict(
+                MatchResult.objects.values_list('fixture_id', 'id').iterator()
+            )
+        return self.result_ids
+
+    @staticmethod
+    def player_key(club_id, first_name, last_name):
+        return club_id, f"{first_name} {last_name}".strip().casefold()
+
+    def club_id(self, name):
+        try:
+            return self.load_club_ids()[_key(name)]
+        except KeyError:
+            raise CommandError(f"Unknown club {name!r}")
+
+    def fixture_id(self, row):
+        team1_id = self.club_id(row.get('team1'))
+        team2_id = self.club_id(row.get('team2'))
+        key = (team1_id, team2_id, _parse_when(row))
+        try:
+            return self.load_fixture_ids()[key], team1_id, team2_id
+        except KeyError:
+            raise CommandError(
+                f"No fixture {row.get('team1')} vs {row.get('team2')} on {row.get('date')}"
+            )
+
+    def squad_player_id(self, name, club_ids, required=True):
+        """Resolve a player by full name within the given clubs' squads"""
+        name = _text(name)
+        if not name:
+            if required:
+                raise CommandError("Missing player name")
+            return None
+        players = self.load_player_ids()
+        for club_id in club_ids:
+            pk = players.get((club_id, name.casefold()))
+            if pk is not None:
+                return pk
+        raise CommandError(f"Unknown player {name!r}")
+
+    def result_id(self, row):
+        fixture_id, team1_id, team2_id = self.fixture_id(row)
+        try:
+            result_id = self.load_result_ids()[fixture_id]
+        except KeyError:
+            raise CommandError(
+                f"No result for {row.get('team1')} vs {row.get('team2')} on {row.get('date')}"
+            )
+        clubs = [team1_id, team2_id]
+        if _text(row.get('club')):
+            clubs.insert(0, self.club_id(row['club']))
+        return result_id, clubs
+
+    # Batching
+
+    def batched(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def write(self, model, new_objects, changed_objects=(), update_fields=()):
+        if changed_objects and any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+            # bulk_update does not apply auto_now
+            now = timezone.now()
+            for obj in changed_objects:
+                obj.updated_at = now
+            update_fields = [*update_fields, 'updated_at']
+        with transaction.atomic():
+            created = model.objects.bulk_create(new_objects, batch_size=self.batch_size)
+            if changed_objects:
+                model.objects.bulk_update(changed_objects, update_fields, batch_size=self.batch_size)
+        return created
+
+    @staticmethod
+    def new_stats():
+        return {'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0}
+
+    # Importers, one per kind
+
+    def import_clubs(self, rows):
+        stats = self.new_stats()
+        clubs = self.load_club_ids()
+        for batch in self.batched(rows):
+            stats['rows'] += len(batch)
+            new = {}
+            for row in batch:
+                name = _text(row.get('name'))
+                if not name or name.casefold() in clubs or name.casefold() in new:
+                    stats['skipped'] += 1
+                    continue
+                new[name.casefold()] = Club(name=name)
+            for club in self.write(Club, list(new.values())):
+                clubs[club.name.casefold()] = club.pk
+            stats['created'] += len(new)
+        return stats
+
+    def import_players(self, rows):
+        stats = self.new_stats()
+        players = self.load_player_ids()
+        for batch in self.batched(rows):
+            stats['rows'] += len(batch)
+            new, changed = {}, []
+            for row in batch:
+                club_id = self.club_id(row.get('club'))
+                first_name, last_name = _split_name(row)
+                key = self.player_key(club_id, first_name, last_name)
+                position = _text(row.get('position')).upper()
+                if key in new:
+                    stats['skipped'] += 1
+                elif key in players:
+                    if self.upsert and position:
+                        changed.append(Player(id=players[key], position=position))
+                    else:
+                        stats['skipped'] += 1
+                else:
+                    new[key] = Player(
+                        first_name=first_name, last_name=last_name,
+                        position=position, club_id=club_id,
+                    )
+            for player in self.write(Player, list(new.values()), changed, ['position']):
+                players[self.player_key(player.club_id, player.first_name, player.last_name)] = player.pk
+            stats['created'] += len(new)
+            stats['updated'] += len(changed)
+        return stats
+
+    def import_fixtures(self, rows):
+        stats = self.new_stats()
+        fixtures = self.load_fixture_ids()
+        for batch in self.batched(rows):
+            stats['rows'] += len(batch)
+            new, changed = {}, []
+            for row in batch:
+                key = (self.club_id(row.get('team1')), self.club_id(row.get('team2')), _parse_when(row))
+                venue = _text(row.get('venue')) or self.default_venue
+                if key in new:
+                    stats['skipped'] += 1
+                elif key in fixtures:
+                    if self.upsert:
+                        changed.append(Fixture(id=fixtures[key], venue=venue))
+                    else:
+                        stats['skipped'] += 1
+                else:
+                    new[key] = Fixture(
+                        team1_id=key[0], team2_id=key[1], date=key[2], venue=venue,
+                        season_id=self.season_id(key[2]),
+                    )
+            for fixture in self.write(Fixture, list(new.values()), changed, ['venue']):
+                fixtures[(fixture.team1_id, fixture.team2_id, fixture.date)] = fixture.pk
+                self.fixture_seasons[fixture.pk] = fixture.season_id
+            stats['created'] += len(new)
+            stats['updated'] += len(changed)
+        return stats
+
+    def import_results(self, rows):
+        stats = self.new_stats()
+        results = self.load_result_ids()
+        for batch in self.batched(rows):
+            stats['rows'] += len(batch)
+            new, changed = {}, []
+            for row in batch:
+                fixture_id, team1_id, team2_id = self.fixture_id(row)
+                result = MatchResult(
+                    fixture_id=fixture_id,
+                    season_id=self.fixture_seasons[fixture_id],
+                    team1_goals=int(row.get('team1_goals') or 0),
+                    team2_goals=int(row.get('team2_goals') or 0),
+                    man_of_match_id=self.squad_player_id(
+                        row.get('man_of_match'), [team1_id, team2_id], required=False
+                    ),
+                )
+                if fixture_id in new:
+                    stats['skipped'] += 1
+                elif fixture_id in results:
+                    if self.upsert:
+                        result.id = results[fixture_id]
+                        changed.append(result)
+                    else:
+                        stats['skipped'] += 1
+                else:
+                    new[fixture_id] = result
+            created = self.write(
+                MatchResult, list(new.values()), changed,
+                ['team1_goals', 'team2_goals', 'man_of_match'],
+            )
+            for result in created:
+                results[result.fixture_id] = result.pk
+            stats['created'] += len(new)
+            stats['updated'] += len(changed)
+        return stats
+
+    def load_recorded_matches(self, model, kind):
+        """Matches that already had goals (or bookings) before this import started"""
+        if kind not in self.recorded_matches:
+            self.recorded_matches[kind] = set(model.objects.values_list('match_id', flat=True).distinct().iterator())
+        return self.recorded_matches[kind]
+
+    def import_events(self, model, kind, rows, build):
+        """
+        Shared importer for goals and bookings. Events have no natural key, so
+        a match's events are imported as a whole: matches that already have
+        some are skipped, or with --upsert have theirs replaced.
+        """
+        stats = self.new_stats()
+        cleared = self.cleared_matches[kind]
+        recorded = self.load_recorded_matches(model, kind)
+        for batch in self.batched(rows):
+            stats['rows'] += len(batch)
+            new, replace = [], set()
+            for row in batch:
+                match_id, clubs = self.result_id(row)
+                if match_id in recorded and not self.upsert:
+                    stats['skipped'] += 1
+                    continue
+                if self.upsert and match_id not in cleared:
+                    replace.add(match_id)
+                    cleared.add(match_id)
+                new.append(build(row, match_id, clubs))
+            with transaction.atomic():
+                if replace:
+                    model.objects.filter(match_id__in=replace).delete()
+                model.objects.bulk_create(new, batch_size=self.batch_size)
+                MatchResult.objects.filter(id__in={event.match_id for event in new}).update(updated_at=timezone.now())
+            stats['created'] += len(new)
+        return stats
+
+    def import_goals(self, rows):
+        def build(row, match_id, clubs):
+            return Goal(
+                match_id=match_id,
+                scorer_id=self.squad_player_id(row.get('scorer'), clubs),
+                assist_id=self.squad_player_id(row.get('assist'), clubs, required=False),
+                minute=int(row.get('minute') or 0),
+                own_goal=_flag(row.get('own_goal')),
+                penalty=_flag(row.get('penalty')),
+            )
+        return self.import_events(Goal, 'goals', rows, build)
+
+    def import_bookings(self, rows):
+        def build(row, match_id, clubs):
+            card_type = _key(row.get('card_type'))
+            if card_type not in dict(Booking.CARD_CHOICES):
+                raise CommandError(f"Invalid card type {row.get('card_type')!r}")
+            return Booking(
+                match_id=match_id,
+                player_id=self.squad_player_id(row.get('player'), clubs),
+                card_type=card_type,
+                minute=int(row.get('minute') or 0),
+            )
+        return self.import_events(Booking, 'bookings', rows, build)
@@ -0,0 +1,109 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# What a worker imports before it serves its first request: the
+# application with its middleware, then the URLconf and every view module
+BOOT_SCRIPT = """
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'league_manager.settings')
+from league_manager.{profile} import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+"""
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure_boot(profile='wsgi'):
+    """
+    Boot the application in a fresh interpreter under `-X importtime`.
+
+    Returns (wall seconds, {module: (self us, cumulative us)}).
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT.format(profile=profile)],
+        cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if completed.returncode:
+        raise CommandError(f"Booting the application failed:\n{completed.stderr[-2000:]}")
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match[4]] = (int(match[1]), int(match[2]))
+    return elapsed, modules
+
+
+def boot_report(runs=3, profile='wsgi'):
+    """
+    Median import time over several boots: total and per module.
+
+    Returns {'wall_ms', 'import_ms', 'modules': {module: (self ms, cumulative ms)}}.
+    """
+    boots = [measure_boot(profile) for _ in range(runs)]
+    names = set.intersection(*(set(modules) for _elapsed, modules in boots))
+    modules = {
+        name: (
+            statistics.median(modules[name][0] for _elapsed, modules in boots) / 1000,
+            statistics.median(modules[name][1] for _elapsed, modules in boots) / 1000,
+        )
+        for name in names
+    }
+    return {
+        'wall_ms': statistics.median(elapsed for elapsed, _modules in boots) * 1000,
+        'import_ms': statistics.median(
+            sum(self_us for self_us, _cumulative in modules.values()) for _elapsed, modules in boots
+        ) / 1000,
+        'modules': modules,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Report how long a worker spends importing modules before its first request '
+        '(python -X importtime), by package and by slowest module'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Boots to take the median of')
+        parser.add_argument('--profile', choices=['wsgi', 'asgi'], default='wsgi', help='Application to boot')
+        parser.add_argument('--top', type=int, default=15, help='Number of modules to list')
+        parser.add_argument(
+            '--budget-ms', type=float,
+            help='Fail when the total import time exceeds this (default IMPORT_TIME_BUDGET_MS)',
+        )
+
+    def handle(self, *args, **options):
+        report = boot_report(max(options['runs'], 1), options['profile'])
+        modules = report['modules']
+
+        packages = defaultdict(float)
+        for name, (self_ms, _cumulative_ms) in modules.items():
+            packages[name.split('.')[0]] += self_ms
+        self.stdout.write(f"{'package':<40}{'self ms':>10}")
+        for package, self_ms in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"{package:<40}{self_ms:>10.1f}")
+
+        self.stdout.write(f"\n{'module':<40}{'self ms':>10}{'cumul. ms':>10}")
+        slowest = sorted(modules.items(), key=lambda item: -item[1][0])[:options['top']]
+        for name, (self_ms, cumulative_ms) in slowest:
+            self.stdout.write(f"{name:<40}{self_ms:>10.1f}{cumulative_ms:>10.1f}")
+
+        budget = options['budget_ms'] or settings.IMPORT_TIME_BUDGET_MS
+        self.stdout.write(
+            f"\n{len(modules)} modules, {report['import_ms']:.0f} ms importing "
+            f"({report['wall_ms']:.0f} ms to boot), budget {budget:.0f} ms"
+        )
+        if report['import_ms'] > budget:
+            raise CommandError(f"Import time {report['import_ms']:.0f} ms exceeds the budget of {budget:.0f} ms")
@@ -0,0 +1,16 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from matches.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of clubs, players and fixtures'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} entries in {time.perf_counter() - started:.2f}s"
+        ))
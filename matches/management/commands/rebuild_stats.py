@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from matches.aggregates import rebuild_player_stats, refresh_player_stats
+from matches.suspensions import rebuild_suspensions, refresh_suspensions
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-player season statistics and suspensions from goals, bookings and results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, help='Only recompute this season (ID)')
+
+    def handle(self, *args, **options):
+        if options['season']:
+            refresh_player_stats(options['season'])
+            refresh_suspensions(options['season'])
+            self.stdout.write(self.style.SUCCESS(f"Recomputed player statistics and suspensions for {options['season']}"))
+        else:
+            rebuild_player_stats()
+            rebuild_suspensions()
+            self.stdout.write(self.style.SUCCESS('Recomputed player statistics and suspensions for all seasons'))
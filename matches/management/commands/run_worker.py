@@ -0,0 +1,105 @@
+import os
+import signal
+import socket
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from matches.jobs import claim_jobs, prune_jobs, queue_stats, requeue_stale_jobs, run_job
+
+
+# Stale jobs are requeued and old ones pruned this often (seconds)
+MAINTENANCE_INTERVAL = 60
+
+
+def _execute(job_id):
+    try:
+        return job_id, run_job(job_id)
+    finally:
+        # Every pool thread or process holds its own connection
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (statistics and suspension refreshes) on a thread or process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Jobs run at the same time')
+        parser.add_argument(
+            '--pool', choices=['thread', 'process'], default='thread',
+            help='Run jobs in threads, or in processes to use several CPUs',
+        )
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due instead of waiting for more')
+        parser.add_argument('--stats', action='store_true', help='Print the queue depth and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for status, value in queue_stats().items():
+                self.stdout.write(f"{status:<22}{value:>10.0f}")
+            return
+
+        self.verbosity = options['verbosity']
+        self.stopping = False
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.stop)
+
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        concurrency = max(options['concurrency'], 1)
+        # Children must open their own connections rather than share the parent's
+        connections.close_all()
+        if options['pool'] == 'process':
+            executor = ProcessPoolExecutor(concurrency, initializer=django.setup)
+        else:
+            executor = ThreadPoolExecutor(concurrency, thread_name_prefix='job')
+        self.stdout.write(f"Worker {worker} running up to {concurrency} jobs in a {options['pool']} pool")
+
+        counts = Counter()
+        running = set()
+        last_maintenance = 0
+        try:
+            while not self.stopping:
+                if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+                    requeue_stale_jobs()
+                    prune_jobs()
+                    last_maintenance = time.monotonic()
+
+                free = concurrency - len(running)
+                job_ids = claim_jobs(worker, free) if free else []
+                running.update(executor.submit(_execute, job_id) for job_id in job_ids)
+                if not running:
+                    if options['burst']:
+                        break
+                    time.sleep(settings.JOB_POLL_INTERVAL)
+                    continue
+
+                done, running = wait(running, timeout=settings.JOB_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    counts[self.report(future)] += 1
+        finally:
+            # Let running jobs finish; anything left queued is picked up by the next worker
+            for future in running:
+                counts[self.report(future)] += 1
+            executor.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker stopped: {counts['done']} done, {counts['queued']} to retry, "
+            f"{counts['failed']} failed, {counts['error']} errors"
+        ))
+
+    def report(self, future):
+        try:
+            job_id, status = future.result()
+        except Exception as error:
+            # The job could not be loaded or updated; it is requeued once it goes stale
+            self.stderr.write(f"Worker error: {error}")
+            return 'error'
+        if status != 'done' or self.verbosity > 1:
+            self.stdout.write(f"Job {job_id}: {'retry queued' if status == 'queued' else status}")
+        return status
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,148 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+from matches.models import Club, Player, Fixture, MatchResult, Goal
+from matches.transactions import write_transaction
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent readers and writers against the SQLite database and compare the '
+        'production profile (WAL, busy_timeout, IMMEDIATE write transactions) with SQLite defaults'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10, help='Duration of each run')
+        parser.add_argument('--readers', type=int, default=8, help='Threads running table and statistics queries')
+        parser.add_argument('--writers', type=int, default=4, help='Threads recording goals')
+        parser.add_argument(
+            '--mode', choices=['both', 'default', 'production'], default='both',
+            help='Which connection settings to run with',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This command only applies to SQLite databases')
+        if str(connection.settings_dict['NAME']).startswith(':memory:') or 'mode=memory' in str(connection.settings_dict['NAME']):
+            raise CommandError('Use a file database; in-memory databases cannot be shared between threads')
+
+        production_options = copy.deepcopy(connection.settings_dict.get('OPTIONS', {}))
+        if options['mode'] != 'default' and 'init_command' not in production_options:
+            raise CommandError('The SQLite production profile is disabled (SQLITE_TUNING=False)')
+        modes = ['default', 'production'] if options['mode'] == 'both' else [options['mode']]
+
+        match, players = self.create_stress_match()
+        try:
+            results = {}
+            for mode in modes:
+                self.configure(mode, production_options)
+                results[mode] = self.run(match, players, options, mode)
+        finally:
+            self.configure('production', production_options)
+            # Removing the fixture cascades to the result and goals
+            Club.objects.filter(name__startswith='Stress Test').delete()
+
+        self.stdout.write(
+            f"\n{options['readers']} readers, {options['writers']} writers, {options['seconds']}s per run\n"
+        )
+        self.stdout.write(
+            f"{'mode':<12}{'reads':>8}{'writes':>8}{'locked':>8}{'write p50 ms':>14}{'write p99 ms':>14}"
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<12}{result['reads']:>8}{result['writes']:>8}{result['locked']:>8}"
+                f"{result['p50']:>14.1f}{result['p99']:>14.1f}"
+            )
+
+    def configure(self, mode, production_options):
+        """Switch the connection settings every thread will open its connection with"""
+        connections.close_all()
+        if mode == 'production':
+            settings.DATABASES['default']['OPTIONS'] = production_options
+            connection.settings_dict['OPTIONS'] = production_options
+        else:
+            settings.DATABASES['default']['OPTIONS'] = {}
+            connection.settings_dict['OPTIONS'] = {}
+            # The journal mode is stored in the database file, so switch it back explicitly
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode=DELETE')
+            connection.close()
+
+    def create_stress_match(self):
+        club1 = Club.objects.create(name='Stress Test A')
+        club2 = Club.objects.create(name='Stress Test B')
+        players = [
+            Player.objects.create(first_name='Stress', last_name=f'Player {number}', position='FWD', club=club)
+            for number, club in enumerate([club1, club1, club2, club2], 1)
+        ]
+        fixture = Fixture.objects.create(team1=club1, team2=club2, date=timezone.now(), venue='Stress Test')
+        match = MatchResult.objects.create(fixture=fixture, team1_goals=0, team2_goals=0)
+        return match, players
+
+    def run(self, match, players, options, mode):
+        # Only the writes take the lock up front; the readers' queries stay DEFERRED
+        atomic = write_transaction if mode == 'production' else transaction.atomic
+        deadline = time.monotonic() + options['seconds']
+        lock = threading.Lock()
+        totals = {'reads': 0, 'writes': 0, 'locked': 0}
+        latencies = []
+
+        def reader():
+            reads = 0
+            try:
+                while time.monotonic() < deadline:
+                    # The kind of queries the table and statistics pages run
+                    list(MatchResult.objects.select_related('fixture__team1', 'fixture__team2').values_list(
+                        'fixture__team1__name', 'fixture__team2__name', 'team1_goals', 'team2_goals'
+                    ))
+                    list(Goal.objects.values('scorer__club__name').annotate(total=Count('id')))
+                    reads += 1
+            finally:
+                connection.close()
+            with lock:
+                totals['reads'] += reads
+
+        def writer(number):
+            writes, locked, times = 0, 0, []
+            try:
+                while time.monotonic() < deadline:
+                    started = time.monotonic()
+                    try:
+                        with atomic():
+                            Goal.objects.create(
+                                match=match, scorer=players[(number + writes) % len(players)],
+                                minute=(writes % 90) + 1,
+                            )
+                            MatchResult.objects.filter(pk=match.pk).update(updated_at=timezone.now())
+                    except OperationalError:
+                        locked += 1
+                    else:
+                        writes += 1
+                        times.append(time.monotonic() - started)
+            finally:
+                connection.close()
+            with lock:
+                totals['writes'] += writes
+                totals['locked'] += locked
+                latencies.extend(times)
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer, args=(number,)) for number in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return dict(totals, p50=_percentile(latencies, 0.5) * 1000, p99=_percentile(latencies, 0.99) * 1000)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from matches.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Precompute the standings and render the public pages so the league table, leaderboards '
+        'and cached fragments are warm for the current data'
+    )
+
+    def handle(self, *args, **options):
+        generation, timings = warm_caches()
+        for step, seconds in timings:
+            self.stdout.write(f"{step:<30}{seconds * 1000:>10.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Caches warm for data generation {generation}"))
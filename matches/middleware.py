@@ -0,0 +1,152 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError
+from django.http import HttpResponse, JsonResponse
+from .assets import index_static_root, serve_static_file
+from .routers import choose_replica, read_from, reset_read_database
+from .warmup import readiness, warm_in_background
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read from a replica during GET and HEAD requests when DB_REPLICAS are
+    configured.
+
+    A client that sends a write request gets a short-lived cookie, and
+    reads from the primary until it expires, so an admin sees the result
+    they just entered even while the replicas catch up.
+    """
+
+    sync_capable = True
+    async_capable = True
+    READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+    PIN_COOKIE = 'read_primary'
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def reads_from_replica(self, request):
+        return request.method in self.READ_METHODS and self.PIN_COOKIE not in request.COOKIES
+
+    def pin_to_primary(self, request, response):
+        if request.method not in self.READ_METHODS:
+            response.set_cookie(
+                self.PIN_COOKIE, '1', max_age=settings.DB_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = read_from(choose_replica() if self.reads_from_replica(request) else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_database(token)
+        return self.pin_to_primary(request, response)
+
+    async def __acall__(self, request):
+        # Checking a replica's health may open a connection
+        alias = await sync_to_async(choose_replica)() if self.reads_from_replica(request) else None
+        token = read_from(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_read_database(token)
+        return self.pin_to_primary(request, response)
+
+
+class HealthCheckMiddleware:
+    """
+    Answer /healthz and /readyz ahead of the other middleware, so probes
+    skip host validation, sessions and authentication.
+
+    /healthz only shows that the process serves requests. /readyz reports
+    ready once the caches are warm for the current data; when they are not,
+    it starts warming them in the background and answers 503 meanwhile.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        path = request.path.rstrip('/')
+        if path == '/healthz':
+            return HttpResponse('ok', content_type='text/plain')
+        if path == '/readyz':
+            return self.readyz()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        path = request.path.rstrip('/')
+        if path == '/healthz':
+            return HttpResponse('ok', content_type='text/plain')
+        if path == '/readyz':
+            return await sync_to_async(self.readyz)()
+        return await self.get_response(request)
+
+    def readyz(self):
+        try:
+            ready, details = readiness()
+        except DatabaseError as error:
+            return JsonResponse({'ready': False, 'error': str(error)}, status=503)
+        if not ready:
+            warm_in_background()
+        return JsonResponse(dict(details, ready=ready), status=200 if ready else 503)
+
+
+class StaticFilesMiddleware:
+    """
+    Serve the collected static files ahead of sessions, authentication and
+    the URLconf, so gunicorn workers can serve them without a separate web
+    server.
+
+    STATIC_ROOT is indexed once per process (collectstatic runs before the
+    workers start) and small files are held in memory. Each file is sent
+    brotli or gzip precompressed when the client accepts it, and
+    content-hashed names are cached for a year. In DEBUG the staticfiles
+    app serves the source files instead.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.DEBUG or '://' in settings.STATIC_URL:
+            raise MiddlewareNotUsed
+        self.files = index_static_root()
+        if not self.files:
+            raise MiddlewareNotUsed
+        self.prefix = settings.STATIC_URL
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(self.prefix):
+            return None
+        static_file = self.files.get(request.path[len(self.prefix):])
+        return static_file and serve_static_file(request, static_file)
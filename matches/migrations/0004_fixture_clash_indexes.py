@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0003_goal_assist_alter_fixture_team1_alter_fixture_team2_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='matchresult',
+            name='man_of_match',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='matches.player', verbose_name='Man of the Match'),
+        ),
+        migrations.AlterField(
+            model_name='matchresult',
+            name='team1_goals',
+            field=models.PositiveIntegerField(default=0, verbose_name='Team 1 Goals'),
+        ),
+        migrations.AlterField(
+            model_name='matchresult',
+            name='team2_goals',
+            field=models.PositiveIntegerField(default=0, verbose_name='Team 2 Goals'),
+        ),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['team1', 'date'], name='fixture_team1_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['team2', 'date'], name='fixture_team2_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['venue', 'date'], name='fixture_venue_date_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0004_fixture_clash_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerSeasonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.PositiveIntegerField(help_text='Season year (the year of the fixture date)')),
+                ('goals', models.PositiveIntegerField(default=0, help_text='Goals scored, excluding own goals')),
+                ('penalties', models.PositiveIntegerField(default=0, help_text='Penalty goals, included in goals')),
+                ('own_goals', models.PositiveIntegerField(default=0)),
+                ('assists', models.PositiveIntegerField(default=0)),
+                ('motm_awards', models.PositiveIntegerField(default=0, verbose_name='Man of the Match awards')),
+                ('yellow_cards', models.PositiveIntegerField(default=0)),
+                ('red_cards', models.PositiveIntegerField(default=0)),
+                ('appearances', models.PositiveIntegerField(default=0, help_text="Matches played by the player's club")),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_stats', to='matches.player')),
+            ],
+            options={
+                'verbose_name': 'Player Season Stats',
+                'verbose_name_plural': 'Player Season Stats',
+                'ordering': ['season', 'player'],
+                'indexes': [models.Index(fields=['season', '-goals'], name='season_stats_goals_idx'), models.Index(fields=['season', '-assists'], name='season_stats_assists_idx'), models.Index(fields=['season', '-motm_awards'], name='season_stats_motm_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'season'), name='unique_player_season_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0005_playerseasonstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DisciplinaryRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.PositiveIntegerField(help_text='Season year (the year of the fixture date)')),
+                ('accumulated_yellows', models.PositiveIntegerField(default=0, help_text='Yellow cards counting towards the next accumulation ban')),
+                ('matches_banned', models.PositiveIntegerField(default=0, help_text='Total matches of suspension incurred')),
+                ('matches_served', models.PositiveIntegerField(default=0, help_text='Club matches missed while suspended')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='disciplinary_records', to='matches.player')),
+            ],
+            options={
+                'verbose_name': 'Disciplinary Record',
+                'verbose_name_plural': 'Disciplinary Records',
+                'ordering': ['season', 'player'],
+                'indexes': [models.Index(fields=['season', 'matches_banned', 'matches_served'], name='discipline_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'season'), name='unique_player_season_discipline')],
+            },
+        ),
+    ]
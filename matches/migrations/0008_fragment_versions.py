@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0007_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fixture',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 06:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0008_fragment_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('score', 'Score'), ('goal', 'Goal'), ('booking', 'Booking')], max_length=10)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('fixture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='matches.fixture')),
+            ],
+            options={
+                'verbose_name': 'Match Event',
+                'verbose_name_plural': 'Match Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['fixture', 'id'], name='match_event_fixture_seq_idx')],
+            },
+        ),
+    ]
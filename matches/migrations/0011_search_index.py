@@ -0,0 +1,96 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+# The search index as this migration creates it; matches.search keeps it up
+# to date from here on. One table per kind of object: an FTS5 virtual table
+# on SQLite (the rowid is the object's ID), and a table with a GIN-indexed
+# tsvector column on PostgreSQL. Other databases get no index.
+KINDS = ('club', 'player', 'fixture')
+
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE {table} USING fts5("
+        "label, detail, url UNINDEXED, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')",
+    ],
+    'postgresql': [
+        "CREATE TABLE {table} ("
+        "object_id integer PRIMARY KEY, label text NOT NULL, detail text NOT NULL, url text NOT NULL, "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', label), 'A') || setweight(to_tsvector('simple', detail), 'B')"
+        ") STORED)",
+        "CREATE INDEX {table}_document_idx ON {table} USING GIN (document)",
+    ],
+}
+
+INSERT_SQL = {
+    'sqlite': "INSERT INTO {table} (rowid, label, detail, url) VALUES (%s, %s, %s, %s)",
+    'postgresql': "INSERT INTO {table} (object_id, label, detail, url) VALUES (%s, %s, %s, %s)",
+}
+
+DROP_SQL = "DROP TABLE IF EXISTS {table}"
+
+BATCH_SIZE = 2000
+
+
+def index_entries(apps, kind, using):
+    """(object_id, label, detail, url) of every object of one kind; the URLs are those of matches.urls"""
+    if kind == 'club':
+        clubs = apps.get_model('matches', 'Club').objects.using(using).values_list('pk', 'name')
+        return ((pk, name, '', f'/players/list/?club={pk}') for pk, name in clubs.iterator(BATCH_SIZE))
+    if kind == 'player':
+        players = apps.get_model('matches', 'Player').objects.using(using).values_list(
+            'pk', 'first_name', 'last_name', 'club_id', 'club__name',
+        )
+        return (
+            (pk, f"{first_name} {last_name}", club, f'/players/list/?club={club_id}')
+            for pk, first_name, last_name, club_id, club in players.iterator(BATCH_SIZE)
+        )
+    fixtures = apps.get_model('matches', 'Fixture').objects.using(using).values_list(
+        'pk', 'team1__name', 'team2__name', 'venue', 'date', 'result__pk',
+    )
+    return (
+        (pk, f"{team1} vs {team2}", f"{venue}, {timezone.localtime(date):%d %b %Y}",
+         f'/match/{result}/' if result else '/fixtures/')
+        for pk, team1, team2, venue, date, result in fixtures.iterator(BATCH_SIZE)
+    )
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE_SQL:
+        return
+    with connection.cursor() as cursor:
+        for kind in KINDS:
+            table = f'matches_search_{kind}'
+            for statement in CREATE_SQL[connection.vendor]:
+                cursor.execute(statement.format(table=table))
+            sql = INSERT_SQL[connection.vendor].format(table=table)
+            batch = []
+            for entry in index_entries(apps, kind, connection.alias):
+                batch.append(entry)
+                if len(batch) == BATCH_SIZE:
+                    cursor.executemany(sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE_SQL:
+        return
+    with connection.cursor() as cursor:
+        for kind in KINDS:
+            cursor.execute(DROP_SQL.format(table=f'matches_search_{kind}'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0010_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
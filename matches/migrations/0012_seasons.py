@@ -0,0 +1,123 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:38
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def assign_seasons(apps, schema_editor):
+    """
+    File existing fixtures and results under one season of the default
+    competition per calendar year, and point the year-keyed statistics and
+    disciplinary records at those seasons.
+    """
+    Competition = apps.get_model('matches', 'Competition')
+    Season = apps.get_model('matches', 'Season')
+    Fixture = apps.get_model('matches', 'Fixture')
+    MatchResult = apps.get_model('matches', 'MatchResult')
+    PlayerSeasonStats = apps.get_model('matches', 'PlayerSeasonStats')
+    DisciplinaryRecord = apps.get_model('matches', 'DisciplinaryRecord')
+
+    years = sorted({day.year for day in Fixture.objects.datetimes('date', 'year')})
+    seasons = {}
+    if years:
+        competition, _created = Competition.objects.get_or_create(name=settings.LEAGUE_NAME)
+        for year in years:
+            season = Season.objects.create(
+                competition=competition, name=str(year),
+                start_date=datetime.date(year, 1, 1), end_date=datetime.date(year, 12, 31),
+            )
+            seasons[year] = season.pk
+            start = timezone.make_aware(datetime.datetime(year, 1, 1))
+            end = timezone.make_aware(datetime.datetime(year + 1, 1, 1))
+            Fixture.objects.filter(date__gte=start, date__lt=end).update(season=season)
+            MatchResult.objects.filter(fixture__season=season).update(season=season)
+
+    for model in (PlayerSeasonStats, DisciplinaryRecord):
+        model.objects.exclude(season__in=list(seasons)).delete()
+        for year, season_id in seasons.items():
+            model.objects.filter(season=year).update(season=season_id)
+
+
+def restore_years(apps, schema_editor):
+    Season = apps.get_model('matches', 'Season')
+    for model_name in ('PlayerSeasonStats', 'DisciplinaryRecord'):
+        model = apps.get_model('matches', model_name)
+        for season_id, start_date in Season.objects.values_list('pk', 'start_date'):
+            model.objects.filter(season=season_id).update(season=start_date.year)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Competition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Competition',
+                'verbose_name_plural': 'Competitions',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Season',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='e.g. Season 3 - 2025', max_length=100)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='seasons', to='matches.competition')),
+            ],
+            options={
+                'verbose_name': 'Season',
+                'verbose_name_plural': 'Seasons',
+                'ordering': ['-start_date'],
+                'indexes': [models.Index(fields=['competition', 'start_date'], name='season_competition_start_idx')],
+                'constraints': [models.UniqueConstraint(fields=('competition', 'name'), name='unique_competition_season')],
+            },
+        ),
+        migrations.AddField(
+            model_name='fixture',
+            name='season',
+            field=models.ForeignKey(blank=True, help_text='Left blank, the season the date falls in', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='fixtures', to='matches.season'),
+        ),
+        migrations.AddField(
+            model_name='matchresult',
+            name='season',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='results', to='matches.season'),
+        ),
+        migrations.RunPython(assign_seasons, restore_years),
+        migrations.AlterField(
+            model_name='fixture',
+            name='season',
+            field=models.ForeignKey(blank=True, help_text='Left blank, the season the date falls in', on_delete=django.db.models.deletion.PROTECT, related_name='fixtures', to='matches.season'),
+        ),
+        migrations.AlterField(
+            model_name='matchresult',
+            name='season',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='results', to='matches.season'),
+        ),
+        migrations.AlterField(
+            model_name='disciplinaryrecord',
+            name='season',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='disciplinary_records', to='matches.season'),
+        ),
+        migrations.AlterField(
+            model_name='playerseasonstats',
+            name='season',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_stats', to='matches.season'),
+        ),
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['season', 'date'], name='fixture_season_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0012_seasons'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField(help_text='gzip-compressed JSON, see matches.archive')),
+                ('matches', models.PositiveIntegerField(default=0, help_text='Fixtures in the snapshot')),
+                ('purged', models.BooleanField(default=False, help_text="The season's fixtures, results, goals, bookings and player stats were removed")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='matches.season')),
+            ],
+            options={
+                'verbose_name': 'Season Archive',
+                'verbose_name_plural': 'Season Archives',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0013_season_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingsCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.PositiveIntegerField(help_text='Results included')),
+                ('through_date', models.DateTimeField(help_text='Kick-off of the last result included')),
+                ('through_fixture_id', models.PositiveBigIntegerField(help_text='Fixture of the last result included')),
+                ('state', models.JSONField(help_text='Club ID -> totals, see matches.history')),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings_checkpoints', to='matches.season')),
+            ],
+            options={
+                'verbose_name': 'Standings Checkpoint',
+                'verbose_name_plural': 'Standings Checkpoints',
+                'indexes': [models.Index(fields=['season', 'through_date'], name='checkpoint_season_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('season', 'matches'), name='unique_standings_checkpoint')],
+            },
+        ),
+    ]
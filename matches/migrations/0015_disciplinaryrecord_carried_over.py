@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matches', '0014_standings_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disciplinaryrecord',
+            name='carried_over',
+            field=models.PositiveIntegerField(default=0, help_text='Matches of suspension still unserved at the end of the previous season'),
+        ),
+    ]
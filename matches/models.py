@@ -1,4 +1,8 @@
+from datetime import date, datetime
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 
@@ -43,27 +47,117 @@ class Player(models.Model):
         return f"{self.first_name} {self.last_name} ({self.club.name})"
 
 
+class Competition(models.Model):
+    """A league or cup, played over one or more seasons"""
+    name = models.CharField(max_length=200, unique=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Competition'
+        verbose_name_plural = 'Competitions'
+    
+    def __str__(self):
+        return self.name
+
+
+class Season(models.Model):
+    """One edition of a competition; fixtures, results and season statistics belong to one"""
+    competition = models.ForeignKey(Competition, on_delete=models.PROTECT, related_name='seasons')
+    name = models.CharField(max_length=100, help_text="e.g. Season 3 - 2025")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    
+    class Meta:
+        ordering = ['-start_date']
+        verbose_name = 'Season'
+        verbose_name_plural = 'Seasons'
+        constraints = [
+            models.UniqueConstraint(fields=['competition', 'name'], name='unique_competition_season'),
+        ]
+        indexes = [
+            models.Index(fields=['competition', 'start_date'], name='season_competition_start_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.competition.name} {self.name}"
+    
+    @classmethod
+    def for_date(cls, when):
+        """
+        The season of the default competition (LEAGUE_NAME) that a kick-off
+        falls in, starting one for the calendar year when none covers it.
+        Raises ValidationError when a season named after the year already
+        exists with dates that leave the day out.
+        """
+        day = timezone.localtime(when).date() if isinstance(when, datetime) else when
+        season = cls.objects.filter(
+            competition__name=settings.LEAGUE_NAME, start_date__lte=day, end_date__gte=day,
+        ).order_by('-start_date').first()
+        if season is None:
+            competition, _created = Competition.objects.get_or_create(name=settings.LEAGUE_NAME)
+            season, _created = cls.objects.get_or_create(
+                competition=competition, name=str(day.year),
+                defaults={'start_date': date(day.year, 1, 1), 'end_date': date(day.year, 12, 31)},
+            )
+            if not season.start_date <= day <= season.end_date:
+                raise ValidationError(
+                    f"No season of {competition} covers {day:%d %b %Y}, and {season} runs from "
+                    f"{season.start_date:%d %b %Y} to {season.end_date:%d %b %Y}. Add a season for that date."
+                )
+        return season
+
+
 class Fixture(models.Model):
     """Represents a scheduled match between two clubs"""
     team1 = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='team1_fixtures')
     team2 = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='team2_fixtures')
+    season = models.ForeignKey(Season, on_delete=models.PROTECT, related_name='fixtures', blank=True,
+                               help_text="Left blank, the season the date falls in")
     date = models.DateTimeField()
     venue = models.CharField(max_length=200, default="Main Stadium")
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-date']
         verbose_name = 'Fixture'
         verbose_name_plural = 'Fixtures'
+        indexes = [
+            # Interval lookups used by clash detection
+            models.Index(fields=['team1', 'date'], name='fixture_team1_date_idx'),
+            models.Index(fields=['team2', 'date'], name='fixture_team2_date_idx'),
+            models.Index(fields=['venue', 'date'], name='fixture_venue_date_idx'),
+            # Next/previous kick-off lookups for time-sensitive pages
+            models.Index(fields=['date'], name='fixture_date_idx'),
+            # A season's fixtures in date order
+            models.Index(fields=['season', 'date'], name='fixture_season_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.team1} vs {self.team2} - {self.date.strftime('%Y-%m-%d %H:%M')}"
     
     def clean(self):
-        from django.core.exceptions import ValidationError
-        if self.team1 == self.team2:
+        from .clashes import find_clashes, describe_clash
+        if self.team1_id and self.team1_id == self.team2_id:
             raise ValidationError("A club cannot play against itself.")
+        
+        # Left blank, the season comes from the date; report a date no season takes on the form
+        if self.season_id is None and self.date:
+            try:
+                self.season = Season.for_date(self.date)
+            except ValidationError as error:
+                raise ValidationError({'season': error.messages})
+        
+        # Reject overlapping fixtures for either club or the venue
+        clashes = list(find_clashes(self)[:5])
+        if clashes:
+            raise ValidationError([describe_clash(self, other) for other in clashes])
         return super().clean()
     
+    def save(self, *args, **kwargs):
+        if self.season_id is None and self.date:
+            self.season = Season.for_date(self.date)
+        super().save(*args, **kwargs)
+    
     def teams_involved(self):
         """Return both teams involved in the fixture"""
         return [self.team1, self.team2]
@@ -72,9 +166,13 @@ class Fixture(models.Model):
 class MatchResult(models.Model):
     """Represents the result of a completed match"""
     fixture = models.OneToOneField(Fixture, on_delete=models.CASCADE, related_name='result')
+    # The fixture's season, copied so season queries need no join
+    season = models.ForeignKey(Season, on_delete=models.PROTECT, related_name='results', editable=False)
     team1_goals = models.PositiveIntegerField(default=0, verbose_name="Team 1 Goals")
     team2_goals = models.PositiveIntegerField(default=0, verbose_name="Team 2 Goals")
     man_of_match = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Man of the Match")
+    # Also touched when the match's goals or bookings change
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'Match Result'
@@ -83,6 +181,10 @@ class MatchResult(models.Model):
     def __str__(self):
         return f"{self.fixture.team1} {self.team1_goals} - {self.team2_goals} {self.fixture.team2}"
     
+    def save(self, *args, **kwargs):
+        self.season_id = self.fixture.season_id
+        super().save(*args, **kwargs)
+    
     @property
     def is_completed(self):
         """Returns True if the match has been completed"""
@@ -147,5 +249,197 @@ class Goal(models.Model):
         return f"{self.scorer.first_name} {self.scorer.last_name} ({self.minute}'{goal_type}){assist_str}"
 
 
-# Import timezone at the end to avoid circular imports
-from django.utils import timezone
\ No newline at end of file
+class PlayerSeasonStats(models.Model):
+    """Per-player, per-season totals kept up to date from goals, bookings and results"""
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='season_stats')
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='player_stats')
+    goals = models.PositiveIntegerField(default=0, help_text="Goals scored, excluding own goals")
+    penalties = models.PositiveIntegerField(default=0, help_text="Penalty goals, included in goals")
+    own_goals = models.PositiveIntegerField(default=0)
+    assists = models.PositiveIntegerField(default=0)
+    motm_awards = models.PositiveIntegerField(default=0, verbose_name="Man of the Match awards")
+    yellow_cards = models.PositiveIntegerField(default=0)
+    red_cards = models.PositiveIntegerField(default=0)
+    appearances = models.PositiveIntegerField(default=0, help_text="Matches played by the player's club")
+    
+    class Meta:
+        ordering = ['season', 'player']
+        verbose_name = 'Player Season Stats'
+        verbose_name_plural = 'Player Season Stats'
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'season'], name='unique_player_season_stats'),
+        ]
+        indexes = [
+            # One index per leaderboard
+            models.Index(fields=['season', '-goals'], name='season_stats_goals_idx'),
+            models.Index(fields=['season', '-assists'], name='season_stats_assists_idx'),
+            models.Index(fields=['season', '-motm_awards'], name='season_stats_motm_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.player} - {self.season}"
+
+
+class DisciplinaryRecord(models.Model):
+    """A player's running card count and bans for a season"""
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='disciplinary_records')
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='disciplinary_records')
+    accumulated_yellows = models.PositiveIntegerField(
+        default=0, help_text="Yellow cards counting towards the next accumulation ban"
+    )
+    matches_banned = models.PositiveIntegerField(default=0, help_text="Total matches of suspension incurred")
+    matches_served = models.PositiveIntegerField(default=0, help_text="Club matches missed while suspended")
+    carried_over = models.PositiveIntegerField(
+        default=0, help_text="Matches of suspension still unserved at the end of the previous season"
+    )
+    
+    class Meta:
+        ordering = ['season', 'player']
+        verbose_name = 'Disciplinary Record'
+        verbose_name_plural = 'Disciplinary Records'
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'season'], name='unique_player_season_discipline'),
+        ]
+        indexes = [
+            models.Index(fields=['season', 'matches_banned', 'matches_served'], name='discipline_pending_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.player} - {self.season}"
+    
+    @property
+    def pending_ban(self):
+        """Matches still to be served"""
+        return self.matches_banned - self.matches_served
+    
+    @property
+    def is_suspended(self):
+        return self.pending_ban > 0
+
+
+class StandingsCheckpoint(models.Model):
+    """
+    Running totals of every club after a season's first `matches` results
+    in kick-off order, the starting point for tables as of a past date
+    """
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='standings_checkpoints')
+    matches = models.PositiveIntegerField(help_text="Results included")
+    through_date = models.DateTimeField(help_text="Kick-off of the last result included")
+    through_fixture_id = models.PositiveBigIntegerField(help_text="Fixture of the last result included")
+    state = models.JSONField(help_text="Club ID -> totals, see matches.history")
+
+    class Meta:
+        verbose_name = 'Standings Checkpoint'
+        verbose_name_plural = 'Standings Checkpoints'
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'matches'], name='unique_standings_checkpoint'),
+        ]
+        indexes = [
+            models.Index(fields=['season', 'through_date'], name='checkpoint_season_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.season} after {self.matches} results"
+
+
+class SeasonArchive(models.Model):
+    """Read-only snapshot of a finished season's standings, leaderboards and match timelines"""
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='archive')
+    data = models.BinaryField(help_text="gzip-compressed JSON, see matches.archive")
+    matches = models.PositiveIntegerField(default=0, help_text="Fixtures in the snapshot")
+    purged = models.BooleanField(
+        default=False, help_text="The season's fixtures, results, goals, bookings and player stats were removed"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Season Archive'
+        verbose_name_plural = 'Season Archives'
+
+    def __str__(self):
+        return f"{self.season} archive"
+
+
+class DataVersion(models.Model):
+    """Change counter per model, used to answer conditional requests without rendering"""
+    name = models.CharField(max_length=100, unique=True, help_text="Model label, e.g. matches.fixture")
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Data Version'
+        verbose_name_plural = 'Data Versions'
+    
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class MatchEvent(models.Model):
+    """
+    Live update for a fixture (score change, goal, booking), in the order
+    it was saved. The primary key is the sequence number clients resume from.
+    """
+    KIND_CHOICES = [
+        ('score', 'Score'),
+        ('goal', 'Goal'),
+        ('booking', 'Booking'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    fixture = models.ForeignKey(Fixture, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Match Event'
+        verbose_name_plural = 'Match Events'
+        indexes = [
+            models.Index(fields=['fixture', 'id'], name='match_event_fixture_seq_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.pk} {self.get_kind_display()} ({self.fixture_id})"
+
+
+class Job(models.Model):
+    """
+    Background work queued by saves and run by `manage.py run_worker`.
+    Queued jobs with the same key are merged into one.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100, help_text="Registered task name")
+    key = models.CharField(max_length=200, help_text="Queued jobs with the same key are coalesced")
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not started before this time (retry back-off)")
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker running the job")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            # Claiming the next job and finding a queued job to merge into
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+            models.Index(fields=['key', 'status'], name='job_key_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.key} ({self.get_status_display()})"
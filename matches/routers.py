@@ -0,0 +1,99 @@
+import random
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+# Replicas are health checked at most this often (seconds)
+HEALTH_CHECK_INTERVAL = 5
+
+# The replica the current request reads from, None for the primary
+_read_database = ContextVar('read_database', default=None)
+
+# alias -> (healthy, monotonic time of the check)
+_health = {}
+
+
+def read_from(alias):
+    """Send reads in the current context to `alias` (None for the primary); returns a reset token"""
+    return _read_database.set(alias)
+
+
+def reset_read_database(token):
+    _read_database.reset(token)
+
+
+def check_replica(alias):
+    """
+    Whether a replica accepts connections and, for PostgreSQL, has replayed
+    the primary's changes to within DB_REPLICA_MAX_LAG_SECONDS.
+    """
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # A replica that has replayed everything it received is not
+                # behind, however long ago the last write was
+                cursor.execute(
+                    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+                )
+                return float(cursor.fetchone()[0]) <= settings.DB_REPLICA_MAX_LAG_SECONDS
+    except DatabaseError:
+        return False
+    return True
+
+
+def choose_replica():
+    """
+    A healthy replica to read from, or None when there is none and reads
+    should go to the primary.
+
+    A replica that fails its check is left out for DB_REPLICA_RETRY_SECONDS.
+    """
+    now = time.monotonic()
+    replicas = list(settings.DATABASE_REPLICAS)
+    random.shuffle(replicas)
+    for alias in replicas:
+        healthy, checked_at = _health.get(alias, (True, None))
+        interval = HEALTH_CHECK_INTERVAL if healthy else settings.DB_REPLICA_RETRY_SECONDS
+        if checked_at is None or now - checked_at >= interval:
+            healthy = check_replica(alias)
+            _health[alias] = (healthy, now)
+        if healthy:
+            return alias
+    return None
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica chosen for the current request by
+    ReplicaRoutingMiddleware, and everything else to the primary.
+
+    Reads outside a request (management commands, workers, signal handlers
+    run after commit) and reads inside a transaction always use the primary,
+    so data that is about to be written back is never read from a replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_database.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Without this, objects read from a replica would be saved back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,178 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.utils import timezone
+from .clashes import match_duration
+from .models import Fixture, Season
+from .search import index_objects
+from .versioning import bump_versions, season_label
+
+
+def round_robin_rounds(club_ids, double=True):
+    """
+    Build round-robin rounds with the circle method.
+
+    One club stays fixed while the others rotate around it, so every club
+    meets every other club exactly once per leg and plays at most once per
+    round. With an odd number of clubs, one club sits out each round.
+    Home and away alternate between rounds; the second leg mirrors the first
+    with venues swapped.
+
+    Returns a list of rounds, each a list of (home_id, away_id) tuples.
+    """
+    clubs = list(club_ids)
+    if len(clubs) < 2:
+        return []
+    if len(clubs) % 2:
+        clubs.append(None)  # Bye
+
+    num_clubs = len(clubs)
+    rounds = []
+    for round_no in range(num_clubs - 1):
+        pairs = []
+        for i in range(num_clubs // 2):
+            home, away = clubs[i], clubs[num_clubs - 1 - i]
+            if home is None or away is None:
+                continue
+            if (i + round_no) % 2:
+                home, away = away, home
+            pairs.append((home, away))
+        rounds.append(pairs)
+        # Rotate every club except the first one position clockwise
+        clubs = [clubs[0], clubs[-1]] + clubs[1:-1]
+
+    if double:
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    return rounds
+
+
+def matchday_dates(start_date, interval_days=7, skip_dates=()):
+    """Yield matchday dates from start_date every interval_days, leaving out skip_dates"""
+    skip_dates = set(skip_dates)
+    day = start_date
+    while True:
+        if day not in skip_dates:
+            yield day
+        day += timedelta(days=interval_days)
+
+
+def _overlap(slot, other, duration):
+    """Whether two (kick-off time, venue) slots on one day share a venue less than a match apart"""
+    if slot[1] != other[1]:
+        return False
+    day = datetime.min.date()
+    return abs(datetime.combine(day, slot[0]) - datetime.combine(day, other[0])) < duration
+
+
+def existing_bookings(start_date):
+    """
+    Collect what is already scheduled from start_date onwards.
+
+    Returns (busy_clubs, taken_slots): per date, the set of club IDs already
+    playing and the set of (kick-off time, venue) slots already in use.
+    """
+    busy_clubs = defaultdict(set)
+    taken_slots = defaultdict(set)
+    start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    rows = Fixture.objects.filter(date__gte=start).values_list('date', 'venue', 'team1_id', 'team2_id')
+    for date, venue, team1_id, team2_id in rows.iterator():
+        kickoff = timezone.localtime(date)
+        busy_clubs[kickoff.date()].update((team1_id, team2_id))
+        taken_slots[kickoff.date()].add((kickoff.time().replace(tzinfo=None), venue))
+    return busy_clubs, taken_slots
+
+
+def schedule_rounds(rounds, start_date, slot_times, venues, interval_days=7, skip_dates=(),
+                    busy_clubs=None, taken_slots=None):
+    """
+    Place round-robin rounds onto matchdays, kick-off slots and venues.
+
+    The first pass lays rounds onto consecutive matchdays, splitting a round
+    over several days when it has more matches than a day has slots. A slot
+    is only free while no match at its venue kicks off less than one match
+    duration (MATCH_DURATION_MINUTES) before or after it. The repair pass then walks the plan in order and moves any match that breaks
+    a constraint (a club already playing that day, or no free slot left) to
+    the nearest later matchday where it fits.
+
+    Returns a list of (kickoff, venue, home_id, away_id) tuples, kickoff being
+    an aware datetime.
+    """
+    slots = [(slot_time, venue) for slot_time in slot_times for venue in venues]
+    if not slots:
+        raise ValueError("At least one kick-off time and one venue are required.")
+    busy_clubs = busy_clubs if busy_clubs is not None else defaultdict(set)
+    taken_slots = taken_slots if taken_slots is not None else defaultdict(set)
+    duration = match_duration()
+
+    # First pass: one round per matchday, split by slot capacity
+    planned = []
+    day_index = 0
+    for pairs in rounds:
+        for offset in range(0, len(pairs), len(slots)):
+            planned.extend((day_index, home, away) for home, away in pairs[offset:offset + len(slots)])
+            day_index += 1
+
+    # Repair pass
+    dates = matchday_dates(start_date, interval_days, skip_dates)
+    calendar = []
+    free_slots = []
+    playing = []
+
+    def open_day(index):
+        while len(calendar) <= index:
+            day = next(dates)
+            calendar.append(day)
+            free_slots.append([
+                slot for slot in reversed(slots)
+                if not any(_overlap(slot, taken, duration) for taken in taken_slots[day])
+            ])
+            playing.append(set(busy_clubs[day]))
+
+    schedule = []
+    first_open = 0
+    for index, home, away in planned:
+        index = max(index, first_open)
+        while True:
+            open_day(index)
+            if free_slots[index] and home not in playing[index] and away not in playing[index]:
+                break
+            index += 1
+
+        slot_time, venue = free_slots[index].pop()
+        # Slots at the same venue that would overlap this match are no longer free
+        free_slots[index] = [slot for slot in free_slots[index] if not _overlap(slot, (slot_time, venue), duration)]
+        playing[index].update((home, away))
+        while first_open < len(free_slots) and not free_slots[first_open]:
+            first_open += 1
+
+        kickoff = timezone.make_aware(datetime.combine(calendar[index], slot_time))
+        schedule.append((kickoff, venue, home, away))
+    return schedule
+
+
+def generate_fixtures(club_ids, start_date, slot_times, venues, interval_days=7, skip_dates=(),
+                      double=True, batch_size=1000, commit=True, season=None):
+    """
+    Generate and store a full round-robin schedule for the given clubs,
+    working around fixtures that are already booked from start_date on.
+    The fixtures belong to `season`, by default the one start_date falls in.
+
+    Returns the list of Fixture instances (unsaved when commit is False).
+    """
+    busy_clubs, taken_slots = existing_bookings(start_date)
+    schedule = schedule_rounds(
+        round_robin_rounds(club_ids, double=double),
+        start_date, slot_times, venues,
+        interval_days=interval_days, skip_dates=skip_dates,
+        busy_clubs=busy_clubs, taken_slots=taken_slots,
+    )
+    if season is None and commit:
+        season = Season.for_date(start_date)
+    fixtures = [
+        Fixture(team1_id=home, team2_id=away, date=kickoff, venue=venue, season=season)
+        for kickoff, venue, home, away in schedule
+    ]
+    if commit:
+        Fixture.objects.bulk_create(fixtures, batch_size=batch_size)
+        bump_versions(Fixture, season_label(season.pk))
+        index_objects('fixture', [fixture.pk for fixture in fixtures])
+    return fixtures
@@ -0,0 +1,247 @@
+import re
+from django.apps import apps as global_apps
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils import timezone
+
+
+# Kinds of searchable objects, each with its own index table: an FTS5
+# virtual table on SQLite (the rowid is the object's ID), and a table with a
+# GIN-indexed tsvector column on PostgreSQL. Other databases have no index
+# and fall back to substring matching.
+KINDS = ('club', 'player', 'fixture')
+
+# Relative weight of a match in the label (names) and the detail (club,
+# venue and date) of an entry
+LABEL_WEIGHT = 10.0
+DETAIL_WEIGHT = 2.0
+
+# Matches fetched per kind and tier of results: the best ones by the index's
+# own ranking, merged across kinds in Python, so a short prefix matching half
+# the table costs no more than a rare name
+CANDIDATES = 100
+
+# Tiers of results, each listed before the next: (label only, whole words)
+TIERS = ((True, True), (True, False), (False, False))
+
+# Search terms beyond this many are ignored
+MAX_TERMS = 6
+
+# Rows written per statement when rebuilding the index
+BATCH_SIZE = 2000
+
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE {table} USING fts5("
+        "label, detail, url UNINDEXED, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')",
+    ],
+    'postgresql': [
+        "CREATE TABLE {table} ("
+        "object_id integer PRIMARY KEY, label text NOT NULL, detail text NOT NULL, url text NOT NULL, "
+        "document tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', label), 'A') || setweight(to_tsvector('simple', detail), 'B')"
+        ") STORED)",
+        "CREATE INDEX {table}_document_idx ON {table} USING GIN (document)",
+    ],
+}
+
+DROP_SQL = "DROP TABLE IF EXISTS {table}"
+
+
+def search_table(kind):
+    return f'matches_search_{kind}'
+
+
+def is_indexed(connection):
+    return connection.vendor in CREATE_SQL
+
+
+def create_tables(connection):
+    with connection.cursor() as cursor:
+        for kind in KINDS:
+            for statement in CREATE_SQL[connection.vendor]:
+                cursor.execute(statement.format(table=search_table(kind)))
+
+
+def drop_tables(connection):
+    with connection.cursor() as cursor:
+        for kind in KINDS:
+            cursor.execute(DROP_SQL.format(table=search_table(kind)))
+
+
+def search_terms(query):
+    """The words of a query, lower-cased, without FTS operators or punctuation"""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def _match_expression(connection, terms, label_only=False, whole_words=False):
+    """Every term, as a whole word or a prefix, in the database's query syntax"""
+    if connection.vendor == 'sqlite':
+        words = ' AND '.join(f'"{term}"' + ('' if whole_words else '*') for term in terms)
+        return f"{'label' if label_only else '{label detail}'} : ({words})"
+    # In a tsquery, :A limits a term to the label and :* makes it a prefix
+    suffix = ('' if whole_words else '*') + ('A' if label_only else '')
+    return ' & '.join(f'{term}:{suffix}' if suffix else term for term in terms)
+
+
+def _read_connection():
+    return connections[router.db_for_read(global_apps.get_model('matches', 'Player'))]
+
+
+def _write_connection():
+    return connections[router.db_for_write(global_apps.get_model('matches', 'Player'))]
+
+
+def _entries(kind, ids=None, apps=global_apps, using=None):
+    """(object_id, label, detail, url) of the objects of one kind, all of them when ids is None"""
+    if kind == 'club':
+        queryset = apps.get_model('matches', 'Club').objects.values_list('pk', 'name')
+        return (
+            (pk, name, '', f"{reverse('matches:players')}?club={pk}")
+            for pk, name in _rows(queryset, ids, using)
+        )
+    if kind == 'player':
+        queryset = apps.get_model('matches', 'Player').objects.values_list(
+            'pk', 'first_name', 'last_name', 'club_id', 'club__name',
+        )
+        return (
+            (pk, f"{first_name} {last_name}", club, f"{reverse('matches:players')}?club={club_id}")
+            for pk, first_name, last_name, club_id, club in _rows(queryset, ids, using)
+        )
+    queryset = apps.get_model('matches', 'Fixture').objects.values_list(
+        'pk', 'team1__name', 'team2__name', 'venue', 'date', 'result__pk',
+    )
+    return (
+        (pk, f"{team1} vs {team2}", f"{venue}, {timezone.localtime(date):%d %b %Y}",
+         reverse('matches:match_detail', args=[result]) if result else reverse('matches:fixtures'))
+        for pk, team1, team2, venue, date, result in _rows(queryset, ids, using)
+    )
+
+
+def _rows(queryset, ids, using):
+    if using:
+        queryset = queryset.using(using)
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    return queryset.order_by('pk').iterator(chunk_size=BATCH_SIZE)
+
+
+def _write(connection, kind, entries):
+    """Insert or replace entries in batches; returns how many were written"""
+    table = search_table(kind)
+    if connection.vendor == 'sqlite':
+        sql = f"INSERT OR REPLACE INTO {table} (rowid, label, detail, url) VALUES (%s, %s, %s, %s)"
+    else:
+        sql = (
+            f"INSERT INTO {table} (object_id, label, detail, url) VALUES (%s, %s, %s, %s) "
+            "ON CONFLICT (object_id) DO UPDATE SET label = EXCLUDED.label, detail = EXCLUDED.detail, "
+            "url = EXCLUDED.url"
+        )
+    count = 0
+    with connection.cursor() as cursor:
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+    return count
+
+
+def index_objects(kind, ids):
+    """Add or refresh the entries of some objects of one kind"""
+    connection = _write_connection()
+    if ids and is_indexed(connection):
+        _write(connection, kind, _entries(kind, ids))
+
+
+def remove_objects(kind, ids):
+    connection = _write_connection()
+    if not ids or not is_indexed(connection):
+        return
+    key = 'rowid' if connection.vendor == 'sqlite' else 'object_id'
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {search_table(kind)} WHERE {key} = %s", [(pk,) for pk in ids])
+
+
+def rebuild_index(apps=global_apps, using=None):
+    """Replace the whole index with entries for every club, player and fixture; returns the count"""
+    connection = connections[using] if using else _write_connection()
+    if not is_indexed(connection):
+        return 0
+    count = 0
+    for kind in KINDS:
+        table = search_table(kind)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table}")
+        count += _write(connection, kind, _entries(kind, apps=apps, using=connection.alias))
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+    return count
+
+
+def search(query, limit=10, kinds=KINDS):
+    """
+    Clubs, players and fixtures matching every word of `query`, best first:
+    [{'kind', 'id', 'label', 'detail', 'url'}]. Names containing the words
+    come first, then names starting with them, then entries whose details
+    (club, venue, date) match.
+    """
+    terms = search_terms(query)
+    connection = _read_connection()
+    if not terms or not is_indexed(connection):
+        return []
+    kinds = [kind for kind in KINDS if kind in kinds]
+    results = {}
+    with connection.cursor() as cursor:
+        for label_only, whole_words in TIERS:
+            expression = _match_expression(connection, terms, label_only, whole_words)
+            rows = []
+            for kind in kinds:
+                table = search_table(kind)
+                if connection.vendor == 'sqlite':
+                    cursor.execute(
+                        f"SELECT rowid, label, detail, url, bm25({table}, {LABEL_WEIGHT}, {DETAIL_WEIGHT}, 0) "
+                        f"FROM {table} WHERE {table} MATCH %s ORDER BY 5, length(label) LIMIT %s",
+                        [expression, CANDIDATES],
+                    )
+                else:
+                    # ts_rank's weights are {D, C, B, A}; negated so that lower is better, like bm25
+                    cursor.execute(
+                        f"SELECT object_id, label, detail, url, "
+                        f"-ts_rank('{{0, 0, {DETAIL_WEIGHT / LABEL_WEIGHT}, 1}}', document, query) "
+                        f"FROM {table}, to_tsquery('simple', %s) AS query WHERE document @@ query "
+                        f"ORDER BY 5, length(label) LIMIT %s",
+                        [expression, CANDIDATES],
+                    )
+                rows.extend((kind, *row) for row in cursor.fetchall())
+            # The most relevant match first, then the shortest name
+            for kind, object_id, label, detail, url, _score in sorted(rows, key=lambda row: (row[5], len(row[2]))):
+                results.setdefault((kind, object_id), {
+                    'kind': kind, 'id': object_id, 'label': label, 'detail': detail, 'url': url,
+                })
+            if len(results) >= limit:
+                break
+    return list(results.values())[:limit]
+
+
+def matching_ids(kind, query):
+    """
+    A subquery of the IDs of `kind` objects matching every word of `query`,
+    for queryset.filter(pk__in=...); None when the database has no index.
+    """
+    terms = search_terms(query)
+    connection = _read_connection()
+    if not terms or not is_indexed(connection):
+        return None
+    table = search_table(kind)
+    expression = _match_expression(connection, terms)
+    if connection.vendor == 'sqlite':
+        return RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [expression])
+    return RawSQL(f"SELECT object_id FROM {table} WHERE document @@ to_tsquery('simple', %s)", [expression])
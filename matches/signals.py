@@ -0,0 +1,369 @@
+import threading
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Club, Player, Season, Fixture, MatchResult, Booking, Goal, SeasonArchive, StandingsCheckpoint
+from .versioning import bump_versions, season_label
+
+# The job queue, search index, live events, checkpoints and autocomplete are
+# imported by the receivers that use them, so a worker boots without them
+
+
+_pending = threading.local()
+
+
+def schedule_refresh(season, player_ids):
+    """
+    Queue a refresh of some players' derived data for when the current
+    transaction commits. Refreshes requested while saving a result together
+    with its goals and bookings are merged into one job per season, which
+    also absorbs later saves until a worker picks it up.
+    """
+    pending = getattr(_pending, 'refreshes', None)
+    if pending is None:
+        pending = _pending.refreshes = defaultdict(set)
+    pending[season].update(player_id for player_id in player_ids if player_id)
+    transaction.on_commit(flush_pending_refreshes)
+
+
+def schedule_version_bump(model):
+    """Bump a model's (or a season label's) data version once per transaction, after it commits"""
+    pending = getattr(_pending, 'versions', None)
+    if pending is None:
+        pending = _pending.versions = set()
+    pending.add(model)
+    transaction.on_commit(flush_pending_versions)
+
+
+def flush_pending_versions():
+    pending = getattr(_pending, 'versions', None)
+    if not pending:
+        return
+    _pending.versions = None
+    bump_versions(*pending)
+
+
+def flush_pending_refreshes():
+    from .jobs import enqueue
+    pending = getattr(_pending, 'refreshes', None)
+    if not pending:
+        return
+    _pending.refreshes = None
+    for season, player_ids in pending.items():
+        if player_ids:
+            enqueue(
+                'refresh_player_data', {'season': season, 'player_ids': sorted(player_ids)},
+                key=f'refresh_player_data:{season}',
+            )
+
+
+def _match_season(match_id):
+    """Season of a result, or None once the result is gone"""
+    return MatchResult.objects.filter(pk=match_id).values_list('season_id', flat=True).first()
+
+
+def _remember_previous(instance, *fields):
+    """Keep the values a row had before this save, so moved stats are refreshed on both sides"""
+    previous = None
+    if instance.pk:
+        previous = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    instance._previous_values = previous or {}
+
+
+def _refresh_players(match_ids, player_ids):
+    for season in {_match_season(match_id) for match_id in match_ids if match_id}:
+        if season is not None:
+            schedule_refresh(season, player_ids)
+
+
+@receiver(pre_save, sender=Goal)
+def remember_goal(sender, instance, **kwargs):
+    _remember_previous(instance, 'match_id', 'scorer_id', 'assist_id')
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def update_goal_stats(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_values', {})
+    _refresh_players(
+        {instance.match_id, previous.get('match_id')},
+        {instance.scorer_id, instance.assist_id, previous.get('scorer_id'), previous.get('assist_id')},
+    )
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking(sender, instance, **kwargs):
+    _remember_previous(instance, 'match_id', 'player_id')
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def update_booking_stats(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_values', {})
+    _refresh_players(
+        {instance.match_id, previous.get('match_id')},
+        {instance.player_id, previous.get('player_id')},
+    )
+
+
+@receiver(pre_save, sender=MatchResult)
+def remember_result(sender, instance, **kwargs):
+    _remember_previous(instance, 'man_of_match_id', 'team1_goals', 'team2_goals')
+
+
+@receiver(post_save, sender=MatchResult)
+@receiver(post_delete, sender=MatchResult)
+def update_result_stats(sender, instance, **kwargs):
+    # A result changes the appearances of both squads and the MOTM award, and
+    # counts as a match served for anyone in either squad who is suspended
+    fixture = Fixture.objects.filter(pk=instance.fixture_id).values('team1_id', 'team2_id').first()
+    if fixture is None:
+        return
+    player_ids = set(Player.objects.filter(
+        club_id__in=[fixture['team1_id'], fixture['team2_id']]
+    ).values_list('id', flat=True))
+    player_ids.update([instance.man_of_match_id, getattr(instance, '_previous_values', {}).get('man_of_match_id')])
+    schedule_refresh(instance.season_id, player_ids)
+
+
+@receiver(pre_save, sender=Fixture)
+def remember_fixture(sender, instance, **kwargs):
+    _remember_previous(instance, 'season_id', 'date')
+
+
+@receiver(post_save, sender=Fixture)
+def move_fixture_season(sender, instance, **kwargs):
+    # A result belongs to its fixture's season, so moving a played fixture
+    # changes both seasons' statistics and tables
+    previous = getattr(instance, '_previous_values', {}).get('season_id')
+    if previous is None or previous == instance.season_id:
+        return
+    result = MatchResult.objects.filter(fixture=instance).values('pk', 'man_of_match_id').first()
+    schedule_version_bump(season_label(previous))
+    if result is None:
+        return
+    MatchResult.objects.filter(pk=result['pk']).update(season_id=instance.season_id, updated_at=timezone.now())
+    player_ids = set(Player.objects.filter(
+        club_id__in=[instance.team1_id, instance.team2_id]
+    ).values_list('id', flat=True))
+    player_ids.update(Goal.objects.filter(match_id=result['pk']).values_list('scorer_id', flat=True))
+    player_ids.update(Goal.objects.filter(match_id=result['pk']).values_list('assist_id', flat=True))
+    player_ids.update(Booking.objects.filter(match_id=result['pk']).values_list('player_id', flat=True))
+    player_ids.add(result['man_of_match_id'])
+    for season in (previous, instance.season_id):
+        schedule_refresh(season, player_ids)
+
+
+@receiver(post_save, sender=Fixture)
+def forget_fixture_checkpoints(sender, instance, created, **kwargs):
+    from .history import forget_checkpoints
+    # Moving a fixture in time or to another season changes both sides;
+    # deleting one is handled through its result
+    previous = getattr(instance, '_previous_values', {})
+    if created or (previous.get('season_id'), previous.get('date')) == (instance.season_id, instance.date):
+        return
+    forget_checkpoints(previous.get('season_id'), previous.get('date'))
+    forget_checkpoints(instance.season_id, instance.date)
+
+
+@receiver(post_save, sender=MatchResult)
+@receiver(post_delete, sender=MatchResult)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def forget_result_checkpoints(sender, instance, **kwargs):
+    from .history import forget_checkpoints
+    # Tables as of a date after this match no longer add up
+    if sender is MatchResult:
+        match = Fixture.objects.filter(pk=instance.fixture_id).values('season_id', 'date').first()
+    else:
+        match = MatchResult.objects.filter(pk=instance.match_id).values('season_id', date=F('fixture__date')).first()
+    if match is not None:
+        forget_checkpoints(match['season_id'], match['date'])
+
+
+@receiver(pre_save, sender=Player)
+def remember_player(sender, instance, **kwargs):
+    _remember_previous(instance, 'club_id')
+
+
+@receiver(post_save, sender=Player)
+def forget_player_checkpoints(sender, instance, created, **kwargs):
+    # Cards count for the booked player's current club
+    previous = getattr(instance, '_previous_values', {}).get('club_id')
+    if not created and previous != instance.club_id:
+        StandingsCheckpoint.objects.filter(
+            season__in=Booking.objects.filter(player=instance).values('match__season')
+        ).delete()
+
+
+@receiver(pre_save, sender=Club)
+def remember_club(sender, instance, **kwargs):
+    _remember_previous(instance, 'logo', 'name')
+
+
+@receiver(post_save, sender=Club)
+def resize_logo(sender, instance, **kwargs):
+    from .jobs import enqueue
+    # Generate the thumbnails now rather than on the first page view
+    name = instance.logo.name if instance.logo else ''
+    if name and name != getattr(instance, '_previous_values', {}).get('logo'):
+        enqueue('generate_logo_variants', {'name': name}, key=f'logo:{name}')
+
+
+@receiver(post_save, sender=Club)
+def index_club(sender, instance, **kwargs):
+    from .search import index_objects
+    index_objects('club', [instance.pk])
+    previous_name = getattr(instance, '_previous_values', {}).get('name')
+    if previous_name is not None and previous_name != instance.name:
+        # Player details and fixture labels show the club's name
+        index_objects('player', list(instance.players.values_list('pk', flat=True)))
+        index_objects('fixture', list(Fixture.objects.filter(
+            Q(team1=instance) | Q(team2=instance)
+        ).values_list('pk', flat=True)))
+
+
+@receiver(post_save, sender=Player)
+def index_player(sender, instance, **kwargs):
+    from .search import index_objects
+    index_objects('player', [instance.pk])
+
+
+@receiver(post_save, sender=Fixture)
+def index_fixture(sender, instance, **kwargs):
+    from .search import index_objects
+    index_objects('fixture', [instance.pk])
+
+
+@receiver(post_save, sender=MatchResult)
+@receiver(post_delete, sender=MatchResult)
+def index_result_fixture(sender, instance, created=False, **kwargs):
+    from .search import index_objects
+    # A fixture's search result links to its match page once it has a result
+    if created or kwargs['signal'] is post_delete:
+        index_objects('fixture', [instance.fixture_id])
+
+
+@receiver(post_save, sender=Player)
+def update_player_autocomplete(sender, instance, **kwargs):
+    from .autocomplete import player_index
+    entry = (instance.pk, instance.first_name, instance.last_name, instance.position, instance.club_id)
+    transaction.on_commit(lambda: player_index.update_player(*entry))
+
+
+@receiver(post_delete, sender=Player)
+def remove_player_autocomplete(sender, instance, **kwargs):
+    from .autocomplete import player_index
+    pk = instance.pk
+    transaction.on_commit(lambda: player_index.remove_player(pk))
+
+
+@receiver(post_save, sender=Club)
+def update_club_autocomplete(sender, instance, **kwargs):
+    from .autocomplete import player_index
+    pk, name = instance.pk, instance.name
+    transaction.on_commit(lambda: player_index.update_club(pk, name))
+
+
+@receiver(post_delete, sender=Club)
+def remove_club_autocomplete(sender, instance, **kwargs):
+    from .autocomplete import player_index
+    pk = instance.pk
+    transaction.on_commit(lambda: player_index.remove_club(pk))
+
+
+@receiver(post_delete, sender=Club)
+@receiver(post_delete, sender=Player)
+@receiver(post_delete, sender=Fixture)
+def unindex(sender, instance, **kwargs):
+    from .search import remove_objects
+    remove_objects(sender._meta.model_name, [instance.pk])
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=Fixture)
+@receiver(post_delete, sender=Fixture)
+@receiver(post_save, sender=MatchResult)
+@receiver(post_delete, sender=MatchResult)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=Season)
+@receiver(post_delete, sender=Season)
+@receiver(post_save, sender=SeasonArchive)
+@receiver(post_delete, sender=SeasonArchive)
+def track_data_version(sender, **kwargs):
+    schedule_version_bump(sender)
+
+
+@receiver(post_save, sender=Fixture)
+@receiver(post_delete, sender=Fixture)
+@receiver(post_save, sender=MatchResult)
+@receiver(post_delete, sender=MatchResult)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def track_season_version(sender, instance, **kwargs):
+    """Season pages and standings are versioned per season, so edits to one season leave the others cached"""
+    if sender in (Fixture, MatchResult):
+        seasons = {instance.season_id}
+    else:
+        match_ids = {instance.match_id, getattr(instance, '_previous_values', {}).get('match_id')}
+        seasons = {_match_season(match_id) for match_id in match_ids if match_id}
+    for season in seasons - {None}:
+        schedule_version_bump(season_label(season))
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def touch_match_result(sender, instance, **kwargs):
+    """Goals and bookings are shown as part of their match, so its cached fragments must change too"""
+    MatchResult.objects.filter(pk=instance.match_id).update(updated_at=timezone.now())
+
+
+def _match_fixture_id(match_id):
+    return MatchResult.objects.filter(pk=match_id).values_list('fixture_id', flat=True).first()
+
+
+@receiver(post_save, sender=MatchResult)
+def publish_score(sender, instance, created, **kwargs):
+    from .live import publish
+    previous = getattr(instance, '_previous_values', {})
+    score = (instance.team1_goals, instance.team2_goals)
+    if created or score != (previous.get('team1_goals'), previous.get('team2_goals')):
+        publish(instance.fixture_id, 'score', {'team1_goals': score[0], 'team2_goals': score[1]})
+
+
+@receiver(post_save, sender=Goal)
+def publish_goal(sender, instance, created, **kwargs):
+    from .live import publish
+    if created:
+        publish(_match_fixture_id(instance.match_id), 'goal', {
+            'minute': instance.minute,
+            'player': f"{instance.scorer.first_name} {instance.scorer.last_name}",
+            'club_id': instance.scorer.club_id,
+            'penalty': instance.penalty,
+            'own_goal': instance.own_goal,
+        })
+
+
+@receiver(post_save, sender=Booking)
+def publish_booking(sender, instance, created, **kwargs):
+    from .live import publish
+    if created:
+        publish(_match_fixture_id(instance.match_id), 'booking', {
+            'minute': instance.minute,
+            'player': f"{instance.player.first_name} {instance.player.last_name}",
+            'club_id': instance.player.club_id,
+            'card_type': instance.card_type,
+        })
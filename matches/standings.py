@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.core.cache import cache
+from .models import Club, Player, Season, SeasonArchive
+from .utils import build_table_data, get_season_summary
+from .versioning import aget_versions, get_versions, season_label, versions_token
+
+
+# Besides the season's own fixtures, results and bookings, the league table
+# shows club and player data, the season picker and whether the season is
+# served from its archive
+SHARED_MODELS = (Club, Player, Season, SeasonArchive)
+
+ROW_FIELDS = [
+    'position', 'matches_played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+    'goal_difference', 'yellow_cards', 'red_cards', 'points', 'form',
+]
+
+
+def standings_depends_on(season):
+    return (*SHARED_MODELS, season_label(season))
+
+
+def standings_version(season):
+    """Short token that changes whenever any data behind a season's table changes"""
+    return versions_token(get_versions(standings_depends_on(season)))
+
+
+async def astandings_version(season):
+    return versions_token(await aget_versions(standings_depends_on(season)))
+
+
+def standings_key(season, version):
+    return f'standings:{season}:{version}'
+
+
+def serialize_row(club_data):
+    club = club_data['club']
+    row = {field: club_data[field] for field in ROW_FIELDS}
+    row.update(id=club.pk, name=club.name)
+    return row
+
+
+def remember_standings(season, version, table_data):
+    """Keep a season's table as of a version in the cache, so later requests can be diffed against it"""
+    snapshot = {
+        'rows': {club_data['club'].pk: serialize_row(club_data) for club_data in table_data},
+        'order': [club_data['club'].pk for club_data in table_data],
+        'summary': get_season_summary(table_data),
+    }
+    cache.set(standings_key(season, version), snapshot, settings.FRAGMENT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def archived_standings(season, version, archive):
+    """An archived season's final table, in the layout of remember_standings()"""
+    from .archive import load_snapshot
+    frozen = load_snapshot(archive)
+    snapshot = {
+        'rows': {row['id']: {field: row[field] for field in ('id', 'name', *ROW_FIELDS)} for row in frozen['table']},
+        'order': [row['id'] for row in frozen['table']],
+        'summary': frozen['summary'],
+    }
+    cache.set(standings_key(season, version), snapshot, settings.FRAGMENT_CACHE_TIMEOUT)
+    return snapshot
+
+
+def standings_snapshot(season, version):
+    """A season's table rows and summary for a version, computed at most once per version"""
+    snapshot = cache.get(standings_key(season, version))
+    if snapshot is None:
+        archive = SeasonArchive.objects.filter(season=season).first()
+        if archive is not None:
+            snapshot = archived_standings(season, version, archive)
+        else:
+            snapshot = remember_standings(season, version, build_table_data(season))
+    return snapshot
+
+
+def standings_diff(season, since, version):
+    """
+    Rows that differ between the season's table the client has at version
+    `since` and the table at `version`.
+
+    When the client's version is unknown (or has left the cache) every row
+    is sent with full=True.
+    """
+    current = standings_snapshot(season, version)
+    previous = cache.get(standings_key(season, since)) if since else None
+    if previous is None:
+        rows = list(current['rows'].values())
+    else:
+        rows = [row for club_id, row in current['rows'].items() if previous['rows'].get(club_id) != row]
+    return {
+        'version': version,
+        'full': previous is None,
+        'order': current['order'],
+        'rows': rows,
+        'summary': current['summary'],
+    }
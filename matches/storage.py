@@ -0,0 +1,60 @@
+import gzip
+from pathlib import PurePosixPath
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip variants are written
+    brotli = None
+
+
+# Text formats worth compressing; images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.json', '.map', '.svg', '.txt', '.xml', '.html', '.ico'}
+
+# A variant is only kept when it is at least this much smaller
+MIN_SAVING = 0.05
+
+
+def compressed_variants(data):
+    """[(suffix, bytes)] of the worthwhile precompressed versions of `data`"""
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    return [(suffix, compressed) for suffix, compressed in variants
+            if len(compressed) <= len(data) * (1 - MIN_SAVING)]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage (content-hashed file names, with the references in
+    stylesheets rewritten to match) that also writes .gz and, when the
+    brotli package is installed, .br variants of text files at collectstatic
+    time, for StaticFilesMiddleware to serve.
+    """
+
+    def stored_name(self, name):
+        # Like manifest_strict for a single missing entry: an unhashed URL
+        # would be cached for a year by browsers and proxies
+        if not self.hashed_files:
+            raise ValueError(f"No staticfiles manifest in {self.location}; run collectstatic before serving {name!r}")
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        written = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not isinstance(processed, Exception):
+                written.update((name, hashed_name))
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(written):
+            if PurePosixPath(name).suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        for suffix, compressed in compressed_variants(data):
+            with open(self.path(name + suffix), 'wb') as variant:
+                variant.write(compressed)
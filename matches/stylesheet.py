@@ -0,0 +1,58 @@
+"""
+The site stylesheet, built with the Tailwind CSS standalone CLI.
+
+matches/styles/site.css holds the theme and the site's own styles. The CLI
+adds the utilities the templates and scripts use and writes
+static/css/site.css, which is committed, so deployments need neither Node
+nor the CLI.
+"""
+import shutil
+import subprocess
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+
+
+INPUT_PATH = Path(__file__).resolve().parent / 'styles' / 'site.css'
+
+
+def stylesheet_path():
+    return Path(settings.BASE_DIR) / 'static' / 'css' / 'site.css'
+
+
+def tailwind_cli():
+    """Path of the Tailwind CLI (TAILWIND_CLI), or None when it is not installed"""
+    return shutil.which(settings.TAILWIND_CLI)
+
+
+def build_stylesheet():
+    """Run the CLI over the sources and return the minified stylesheet"""
+    cli = tailwind_cli()
+    if cli is None:
+        raise RuntimeError(f"Tailwind CLI {settings.TAILWIND_CLI!r} not found; install it or set TAILWIND_CLI")
+    # crispy-tailwind's templates and tags add classes to the forms; they live
+    # in site-packages, so site.css cannot name them itself
+    entry = f'@import "{INPUT_PATH}";\n@source "{apps.get_app_config("crispy_tailwind").path}";\n'
+    result = subprocess.run(
+        [cli, '--input', '-', '--output', '-', '--minify'],
+        input=entry, capture_output=True, text=True, cwd=settings.BASE_DIR,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Tailwind CLI failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def write_stylesheet():
+    """
+    Build the stylesheet into static/css/site.css; collectstatic gives the
+    copy it collects a content-hashed name.
+
+    Returns (path, size in bytes, whether it changed).
+    """
+    css = build_stylesheet()
+    path = stylesheet_path()
+    changed = not path.exists() or path.read_text(encoding='utf-8') != css
+    if changed:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(css, encoding='utf-8')
+    return path, len(css.encode()), changed
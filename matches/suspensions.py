@@ -0,0 +1,205 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from .models import Player, Season, MatchResult, Booking, DisciplinaryRecord, SeasonArchive
+from .transactions import write_transaction
+from .versioning import bump_versions
+
+
+COUNTER_FIELDS = ['accumulated_yellows', 'matches_banned', 'matches_served', 'carried_over']
+
+
+class SuspensionTracker:
+    """
+    Apply the league's card rules to matches and bookings fed in date order.
+
+    A red card bans a player for SUSPENSION_RED_CARD_MATCHES club matches.
+    Every SUSPENSION_YELLOW_CARD_LIMIT yellow cards ban a player for
+    SUSPENSION_YELLOW_CARD_MATCHES matches and reset the count. Each match the
+    player's club plays while a ban is pending counts as one match served.
+    Bans still unserved when a season ends carry over into the competition's
+    next season; accumulated yellows do not.
+    """
+
+    def __init__(self, player_clubs):
+        self.player_clubs = player_clubs
+        self.records = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+        self.pending_by_club = defaultdict(set)
+        self.red_ban = settings.SUSPENSION_RED_CARD_MATCHES
+        self.yellow_limit = max(settings.SUSPENSION_YELLOW_CARD_LIMIT, 1)
+        self.yellow_ban = settings.SUSPENSION_YELLOW_CARD_MATCHES
+
+    def carry_over(self, player_id, matches):
+        """Start the season with a ban brought forward from the previous one"""
+        record = self.records[player_id]
+        record['carried_over'] += matches
+        record['matches_banned'] += matches
+        if player_id in self.player_clubs:
+            self.pending_by_club[self.player_clubs[player_id]].add(player_id)
+
+    def match_played(self, club_ids):
+        """Players of these clubs with a pending ban sit this match out"""
+        for club_id in club_ids:
+            pending = self.pending_by_club[club_id]
+            for player_id in list(pending):
+                record = self.records[player_id]
+                record['matches_served'] += 1
+                if record['matches_served'] >= record['matches_banned']:
+                    pending.discard(player_id)
+
+    def booking(self, player_id, card_type):
+        record = self.records[player_id]
+        if card_type == 'red':
+            record['matches_banned'] += self.red_ban
+        else:
+            record['accumulated_yellows'] += 1
+            if record['accumulated_yellows'] >= self.yellow_limit:
+                record['accumulated_yellows'] -= self.yellow_limit
+                record['matches_banned'] += self.yellow_ban
+        if record['matches_banned'] > record['matches_served'] and player_id in self.player_clubs:
+            self.pending_by_club[self.player_clubs[player_id]].add(player_id)
+
+
+def _adjacent_season(season, later):
+    """The season of the same competition just before (or after) `season`, or None"""
+    season = Season.objects.get(pk=season)
+    seasons = Season.objects.filter(competition_id=season.competition_id)
+    if later:
+        seasons = seasons.filter(start_date__gt=season.start_date).order_by('start_date')
+    else:
+        seasons = seasons.filter(start_date__lt=season.start_date).order_by('-start_date')
+    return seasons.values_list('pk', flat=True).first()
+
+
+def carried_bans(season, player_ids=None):
+    """Matches of suspension each player still owed when the previous season ended"""
+    previous = _adjacent_season(season, later=False)
+    if previous is None:
+        return {}
+    records = DisciplinaryRecord.objects.filter(season=previous, matches_banned__gt=F('matches_served'))
+    if player_ids is not None:
+        records = records.filter(player_id__in=player_ids)
+    return {
+        player_id: banned - served
+        for player_id, banned, served in records.values_list('player_id', 'matches_banned', 'matches_served')
+    }
+
+
+def compute_suspensions(season, player_ids=None):
+    """
+    Replay a season's results and bookings in date order.
+
+    With player_ids, only those players' bookings and their clubs' results are
+    read; otherwise the whole season is processed in one pass. Returns a dict
+    of player_id -> counters for players with any card history.
+    """
+    players = Player.objects.all()
+    bookings = Booking.objects.filter(match__season=season)
+    if player_ids is not None:
+        player_ids = set(player_ids)
+        players = players.filter(id__in=player_ids)
+        bookings = bookings.filter(player_id__in=player_ids)
+
+    player_clubs = dict(players.values_list('id', 'club_id'))
+    results = MatchResult.objects.filter(season=season)
+    if player_ids is not None:
+        clubs = set(player_clubs.values())
+        results = results.filter(Q(fixture__team1_id__in=clubs) | Q(fixture__team2_id__in=clubs))
+
+    cards = defaultdict(list)
+    for match_id, player_id, card_type in bookings.order_by('minute', 'id').values_list('match_id', 'player_id', 'card_type'):
+        cards[match_id].append((player_id, card_type))
+
+    tracker = SuspensionTracker(player_clubs)
+    for player_id, matches in carried_bans(season, player_ids).items():
+        tracker.carry_over(player_id, matches)
+    matches = results.order_by('fixture__date', 'id').values_list('id', 'fixture__team1_id', 'fixture__team2_id')
+    for match_id, team1_id, team2_id in matches.iterator():
+        tracker.match_played((team1_id, team2_id))
+        for player_id, card_type in cards.pop(match_id, ()):
+            tracker.booking(player_id, card_type)
+
+    return {
+        player_id: record for player_id, record in tracker.records.items()
+        if any(record.values())
+    }
+
+
+def refresh_suspensions(season, player_ids=None, follow=True):
+    """
+    Store the replayed counters for the given players, or the whole season
+    when player_ids is None. With follow, the next season is refreshed for
+    any player whose record changed, since a ban may carry over into it.
+    """
+    if SeasonArchive.objects.filter(season=season, purged=True).exists():
+        # Nothing is left to replay; the records kept are the bans it carries forward
+        return
+    computed = compute_suspensions(season, player_ids)
+    existing = DisciplinaryRecord.objects.filter(season=season)
+    if player_ids is not None:
+        existing = existing.filter(player_id__in=player_ids)
+
+    changed, stale, affected = [], [], set(computed)
+    for record in existing:
+        values = computed.pop(record.player_id, None)
+        if values is None:
+            stale.append(record.pk)
+        elif any(getattr(record, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(record, field, value)
+            changed.append(record)
+        else:
+            affected.discard(record.player_id)
+
+    with transaction.atomic():
+        if stale:
+            DisciplinaryRecord.objects.filter(pk__in=stale).delete()
+        if changed:
+            DisciplinaryRecord.objects.bulk_update(changed, COUNTER_FIELDS)
+        DisciplinaryRecord.objects.bulk_create([
+            DisciplinaryRecord(player_id=player_id, season_id=season, **values)
+            for player_id, values in computed.items()
+        ])
+        if stale or changed or computed:
+            bump_versions(DisciplinaryRecord)
+
+    if follow and affected:
+        following = _adjacent_season(season, later=True)
+        if following is not None:
+            refresh_suspensions(following, affected)
+
+
+def rebuild_suspensions():
+    """
+    Reprocess every season in one pass each, e.g. after a bulk import or a
+    rule change. Seasons are replayed oldest first so carried bans are
+    current; purged archives keep the records they still carry forward.
+    """
+    seasons = Season.objects.exclude(archive__purged=True).order_by('start_date', 'pk')
+    with write_transaction():
+        for season in seasons.values_list('pk', flat=True):
+            refresh_suspensions(season, follow=False)
+
+
+def _suspended_records(season, player_ids=None):
+    records = DisciplinaryRecord.objects.filter(season=season, matches_banned__gt=F('matches_served'))
+    if player_ids is not None:
+        records = records.filter(player_id__in=player_ids)
+    return records.values_list('player_id', flat=True)
+
+
+def suspended_player_ids(season, player_ids=None):
+    """IDs of players currently serving a ban"""
+    return set(_suspended_records(season, player_ids))
+
+
+async def asuspended_player_ids(season, player_ids=None):
+    return {player_id async for player_id in _suspended_records(season, player_ids)}
+
+
+def label_suspended_players(field, suspended):
+    """Mark the players in suspended, a set of IDs from suspended_player_ids(), in a player dropdown"""
+    field.label_from_instance = (
+        lambda player: f"{player} (suspended)" if player.pk in suspended else str(player)
+    )
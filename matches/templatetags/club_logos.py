@@ -0,0 +1,17 @@
+from django import template
+from ..logos import logo_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag('matches/includes/club_logo.html')
+def club_logo(club, size, css_class=''):
+    """A club's logo resized for `size` CSS pixels, as WebP with a PNG fallback"""
+    sources = logo_sources(club.logo.name, size)
+    return {
+        'club': club,
+        'size': size,
+        'css_class': css_class,
+        'webp': sources['webp'],
+        'png': sources['png'],
+    }
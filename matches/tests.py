@@ -1,9 +1,53 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+from asgiref.sync import SyncToAsync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.db import OperationalError, connection, transaction
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.urls import resolve
+from django.test.utils import CaptureQueriesContext
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from datetime import timedelta
-from .models import Club, Player, Fixture, MatchResult, Booking, Goal
-from .utils import calculate_table
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from datetime import date, datetime, time, timedelta
+from .models import (
+    Club, Player, Competition, Season, Fixture, MatchResult, Booking, Goal, PlayerSeasonStats, DisciplinaryRecord,
+    SeasonArchive, StandingsCheckpoint, MatchEvent, Job,
+)
+from .aggregates import current_season, leaderboard, rebuild_player_stats
+from .archive import archive_season, build_snapshot
+from .autocomplete import player_index
+from .clashes import audit_clashes, find_clashes
+from .history import parse_until, standings_as_of
+from .jobs import TASKS, claim_jobs, queue_stats, requeue_stale_jobs, run_job
+from .live import LiveHub
+from .logos import LOGO_FORMATS, LOGO_SIZES, variant_name
+from .management.commands.import_report import boot_report
+from . import routers, views
+from .middleware import ReplicaRoutingMiddleware, StaticFilesMiddleware
+from .scheduling import generate_fixtures, round_robin_rounds
+from .search import CANDIDATES
+from .stylesheet import build_stylesheet, stylesheet_path, tailwind_cli
+from .suspensions import rebuild_suspensions, suspended_player_ids
+from .transactions import serialized_writes, write_transaction
+from .utils import build_table_data, calculate_table, get_season_summary
+from .versioning import bump_versions, table_row_version
+from .warmup import warm_caches
 
 
 class BasicTableCalculationTestCase(TestCase):
@@ -24,8 +68,8 @@ class BasicTableCalculationTestCase(TestCase):
         past_date = timezone.now() - timedelta(days=1)
         
         self.fixture = Fixture.objects.create(
-            home_team=self.club1,
-            away_team=self.club2,
+            team1=self.club1,
+            team2=self.club2,
             date=past_date,
             venue="Test Stadium"
         )
@@ -35,8 +79,8 @@ class BasicTableCalculationTestCase(TestCase):
         # Team A beats Team B 2-1
         MatchResult.objects.create(
             fixture=self.fixture,
-            home_goals=2,
-            away_goals=1
+            team1_goals=2,
+            team2_goals=1
         )
         
         table_data = calculate_table()
@@ -60,8 +104,8 @@ class BasicTableCalculationTestCase(TestCase):
         # Team A wins 3-0
         MatchResult.objects.create(
             fixture=self.fixture,
-            home_goals=3,
-            away_goals=0
+            team1_goals=3,
+            team2_goals=0
         )
         
         table_data = calculate_table()
@@ -101,8 +145,8 @@ class ModelValidationTestCase(TestCase):
         # Should raise error if same team plays against itself
         with self.assertRaises(ValidationError):
             fixture = Fixture(
-                home_team=club,
-                away_team=club,
+                team1=club,
+                team2=club,
                 date=timezone.now(),
                 venue="Test Stadium"
             )
@@ -120,4 +164,1481 @@ class EmptyTableTestCase(TestCase):
         table_data = calculate_table()
         
         # Should return empty list as no matches played
-        self.assertEqual(len(table_data), 0)
\ No newline at end of file
+        self.assertEqual(len(table_data), 0)
+
+class ImportLeagueCommandTestCase(TestCase):
+    """Test the bulk import management command"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+    
+    def write_csv(self, name, header, rows):
+        path = Path(self.tmpdir.name) / name
+        with path.open('w', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return str(path)
+    
+    def import_files(self, *files, **options):
+        call_command('import_league', *files, stdout=StringIO(), **options)
+    
+    def write_season(self):
+        return [
+            self.write_csv('clubs.csv', ['name'], [['Team A'], ['Team B']]),
+            self.write_csv('players.csv', ['club', 'name', 'position'], [
+                ['Team A', 'John Doe', 'FWD'],
+                ['Team B', 'Jim Beam', 'DEF'],
+            ]),
+            self.write_csv('fixtures.csv', ['team1', 'team2', 'date', 'time'], [
+                ['Team A', 'Team B', '2025-10-05', '06:00'],
+            ]),
+            self.write_csv('results.csv', ['team1', 'team2', 'date', 'time', 'team1_goals', 'team2_goals', 'man_of_match'], [
+                ['Team A', 'Team B', '2025-10-05', '06:00', '2', '0', 'John Doe'],
+            ]),
+            self.write_csv('goals.csv', ['team1', 'team2', 'date', 'time', 'scorer', 'minute', 'penalty'], [
+                ['Team A', 'Team B', '2025-10-05', '06:00', 'John Doe', '10', 'yes'],
+                ['Team A', 'Team B', '2025-10-05', '06:00', 'John Doe', '30', ''],
+            ]),
+            self.write_csv('bookings.csv', ['team1', 'team2', 'date', 'time', 'player', 'card_type', 'minute'], [
+                ['Team A', 'Team B', '2025-10-05', '06:00', 'Jim Beam', 'yellow', '44'],
+            ]),
+        ]
+    
+    def test_import_full_season(self):
+        """Files are imported in dependency order regardless of argument order"""
+        files = self.write_season()
+        self.import_files(*reversed(files), batch_size=1)
+        
+        self.assertEqual(Club.objects.count(), 2)
+        self.assertEqual(Player.objects.count(), 2)
+        result = MatchResult.objects.get()
+        self.assertEqual((result.team1_goals, result.team2_goals), (2, 0))
+        self.assertEqual(result.man_of_match.first_name, "John")
+        self.assertEqual(result.goals.count(), 2)
+        self.assertTrue(result.goals.get(minute=10).penalty)
+        self.assertEqual(result.bookings.get().player.last_name, "Beam")
+    
+    def test_reimport_skips_or_upserts(self):
+        """Re-importing skips existing rows unless upsert mode is used"""
+        files = self.write_season()
+        self.import_files(*files)
+        self.import_files(*files)
+        self.assertEqual(Fixture.objects.count(), 1)
+        self.assertEqual(Goal.objects.count(), 2)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(PlayerSeasonStats.objects.get(player__first_name="John").goals, 2)
+        
+        files[1] = self.write_csv('players.csv', ['club', 'name', 'position'], [['Team A', 'John Doe', 'MID']])
+        self.import_files(*files, upsert=True)
+        self.assertEqual(Player.objects.get(first_name="John").position, 'MID')
+        self.assertEqual(Goal.objects.count(), 2)
+        self.assertEqual(Booking.objects.count(), 1)
+    
+    def test_unknown_club_is_rejected(self):
+        """Rows referencing unknown clubs abort the import"""
+        path = self.write_csv('players.csv', ['club', 'name', 'position'], [['Nowhere FC', 'A B', 'GK']])
+        with self.assertRaises(CommandError):
+            self.import_files(path)
+
+
+class FixtureSchedulingTestCase(TestCase):
+    """Test round-robin fixture generation"""
+    
+    def setUp(self):
+        self.clubs = [Club.objects.create(name=f"Club {i}") for i in range(5)]
+        self.club_ids = [club.id for club in self.clubs]
+        self.slots = [time(6, 0), time(6, 45)]
+    
+    def test_double_round_robin_pairings(self):
+        """Every pair meets twice, once at each end, and nobody plays itself"""
+        rounds = round_robin_rounds(self.club_ids)
+        pairs = [pair for pairs in rounds for pair in pairs]
+        
+        self.assertEqual(len(pairs), 5 * 4)
+        self.assertEqual(len(set(pairs)), len(pairs))
+        self.assertTrue(all(home != away for home, away in pairs))
+        for pairs_in_round in rounds:
+            clubs_in_round = [club for pair in pairs_in_round for club in pair]
+            self.assertEqual(len(clubs_in_round), len(set(clubs_in_round)))
+    
+    def test_no_club_plays_twice_on_one_day(self):
+        """Generated fixtures respect slots and the one-match-per-day rule"""
+        fixtures = generate_fixtures(self.club_ids, date(2025, 10, 5), self.slots, ["Pitch 1"])
+        
+        self.assertEqual(Fixture.objects.count(), 20)
+        per_day = {}
+        for fixture in fixtures:
+            kickoff = timezone.localtime(fixture.date)
+            self.assertIn(kickoff.time(), self.slots)
+            clubs = per_day.setdefault(kickoff.date(), [])
+            clubs += [fixture.team1_id, fixture.team2_id]
+        for clubs in per_day.values():
+            self.assertEqual(len(clubs), len(set(clubs)))
+            self.assertLessEqual(len(clubs), 4)
+    
+    def test_existing_fixtures_are_worked_around(self):
+        """Clubs and slots already booked on a matchday are not double booked"""
+        first_day = date(2025, 10, 5)
+        Fixture.objects.create(
+            team1=self.clubs[0], team2=self.clubs[1], venue="Pitch 1",
+            date=timezone.make_aware(datetime.combine(first_day, time(6, 0))),
+        )
+        fixtures = generate_fixtures(self.club_ids, first_day, self.slots, ["Pitch 1"], skip_dates=[date(2025, 10, 12)])
+        
+        on_first_day = [f for f in fixtures if timezone.localtime(f.date).date() == first_day]
+        self.assertLessEqual(len(on_first_day), 1)
+        for fixture in on_first_day:
+            self.assertEqual(timezone.localtime(fixture.date).time(), time(6, 45))
+            self.assertFalse({fixture.team1_id, fixture.team2_id} & {self.clubs[0].id, self.clubs[1].id})
+        self.assertFalse(any(timezone.localtime(f.date).date() == date(2025, 10, 12) for f in fixtures))
+    
+    @override_settings(MATCH_DURATION_MINUTES=45)
+    def test_slots_closer_than_a_match_do_not_overlap(self):
+        """Kick-offs at one venue are spaced at least a match duration apart"""
+        first_day = date(2025, 10, 5)
+        Fixture.objects.create(
+            team1=self.clubs[0], team2=self.clubs[1], venue="Pitch 1",
+            date=timezone.make_aware(datetime.combine(first_day, time(6, 20))),
+        )
+        slots = [time(6, 0), time(6, 30), time(7, 0)]
+        fixtures = generate_fixtures(self.club_ids, first_day, slots, ["Pitch 1"])
+        
+        per_day = {}
+        for fixture in fixtures:
+            kickoff = timezone.localtime(fixture.date)
+            per_day.setdefault(kickoff.date(), []).append(kickoff)
+        self.assertNotIn(first_day, per_day)
+        for kickoffs in per_day.values():
+            kickoffs.sort()
+            for earlier, later in zip(kickoffs, kickoffs[1:]):
+                self.assertGreaterEqual(later - earlier, timedelta(minutes=45))
+        self.assertEqual(audit_clashes(), [])
+
+
+class FixtureClashTestCase(TestCase):
+    """Test clash detection for clubs and venues"""
+    
+    def setUp(self):
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.club3 = Club.objects.create(name="Team C")
+        self.club4 = Club.objects.create(name="Team D")
+        self.kickoff = timezone.make_aware(datetime(2025, 10, 5, 6, 0))
+        self.fixture = Fixture.objects.create(
+            team1=self.club1, team2=self.club2, date=self.kickoff, venue="Pitch 1"
+        )
+    
+    def test_club_playing_twice_at_once(self):
+        """A club cannot be in two overlapping fixtures"""
+        fixture = Fixture(team1=self.club3, team2=self.club1, date=self.kickoff + timedelta(minutes=30), venue="Pitch 2")
+        with self.assertRaises(ValidationError):
+            fixture.clean()
+    
+    def test_venue_double_booked(self):
+        """A venue cannot host two overlapping fixtures"""
+        fixture = Fixture(team1=self.club3, team2=self.club4, date=self.kickoff, venue="Pitch 1")
+        self.assertEqual(list(find_clashes(fixture)), [self.fixture])
+        with self.assertRaises(ValidationError):
+            fixture.clean()
+    
+    def test_back_to_back_slots_do_not_clash(self):
+        """The next slot starts when the previous match ends"""
+        fixture = Fixture(team1=self.club1, team2=self.club3, date=self.kickoff + timedelta(minutes=45), venue="Pitch 1")
+        fixture.clean()
+        
+        # Editing a fixture does not clash with itself
+        self.fixture.clean()
+    
+    def test_audit_lists_every_conflict(self):
+        """The sweep line audit reports each clashing pair per shared resource"""
+        Fixture.objects.create(team1=self.club3, team2=self.club4, date=self.kickoff + timedelta(minutes=10), venue="Pitch 1")
+        Fixture.objects.create(team1=self.club1, team2=self.club4, date=self.kickoff + timedelta(minutes=20), venue="Pitch 2")
+        Fixture.objects.create(team1=self.club1, team2=self.club2, date=self.kickoff + timedelta(days=7), venue="Pitch 1")
+        
+        clashes = audit_clashes()
+        resources = sorted(str(resource) for resource, _earlier, _later in clashes)
+        self.assertEqual(resources, ["Pitch 1", "Team A", "Team D"])
+
+
+class PlayerSeasonStatsTestCase(TestCase):
+    """Test the incrementally maintained player season aggregates"""
+    
+    def setUp(self):
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.striker = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club1)
+        self.namesake = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club2)
+        self.winger = Player.objects.create(first_name="Jim", last_name="Beam", position="MID", club=self.club1)
+        self.fixture = Fixture.objects.create(
+            team1=self.club1, team2=self.club2, venue="Test Stadium",
+            date=timezone.make_aware(datetime(2025, 10, 5, 6, 0)),
+        )
+    
+    def stats(self, player):
+        return PlayerSeasonStats.objects.get(player=player, season=self.fixture.season)
+    
+    def test_stats_follow_goals_bookings_and_results(self):
+        """Saving and deleting events keeps the totals in step"""
+        with self.captureOnCommitCallbacks(execute=True):
+            result = MatchResult.objects.create(fixture=self.fixture, team1_goals=2, team2_goals=1, man_of_match=self.striker)
+            Goal.objects.create(match=result, scorer=self.striker, assist=self.winger, minute=10, penalty=True)
+            Goal.objects.create(match=result, scorer=self.striker, minute=20)
+            Goal.objects.create(match=result, scorer=self.striker, minute=30, own_goal=True)
+            Booking.objects.create(match=result, player=self.namesake, card_type='yellow', minute=40)
+        
+        striker = self.stats(self.striker)
+        self.assertEqual((striker.goals, striker.penalties, striker.own_goals), (2, 1, 1))
+        self.assertEqual((striker.motm_awards, striker.appearances), (1, 1))
+        self.assertEqual(self.stats(self.winger).assists, 1)
+        
+        # Namesakes are kept apart
+        namesake = self.stats(self.namesake)
+        self.assertEqual((namesake.goals, namesake.yellow_cards), (0, 1))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Goal.objects.filter(minute=20).get().delete()
+            result.man_of_match = self.winger
+            result.save()
+        self.assertEqual(self.stats(self.striker).goals, 1)
+        self.assertEqual(self.stats(self.striker).motm_awards, 0)
+        self.assertEqual(self.stats(self.winger).motm_awards, 1)
+    
+    def test_leaderboard_and_rebuild(self):
+        """Leaderboards read the stored totals and a rebuild reproduces them"""
+        result = MatchResult.objects.create(fixture=self.fixture, team1_goals=1, team2_goals=2)
+        Goal.objects.create(match=result, scorer=self.namesake, minute=5)
+        Goal.objects.create(match=result, scorer=self.namesake, minute=15)
+        Goal.objects.create(match=result, scorer=self.striker, minute=25)
+        rebuild_player_stats()
+        
+        scorers = list(leaderboard(self.fixture.season_id, 'goals'))
+        self.assertEqual([row.player for row in scorers], [self.namesake, self.striker])
+        self.assertEqual(scorers[0].goals, 2)
+        
+        response = self.client.get('/statistics/')
+        self.assertEqual(list(response.context['top_scorers']), scorers)
+
+
+@override_settings(SUSPENSION_RED_CARD_MATCHES=1, SUSPENSION_YELLOW_CARD_LIMIT=2, SUSPENSION_YELLOW_CARD_MATCHES=1)
+class SuspensionTestCase(TestCase):
+    """Test card accumulation and suspensions"""
+    
+    def setUp(self):
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.player = Player.objects.create(first_name="John", last_name="Doe", position="DEF", club=self.club1)
+        self.other = Player.objects.create(first_name="Jim", last_name="Beam", position="FWD", club=self.club2)
+        self.results = []
+        for week in range(4):
+            fixture = Fixture.objects.create(
+                team1=self.club1, team2=self.club2, venue="Test Stadium",
+                date=timezone.make_aware(datetime(2025, 10, 5, 6, 0)) + timedelta(weeks=week),
+            )
+            self.results.append(MatchResult(fixture=fixture))
+        self.season = fixture.season
+    
+    def play(self, week, *cards):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.results[week]
+            result.save()
+            for player, card_type in cards:
+                Booking.objects.create(match=result, player=player, card_type=card_type, minute=10)
+    
+    def record(self):
+        return DisciplinaryRecord.objects.get(player=self.player, season=self.season)
+    
+    def test_yellow_accumulation_ban_is_served(self):
+        """Reaching the yellow limit bans the player for the club's next match"""
+        self.play(0, (self.player, 'yellow'))
+        self.assertFalse(self.record().is_suspended)
+        
+        self.play(1, (self.player, 'yellow'))
+        record = self.record()
+        self.assertEqual((record.accumulated_yellows, record.pending_ban), (0, 1))
+        self.assertEqual(suspended_player_ids(self.season.pk), {self.player.id})
+        
+        self.play(2)
+        self.assertFalse(self.record().is_suspended)
+        self.assertEqual(self.record().matches_served, 1)
+    
+    def test_late_entry_and_bulk_recompute_agree(self):
+        """Bookings entered out of order are replayed in date order"""
+        self.play(0)
+        self.play(1)
+        self.play(2, (self.player, 'red'))
+        self.play(0, (self.player, 'red'))
+        
+        record = self.record()
+        self.assertEqual((record.matches_banned, record.matches_served), (2, 1))
+        
+        DisciplinaryRecord.objects.all().delete()
+        rebuild_suspensions()
+        self.assertEqual(
+            (self.record().matches_banned, self.record().matches_served, self.record().pending_ban),
+            (2, 1, 1),
+        )
+    
+    def test_suspended_players_are_flagged(self):
+        """Squad dropdown API and players list show suspended players"""
+        self.play(0, (self.player, 'red'))
+        
+        response = self.client.get(f'/api/fixture/{self.results[1].fixture_id}/players/')
+        flags = {player['id']: player['suspended'] for player in response.json()['all_players']}
+        self.assertEqual(flags, {self.player.id: True, self.other.id: False})
+        
+        response = self.client.get('/players/list/')
+        self.assertEqual(response.context['suspended_ids'], {self.player.id})
+        self.assertContains(response, 'Suspended')
+    
+    def test_admin_labels_bans_of_the_results_season(self):
+        """Editing a past season's result marks the players banned in that season, not the current one"""
+        self.play(0)
+        with self.captureOnCommitCallbacks(execute=True):
+            fixture = Fixture.objects.create(team1=self.club1, team2=self.club2, date=timezone.now())
+            result = MatchResult.objects.create(fixture=fixture)
+            Booking.objects.create(match=result, player=self.player, card_type='red', minute=10)
+        self.assertEqual(current_season(), fixture.season_id)
+        self.assertEqual(suspended_player_ids(fixture.season_id), {self.player.id})
+        
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.get(f'/admin/matches/matchresult/{self.results[0].pk}/change/')
+        self.assertContains(response, 'John Doe (Team A)')
+        self.assertNotContains(response, '(suspended)')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/admin/matches/matchresult/{result.pk}/change/')
+        self.assertContains(response, 'John Doe (Team A) (suspended)')
+        # One lookup for the form and one per inline formset, not one per dropdown
+        ban_queries = [q for q in queries if 'matches_disciplinaryrecord' in q['sql']]
+        self.assertEqual(len(ban_queries), 3)
+    
+    def test_unserved_ban_carries_into_next_season(self):
+        """A red card in a season's last match is served in the next season, even once the old one is purged"""
+        with self.captureOnCommitCallbacks(execute=True):
+            next_fixture = Fixture.objects.create(
+                team1=self.club1, team2=self.club2, venue="Test Stadium",
+                date=timezone.make_aware(datetime(2026, 3, 1, 6, 0)),
+            )
+        next_season = next_fixture.season
+        self.play(3, (self.player, 'red'))
+        
+        record = DisciplinaryRecord.objects.get(player=self.player, season=next_season)
+        self.assertEqual((record.carried_over, record.pending_ban), (1, 1))
+        self.assertEqual(suspended_player_ids(next_season.pk), {self.player.id})
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_season(self.season, purge=True)
+        rebuild_suspensions()
+        self.assertEqual(suspended_player_ids(next_season.pk), {self.player.id})
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            MatchResult.objects.create(fixture=next_fixture)
+        record = DisciplinaryRecord.objects.get(player=self.player, season=next_season)
+        self.assertEqual((record.matches_banned, record.matches_served), (1, 1))
+        self.assertEqual(suspended_player_ids(next_season.pk), set())
+
+
+class ConditionalPageTestCase(TestCase):
+    """Test ETag / Last-Modified revalidation of public pages"""
+    
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club1 = Club.objects.create(name="Team A")
+            self.club2 = Club.objects.create(name="Team B")
+            self.fixture = Fixture.objects.create(
+                team1=self.club1, team2=self.club2,
+                date=timezone.make_aware(datetime(2025, 10, 5, 6, 0)), venue="Pitch 1"
+            )
+    
+    def test_unchanged_page_is_not_modified(self):
+        """A repeat request with the page's ETag gets an empty 304"""
+        response = self.client.get('/table/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        
+        # One query for the season shown and one for the versions it depends on
+        with self.assertNumQueries(2):
+            response = self.client.get('/table/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+    
+    def test_saving_data_changes_etag(self):
+        """Saving a model the page depends on invalidates its ETag"""
+        etag = self.client.get('/table/')['ETag']
+        clubs_etag = self.client.get('/clubs/')['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            MatchResult.objects.create(fixture=self.fixture, team1_goals=1, team2_goals=0)
+        
+        response = self.client.get('/table/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        
+        # Pages that do not read results keep their ETag
+        response = self.client.get('/clubs/', HTTP_IF_NONE_MATCH=clubs_etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_season_changes_revalidate_season_pages(self):
+        """Renaming or archiving a season changes the table, fixtures and statistics ETags"""
+        paths = ['/table/', '/fixtures/', '/statistics/']
+        etags = {path: self.client.get(path)['ETag'] for path in paths}
+        season = self.fixture.season
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            season.name = "Spring"
+            season.save()
+        for path in paths:
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etags[path])
+            self.assertEqual(response.status_code, 200, path)
+            etags[path] = response['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            snapshot = json.dumps(build_snapshot(season)).encode()
+            SeasonArchive.objects.create(season=season, data=gzip.compress(snapshot), matches=1)
+        for path in paths:
+            self.assertNotEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etags[path]).status_code, 304, path)
+
+
+class FragmentCacheTestCase(TestCase):
+    """Test per-row and per-card fragment cache versions"""
+    
+    def setUp(self):
+        cache.clear()
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.club3 = Club.objects.create(name="Team C")
+        self.player = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club1)
+        kickoff = timezone.make_aware(datetime(2025, 10, 5, 6, 0))
+        self.result1 = MatchResult.objects.create(
+            fixture=Fixture.objects.create(team1=self.club1, team2=self.club2, date=kickoff),
+            team1_goals=1, team2_goals=0,
+        )
+        self.result2 = MatchResult.objects.create(
+            fixture=Fixture.objects.create(team1=self.club3, team2=self.club2, date=kickoff + timedelta(days=7)),
+            team1_goals=0, team2_goals=0,
+        )
+    
+    def row_versions(self):
+        return {row['club'].name: table_row_version(row) for row in self.client.get('/table/').context['table_data']}
+    
+    def test_editing_a_result_changes_only_affected_rows(self):
+        """Only the two clubs of an edited result get new row versions"""
+        before = self.row_versions()
+        self.result2.team2_goals = 1
+        self.result2.save()
+        after = self.row_versions()
+        
+        self.assertEqual(before['Team A'], after['Team A'])
+        self.assertNotEqual(before['Team B'], after['Team B'])
+        self.assertNotEqual(before['Team C'], after['Team C'])
+    
+    def test_new_goal_refreshes_fixture_card(self):
+        """A goal added to a match shows up on its cached fixture card"""
+        self.assertNotContains(self.client.get('/fixtures/'), 'Doe')
+        Goal.objects.create(match=self.result1, scorer=self.player, minute=10)
+        self.assertContains(self.client.get('/fixtures/'), 'Doe')
+    
+    def test_season_summary(self):
+        """Summary totals are computed in the view"""
+        summary = get_season_summary(calculate_table())
+        self.assertEqual(
+            (summary['total_clubs'], summary['total_matches'], summary['total_goals'], summary['most_points']),
+            (3, 2, 1, 3),
+        )
+        self.assertContains(self.client.get('/table/'), 'Matches Played')
+
+
+class StandingsApiTestCase(TestCase):
+    """Test the partial table refresh endpoint"""
+    
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club1 = Club.objects.create(name="Team A")
+            self.club2 = Club.objects.create(name="Team B")
+            self.club3 = Club.objects.create(name="Team C")
+            self.club4 = Club.objects.create(name="Team D")
+            kickoff = timezone.make_aware(datetime(2025, 10, 5, 6, 0))
+            self.result1 = MatchResult.objects.create(
+                fixture=Fixture.objects.create(team1=self.club1, team2=self.club2, date=kickoff),
+                team1_goals=2, team2_goals=0,
+            )
+            MatchResult.objects.create(
+                fixture=Fixture.objects.create(team1=self.club3, team2=self.club4, date=kickoff),
+                team1_goals=1, team2_goals=0,
+            )
+    
+    def test_returns_only_changed_rows(self):
+        """After a result changes only the rows that differ are sent"""
+        version = self.client.get('/table/').context['standings_version']
+        self.assertEqual(self.client.get('/api/table/', {'since': version}).status_code, 304)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.result1.team1_goals = 3
+            self.result1.save()
+        
+        data = self.client.get('/api/table/', {'since': version}).json()
+        self.assertFalse(data['full'])
+        self.assertNotEqual(data['version'], version)
+        self.assertEqual({row['name'] for row in data['rows']}, {"Team A", "Team B"})
+        self.assertEqual(data['order'], [self.club1.id, self.club3.id, self.club4.id, self.club2.id])
+        self.assertEqual(data['summary']['total_goals'], 4)
+        
+        self.assertEqual(self.client.get('/api/table/', {'since': data['version']}).status_code, 304)
+    
+    def test_unknown_version_gets_full_table(self):
+        """Clients without a known version receive every row"""
+        data = self.client.get('/api/table/', {'since': 'stale'}).json()
+        self.assertTrue(data['full'])
+        self.assertEqual(len(data['rows']), 4)
+
+
+class LiveEventsTestCase(TestCase):
+    """Test live score, goal and booking events"""
+    
+    def setUp(self):
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.player = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club1)
+        self.fixture = Fixture.objects.create(
+            team1=self.club1, team2=self.club2, date=timezone.make_aware(datetime(2025, 10, 5, 6, 0))
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.result = MatchResult.objects.create(fixture=self.fixture, team1_goals=0, team2_goals=0)
+    
+    def test_saves_publish_events(self):
+        """Score changes, goals and bookings are recorded in order; unchanged saves are not"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Goal.objects.create(match=self.result, scorer=self.player, minute=12, penalty=True)
+            self.result.team1_goals = 1
+            self.result.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.result.save()
+            Booking.objects.create(match=self.result, player=self.player, card_type='yellow', minute=30)
+        
+        events = list(MatchEvent.objects.values_list('kind', flat=True))
+        self.assertEqual(events, ['score', 'goal', 'score', 'booking'])
+        goal = MatchEvent.objects.get(kind='goal')
+        self.assertEqual((goal.fixture_id, goal.payload['player'], goal.payload['penalty']), (self.fixture.id, "John Doe", True))
+    
+    @override_settings(LIVE_STREAM_MAX_SECONDS=0)
+    async def test_stream_replays_missed_events(self):
+        """A reconnecting client gets the events after its Last-Event-ID"""
+        first = await MatchEvent.objects.order_by('id').afirst()
+        await MatchEvent.objects.acreate(fixture=self.fixture, kind='goal', payload={'minute': 5})
+        
+        response = await self.async_client.get(
+            f'/live/fixture/{self.fixture.id}/', headers={'Last-Event-ID': str(first.id)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertIn('event: goal', body)
+        self.assertNotIn('event: score', body)
+    
+    async def test_hub_fans_out_by_fixture(self):
+        """One poll delivers each event to that fixture's streams and the all-fixtures streams"""
+        other = await Fixture.objects.acreate(
+            team1=self.club2, team2=self.club1, date=timezone.make_aware(datetime(2025, 10, 12, 6, 0))
+        )
+        hub = LiveHub(asyncio.get_running_loop())
+        this_match, other_match, everything = (
+            await hub.subscribe(self.fixture.id), await hub.subscribe(other.id), await hub.subscribe()
+        )
+        hub.task.cancel()
+        
+        await MatchEvent.objects.acreate(fixture=self.fixture, kind='goal', payload={})
+        await hub.poll()
+        self.assertEqual((this_match.qsize(), other_match.qsize(), everything.qsize()), (1, 0, 1))
+
+
+class AsyncApiTestCase(TestCase):
+    """Test the async read-only JSON APIs"""
+    
+    def setUp(self):
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.club3 = Club.objects.create(name="Team C")
+        self.player1 = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club1)
+        self.player2 = Player.objects.create(first_name="Jim", last_name="Roe", position="DEF", club=self.club2)
+        now = timezone.now()
+        self.past = Fixture.objects.create(team1=self.club1, team2=self.club2, date=now - timedelta(days=7))
+        MatchResult.objects.create(fixture=self.past, team1_goals=2, team2_goals=1)
+        self.upcoming = Fixture.objects.create(team1=self.club2, team2=self.club3, date=now + timedelta(days=7))
+    
+    def test_fixture_timeline(self):
+        """Fixtures are listed with scores and can be narrowed to upcoming, past or one club"""
+        data = self.client.get('/api/fixtures/').json()
+        self.assertEqual([fixture['id'] for fixture in data['fixtures']], [self.past.id, self.upcoming.id])
+        self.assertEqual(data['fixtures'][0]['result']['team1_goals'], 2)
+        self.assertIsNone(data['fixtures'][1]['result'])
+        
+        data = self.client.get('/api/fixtures/', {'filter': 'upcoming'}).json()
+        self.assertEqual([fixture['id'] for fixture in data['fixtures']], [self.upcoming.id])
+        data = self.client.get('/api/fixtures/', {'club': self.club1.id}).json()
+        self.assertEqual([fixture['id'] for fixture in data['fixtures']], [self.past.id])
+        self.assertEqual(self.client.get('/api/fixtures/', {'limit': 'x'}).status_code, 400)
+    
+    async def test_fixture_players(self):
+        """Squads are split by club and a missing fixture is reported as before"""
+        response = await self.async_client.get(f'/api/fixture/{self.past.id}/players/')
+        data = response.json()
+        self.assertEqual([player['id'] for player in data['team1']['players']], [self.player1.id])
+        self.assertEqual([player['id'] for player in data['team2']['players']], [self.player2.id])
+        self.assertEqual([player['club__name'] for player in data['all_players']], ["Team B", "Team A"])
+        
+        response = await self.async_client.get('/api/fixture/0/players/')
+        self.assertEqual(response.status_code, 400)
+    
+    async def test_club_players(self):
+        """The club squad API is served by the async view, not a sync one shadowing it"""
+        match = resolve(f'/api/club/{self.club1.id}/players/')
+        self.assertIs(match.func, views.get_club_players)
+        self.assertTrue(asyncio.iscoroutinefunction(views.get_club_players))
+        
+        response = await self.async_client.get(f'/api/club/{self.club1.id}/players/')
+        self.assertEqual([player['id'] for player in response.json()['players']], [self.player1.id])
+
+
+class SerializedWriteTestCase(TransactionTestCase):
+    """Test that write requests run in a write transaction, retried when SQLite reports a locked database"""
+    
+    def setUp(self):
+        self.calls = []
+    
+    def view(self, request):
+        self.calls.append(request.method)
+        if len(self.calls) == 1:
+            raise OperationalError('database is locked')
+        return HttpResponse('ok')
+    
+    @override_settings(SQLITE_WRITE_RETRIES=2)
+    def test_locked_write_is_retried(self):
+        """A write that hits the lock runs again; reads are passed through untouched"""
+        view = serialized_writes(self.view)
+        factory = RequestFactory()
+        
+        with self.assertRaises(OperationalError):
+            view(factory.get('/'))
+        self.assertEqual(self.calls, ['GET'])
+        
+        self.calls = []
+        self.assertEqual(view(factory.post('/')).content, b'ok')
+        self.assertEqual(self.calls, ['POST', 'POST'])
+    
+    @override_settings(SQLITE_WRITE_RETRIES=0)
+    def test_lock_error_raised_without_retries(self):
+        """Without retries left the lock error reaches the handler, after rolling back the view's writes"""
+        def view(request):
+            Club.objects.create(name="Team A")
+            raise OperationalError('database is locked')
+        
+        with self.assertRaises(OperationalError):
+            serialized_writes(view)(RequestFactory().post('/'))
+        self.assertFalse(Club.objects.exists())
+    
+    def test_only_write_transactions_take_the_lock_up_front(self):
+        def begins(block):
+            with CaptureQueriesContext(connection) as queries, block:
+                Club.objects.update(name="Team A")
+            return [query['sql'] for query in queries if query['sql'].startswith('BEGIN')]
+        
+        self.assertEqual(begins(write_transaction()), ['BEGIN IMMEDIATE'])
+        self.assertEqual(begins(transaction.atomic()), ['BEGIN'])
+    
+    def test_views_and_admin_are_wrapped(self):
+        """Every sync view goes through the handler as usual, wrapped in serialized_writes()"""
+        for path in ('/login/', '/admin/matches/matchresult/add/'):
+            self.assertTrue(hasattr(resolve(path).func, '__wrapped__'), path)
+        self.assertFalse(hasattr(resolve('/api/search/').func, '__wrapped__'))
+    
+    def test_asgi_chain_stays_async(self):
+        """No middleware adapts the ASGI chain to sync"""
+        chain = ASGIHandler()._middleware_chain
+        self.assertNotIsInstance(chain, SyncToAsync)
+        self.assertTrue(asyncio.iscoroutinefunction(chain))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], DB_REPLICA_PIN_SECONDS=15)
+class ReplicaRoutingTestCase(SimpleTestCase):
+    """Test that reads go to a healthy replica unless the client has just written"""
+    
+    def setUp(self):
+        routers._health.clear()
+        self.router = routers.ReplicaRouter()
+        self.read_databases = []
+    
+    def view(self, request):
+        self.read_databases.append(self.router.db_for_read(Club))
+        return HttpResponse()
+    
+    def test_router(self):
+        """Reads follow the request's replica, writes always go to the primary"""
+        self.assertEqual(self.router.db_for_read(Club), 'default')
+        token = routers.read_from('replica1')
+        try:
+            self.assertEqual(self.router.db_for_read(Club), 'replica1')
+            self.assertEqual(self.router.db_for_write(Club), 'default')
+        finally:
+            routers.reset_read_database(token)
+        self.assertFalse(self.router.allow_migrate('replica1', 'matches'))
+    
+    def test_sticky_after_write(self):
+        """A write sets a cookie that keeps the client's reads on the primary"""
+        middleware = ReplicaRoutingMiddleware(self.view)
+        factory = RequestFactory()
+        with mock.patch('matches.routers.check_replica', return_value=True):
+            middleware(factory.get('/'))
+            response = middleware(factory.post('/'))
+            self.assertEqual(response.cookies['read_primary']['max-age'], 15)
+            pinned = factory.get('/')
+            pinned.COOKIES['read_primary'] = '1'
+            middleware(pinned)
+        self.assertEqual(self.read_databases, ['replica1', 'default', 'default'])
+        self.assertEqual(self.router.db_for_read(Club), 'default')
+    
+    def test_unhealthy_replica(self):
+        """A replica failing its health check is skipped until the retry interval passes"""
+        middleware = ReplicaRoutingMiddleware(self.view)
+        with mock.patch('matches.routers.check_replica', return_value=False) as check:
+            middleware(RequestFactory().get('/'))
+            middleware(RequestFactory().get('/'))
+        self.assertEqual(self.read_databases, ['default', 'default'])
+        self.assertEqual(check.call_count, 1)
+
+
+@override_settings(JOB_QUEUE_INLINE=False, JOB_MAX_ATTEMPTS=2, JOB_RETRY_DELAY_SECONDS=0)
+class JobQueueTestCase(TestCase):
+    """Test the database-backed job queue behind the statistics refresh"""
+    
+    def setUp(self):
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.striker = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club1)
+        self.fixture = Fixture.objects.create(
+            team1=self.club1, team2=self.club2, date=timezone.make_aware(datetime(2025, 10, 5, 6, 0)),
+        )
+    
+    def test_saves_are_coalesced_into_one_job(self):
+        """Saves before a worker runs share one job, which then updates the statistics"""
+        with self.captureOnCommitCallbacks(execute=True):
+            result = MatchResult.objects.create(fixture=self.fixture, team1_goals=1, team2_goals=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Goal.objects.create(match=result, scorer=self.striker, minute=10)
+        
+        job = Job.objects.get()
+        self.assertEqual((job.key, job.status), (f'refresh_player_data:{self.fixture.season_id}', Job.QUEUED))
+        self.assertIn(self.striker.id, job.payload['player_ids'])
+        self.assertFalse(PlayerSeasonStats.objects.exists())
+        self.assertEqual(queue_stats()['queued'], 1)
+        
+        self.assertEqual(claim_jobs('test', 5), [job.id])
+        self.assertEqual(claim_jobs('test', 5), [])
+        self.assertEqual(run_job(job.id), Job.DONE)
+        self.assertEqual(PlayerSeasonStats.objects.get(player=self.striker, season=self.fixture.season).goals, 1)
+    
+    def test_failed_job_is_retried_then_given_up(self):
+        """A failing job is queued again until it runs out of attempts"""
+        def fail(**payload):
+            raise RuntimeError("boom")
+        with mock.patch.dict(TASKS, {'refresh_player_data': (fail, None)}):
+            job = Job.objects.create(name='refresh_player_data', key=f'refresh_player_data:{self.fixture.season_id}',
+                                     payload={'season': self.fixture.season_id})
+            claim_jobs('test', 1)
+            self.assertEqual(run_job(job.id), Job.QUEUED)
+            claim_jobs('test', 1)
+            self.assertEqual(run_job(job.id), Job.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("boom", job.last_error)
+    
+    @override_settings(JOB_TIMEOUT_SECONDS=60)
+    def test_stale_jobs_requeued_until_attempts_run_out(self):
+        """A job left running by a lost worker is queued again, and failed once out of attempts"""
+        job = Job.objects.create(name='refresh_player_data', key='stale', payload={'season': self.fixture.season_id})
+        for expected in (Job.QUEUED, Job.FAILED):
+            claim_jobs('lost', 1)
+            Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(minutes=5))
+            requeue_stale_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, expected)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("worker is assumed lost", job.last_error)
+        self.assertEqual(claim_jobs('test', 1), [])
+
+
+class HealthCheckTestCase(TestCase):
+    """Test the liveness and readiness endpoints"""
+    
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            club1 = Club.objects.create(name="Team A")
+            club2 = Club.objects.create(name="Team B")
+            fixture = Fixture.objects.create(team1=club1, team2=club2, date=timezone.now() - timedelta(days=1))
+            MatchResult.objects.create(fixture=fixture, team1_goals=1, team2_goals=0)
+    
+    def test_healthz(self):
+        """Liveness needs no database and accepts any host"""
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz', HTTP_HOST='10.0.0.1')
+        self.assertEqual(response.content, b'ok')
+    
+    @mock.patch('matches.warmup.shared_cache', return_value=True)
+    @mock.patch('matches.warmup._warmed_here', None)
+    def test_ready_once_warm_for_current_data(self, shared):
+        """With a shared cache, readiness follows the data generation the caches were warmed for"""
+        with mock.patch('matches.middleware.warm_in_background') as warm:
+            self.assertEqual(self.client.get('/readyz').status_code, 503)
+            self.assertEqual(warm.call_count, 1)
+            
+            generation, timings = warm_caches()
+            self.assertIn('/table/', [step for step, _seconds in timings])
+            response = self.client.get('/readyz')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['generation'], generation)
+            
+            with self.captureOnCommitCallbacks(execute=True):
+                Club.objects.create(name="Team C")
+            self.assertEqual(self.client.get('/readyz').status_code, 503)
+    
+    @mock.patch('matches.warmup._warmed_here', None)
+    def test_local_cache_stays_ready_after_saves(self):
+        """With a per-process cache, one warm-up keeps the process ready through later changes"""
+        self.assertEqual(settings.CACHES['default']['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+        with mock.patch('matches.middleware.warm_in_background') as warm:
+            self.assertEqual(self.client.get('/readyz').status_code, 503)
+            warm_caches()
+            with self.captureOnCommitCallbacks(execute=True):
+                Club.objects.create(name="Team C")
+            response = self.client.get('/readyz')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.json()['shared_cache'])
+            self.assertEqual(warm.call_count, 1)
+
+
+class BootImportTestCase(SimpleTestCase):
+    """Test what a worker imports before serving its first request"""
+    
+    def test_boot_defers_heavy_modules(self):
+        """Pages and APIs boot without form layouts, test tooling or the modules only some views use"""
+        modules = boot_report(runs=1)['modules']
+        for module in ('matches.forms', 'crispy_forms.helper', 'django.test', 'matches.archive',
+                       'matches.history', 'matches.live', 'matches.search', 'matches.autocomplete',
+                       'matches.logos', 'matches.jobs'):
+            self.assertNotIn(module, modules)
+    
+    # Wall-clock timing depends on the machine, so it is opt-in (or run import_report)
+    @skipUnless(os.environ.get('IMPORT_TIME_CHECK') == 'True', "set IMPORT_TIME_CHECK=True to time the boot")
+    def test_boot_within_budget(self):
+        report = boot_report(runs=3)
+        self.assertLessEqual(report['import_ms'], settings.IMPORT_TIME_BUDGET_MS)
+
+
+class StylesheetTestCase(SimpleTestCase):
+    """Test the prebuilt stylesheet that replaced the in-browser Tailwind compiler"""
+    
+    def test_committed_build_has_theme_and_form_utilities(self):
+        """Theme utilities, site styles and the crispy-tailwind form classes are in the build"""
+        css = stylesheet_path().read_text(encoding='utf-8')
+        for selector in ('.shadow-strong{', '.bg-primary-800\\/95{', '.md\\:min-h-\\[700px\\]{',
+                         '.animate-slide-in-up{', '.table-stripe:nth-child(2n){', '.appearance-none{'):
+            self.assertIn(selector, css)
+        for name in ('Light', 'Regular', 'Medium', 'SemiBold', 'Bold'):
+            self.assertIn(f'url(../fonts/poppins/Poppins-{name}.woff2)', css)
+    
+    @skipUnless(tailwind_cli(), "Tailwind CLI not installed")
+    def test_build_is_current(self):
+        """The committed build matches the templates; run build_css after changing classes"""
+        self.assertEqual(stylesheet_path().read_text(encoding='utf-8'), build_stylesheet())
+    
+    def test_collectstatic_builds_the_stylesheet_first(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root), \
+                mock.patch('matches.management.commands.collectstatic.call_command') as run:
+            call_command('collectstatic', interactive=False, verbosity=0)
+            run.assert_called_once_with('build_css', verbosity=0, stdout=mock.ANY)
+            self.assertTrue(Path(root, 'css/site.css').exists())
+            
+            run.reset_mock()
+            call_command('collectstatic', interactive=False, verbosity=0, skip_css=True)
+            run.assert_not_called()
+    
+    def test_pages_use_local_stylesheet(self):
+        response = self.client.get('/login/')
+        self.assertContains(response, f'href="{static("css/site.css")}"')
+        self.assertNotContains(response, 'cdn.tailwindcss.com')
+        # The fonts are served with the site too
+        self.assertContains(response, f'href="{static("fonts/poppins/Poppins-Regular.woff2")}"')
+        self.assertNotContains(response, 'fonts.googleapis.com')
+
+
+MANIFEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'matches.storage.CompressedManifestStaticFilesStorage'},
+}
+
+
+@override_settings(STATIC_ROOT=tempfile.mkdtemp(), STORAGES=MANIFEST_STORAGES)
+class StaticFilesTestCase(SimpleTestCase):
+    """Test collectstatic's hashed, precompressed files and how StaticFilesMiddleware serves them"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0, skip_css=True)
+        cls.addClassCleanup(shutil.rmtree, settings.STATIC_ROOT)
+        cls.middleware = StaticFilesMiddleware(lambda request: HttpResponse('view', status=404))
+    
+    def get(self, path, **headers):
+        return self.middleware(RequestFactory().get(path, headers=headers))
+    
+    def test_hashed_names_and_variants(self):
+        hashed = static('css/site.css')
+        self.assertRegex(hashed, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        original = Path(settings.STATIC_ROOT, hashed.removeprefix('/static/'))
+        self.assertEqual(gzip.decompress(Path(f'{original}.gz').read_bytes()), original.read_bytes())
+        # The stylesheet points at the hashed fonts
+        self.assertRegex(original.read_text(encoding='utf-8'), r'url\("?\.\./fonts/poppins/Poppins-Regular\.[0-9a-f]{12}\.woff2')
+        # Images are compressed already
+        self.assertFalse(Path(settings.STATIC_ROOT, 'images/logos/favicon.png.gz').exists())
+    
+    def test_missing_manifest_fails_loudly(self):
+        """Without collectstatic there is no unhashed fallback to be cached for a year"""
+        with tempfile.TemporaryDirectory() as empty, override_settings(STATIC_ROOT=empty):
+            with self.assertRaisesMessage(ValueError, 'run collectstatic'):
+                static('css/site.css')
+    
+    def test_serves_precompressed_with_far_future_caching(self):
+        response = self.get(static('css/site.css'), accept_encoding='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn(b'.shadow-strong{', gzip.decompress(response.content))
+        
+        plain = self.get(static('css/site.css'), accept_encoding='gzip;q=0')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(int(plain['Content-Length']), len(plain.content))
+        
+        self.assertEqual(self.get(static('css/site.css'), if_none_match=response['ETag'],
+                                  accept_encoding='gzip').status_code, 304)
+    
+    def test_unhashed_names_are_revalidated(self):
+        self.assertEqual(self.get('/static/css/site.css')['Cache-Control'], 'no-cache')
+        self.assertEqual(self.get('/static/css/missing.css').content, b'view')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), JOB_QUEUE_INLINE=True)
+class LogoVariantTestCase(TestCase):
+    """Test the resized club logos written on upload and served by the logo view"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addClassCleanup(shutil.rmtree, settings.MEDIA_ROOT)
+    
+    def setUp(self):
+        from PIL import Image
+        output = BytesIO()
+        Image.new('RGB', (300, 200), 'red').save(output, 'PNG')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club = Club.objects.create(
+                name="Team A", logo=SimpleUploadedFile('crest.png', output.getvalue(), content_type='image/png'),
+            )
+        self.root = Path(settings.MEDIA_ROOT)
+    
+    def test_variants_written_on_upload(self):
+        from PIL import Image
+        for size in LOGO_SIZES:
+            for extension in LOGO_FORMATS:
+                with Image.open(self.root / variant_name(self.club.logo.name, size, extension)) as image:
+                    self.assertEqual(image.size, (size, size))
+    
+    def test_pages_use_variants(self):
+        response = self.client.get('/clubs/')
+        name = self.club.logo.name
+        self.assertContains(response, f'srcset="/logos/48/webp/{name} 1x, /logos/96/webp/{name} 2x"')
+        self.assertContains(response, f'src="/logos/48/png/{name}"')
+        self.assertNotContains(response, self.club.logo.url)
+    
+    def test_missing_variant_generated_on_request(self):
+        variant = self.root / variant_name(self.club.logo.name, 64, 'webp')
+        variant.unlink()
+        response = self.client.get(f'/logos/64/webp/{self.club.logo.name}')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(b''.join(response.streaming_content), variant.read_bytes())
+        
+        self.assertEqual(self.client.get(f'/logos/50/webp/{self.club.logo.name}').status_code, 404)
+        self.assertEqual(self.client.get('/logos/64/webp/clubs/logos/other.png').status_code, 404)
+    
+    def test_backfill_command(self):
+        shutil.rmtree(self.root / 'clubs/logos/variants')
+        out = StringIO()
+        call_command('generate_logo_variants', workers=2, stdout=out)
+        self.assertIn(f'Wrote {len(LOGO_SIZES) * len(LOGO_FORMATS)} variants for 1 logos', out.getvalue())
+
+
+class AdminChangelistQueryTestCase(TestCase):
+    """Test that admin changelists run the same queries however many rows they show"""
+    
+    CHANGELISTS = ['club', 'player', 'competition', 'season', 'fixture', 'matchresult', 'booking', 'goal',
+                   'playerseasonstats', 'disciplinaryrecord', 'seasonarchive']
+    
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.add_matches(1)
+    
+    def add_matches(self, count):
+        for number in range(count):
+            home = Club.objects.create(name=f"Home {Club.objects.count()}")
+            away = Club.objects.create(name=f"Away {Club.objects.count()}")
+            scorer = Player.objects.create(first_name="Sam", last_name=f"Striker {number}", position="FWD", club=home)
+            Player.objects.create(first_name="Dan", last_name=f"Defender {number}", position="DEF", club=away)
+            home.captain = scorer
+            home.save()
+            fixture = Fixture.objects.create(team1=home, team2=away, date=timezone.now() - timedelta(days=1))
+            Fixture.objects.create(team1=away, team2=home, date=timezone.now() + timedelta(days=1))
+            with self.captureOnCommitCallbacks(execute=True):
+                result = MatchResult.objects.create(fixture=fixture, team1_goals=1, team2_goals=0, man_of_match=scorer)
+                Goal.objects.create(match=result, scorer=scorer, minute=10)
+                Booking.objects.create(match=result, player=scorer, card_type='yellow', minute=20)
+    
+    def changelist_queries(self):
+        counts = {}
+        for model in self.CHANGELISTS:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'/admin/matches/{model}/', {'o': '-5'} if model == 'fixture' else {})
+            self.assertEqual(response.status_code, 200)
+            counts[model] = len(queries)
+        return counts
+    
+    def test_queries_do_not_grow_with_rows(self):
+        few = self.changelist_queries()
+        self.add_matches(5)
+        self.assertEqual(self.changelist_queries(), few)
+    
+    def test_annotated_columns(self):
+        response = self.client.get('/admin/matches/club/', {'o': '-5'})
+        self.assertContains(response, '<td class="field-player_count">1</td>', count=2)
+        response = self.client.get('/admin/matches/fixture/')
+        self.assertContains(response, 'alt="True"', count=1)
+        self.assertContains(response, 'alt="False"', count=1)
+
+
+@override_settings(JOB_QUEUE_INLINE=False)
+class MatchdayEditorTestCase(TestCase):
+    """Test the admin page that enters every result of a matchday at once"""
+    
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.kickoff = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=2)
+        self.clubs = [Club.objects.create(name=f"Club {number}") for number in range(4)]
+        self.players = [
+            Player.objects.create(first_name="Player", last_name=str(number), position="FWD", club=club)
+            for number, club in enumerate(self.clubs)
+        ]
+        self.fixtures = [
+            Fixture.objects.create(team1=self.clubs[0], team2=self.clubs[1], date=self.kickoff),
+            Fixture.objects.create(team1=self.clubs[2], team2=self.clubs[3], date=self.kickoff + timedelta(hours=2),
+                                   venue="Second Pitch"),
+        ]
+        self.url = f'/admin/matches/matchresult/matchday/?date={timezone.localdate(self.kickoff).isoformat()}'
+    
+    def form_data(self, **values):
+        data = {}
+        for fixture in self.fixtures:
+            for formset, total in (('goals', 4), ('bookings', 2)):
+                prefix = f'fixture-{fixture.pk}-{formset}'
+                data.update({f'{prefix}-TOTAL_FORMS': total, f'{prefix}-INITIAL_FORMS': 0})
+        data.update(values)
+        return data
+    
+    def test_lists_fixtures_of_the_day(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Club 0 vs Club 1')
+        self.assertContains(response, 'Club 2 vs Club 3')
+        self.assertContains(response, 'Second Pitch')
+    
+    def test_saves_matchday_in_one_transaction(self):
+        first, second = self.fixtures
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, self.form_data(**{
+                f'fixture-{first.pk}-team1_goals': 2, f'fixture-{first.pk}-team2_goals': 0,
+                f'fixture-{first.pk}-man_of_match': self.players[0].pk,
+                f'fixture-{first.pk}-goals-0-scorer': self.players[0].pk, f'fixture-{first.pk}-goals-0-minute': 10,
+                f'fixture-{first.pk}-goals-1-scorer': self.players[0].pk, f'fixture-{first.pk}-goals-1-minute': 70,
+                f'fixture-{first.pk}-bookings-0-player': self.players[1].pk,
+                f'fixture-{first.pk}-bookings-0-card_type': 'yellow', f'fixture-{first.pk}-bookings-0-minute': 30,
+                f'fixture-{second.pk}-team1_goals': 1, f'fixture-{second.pk}-team2_goals': 1,
+            }))
+        self.assertRedirects(response, self.url)
+        self.assertEqual(first.result.man_of_match, self.players[0])
+        self.assertEqual(list(first.result.goals.values_list('minute', flat=True)), [10, 70])
+        self.assertEqual(first.result.bookings.get().player, self.players[1])
+        self.assertEqual(MatchResult.objects.get(fixture=second).team2_goals, 1)
+        # One statistics refresh for the whole matchday
+        self.assertEqual(Job.objects.filter(name='refresh_player_data').count(), 1)
+    
+    def test_invalid_fixture_saves_nothing(self):
+        first, second = self.fixtures
+        response = self.client.post(self.url, self.form_data(**{
+            f'fixture-{first.pk}-team1_goals': 1, f'fixture-{first.pk}-team2_goals': 0,
+            # A scorer from another match
+            f'fixture-{second.pk}-team1_goals': 1, f'fixture-{second.pk}-team2_goals': 0,
+            f'fixture-{second.pk}-goals-0-scorer': self.players[0].pk, f'fixture-{second.pk}-goals-0-minute': 5,
+        }))
+        self.assertContains(response, 'Nothing was saved')
+        self.assertFalse(MatchResult.objects.exists())
+
+
+class SearchTestCase(TestCase):
+    """Test the full-text search index and its typeahead endpoint"""
+    
+    def setUp(self):
+        self.rovers = Club.objects.create(name="Riverside Rovers")
+        self.united = Club.objects.create(name="Harbour United")
+        self.player = Player.objects.create(first_name="Jörgen", last_name="Smithson", position="FWD", club=self.rovers)
+        Player.objects.create(first_name="Anna", last_name="Smith", position="DEF", club=self.united)
+        self.fixture = Fixture.objects.create(team1=self.rovers, team2=self.united, venue="Lakeside Park",
+                                              date=timezone.now() - timedelta(days=1))
+    
+    def labels(self, query, **params):
+        response = self.client.get('/api/search/', {'q': query, **params})
+        return [result['label'] for result in response.json()['results']]
+    
+    def test_prefix_matching_across_kinds(self):
+        self.assertCountEqual(self.labels('smi'), ['Anna Smith', 'Jörgen Smithson'])
+        # Whole words before prefixes
+        self.assertEqual(self.labels('smith'), ['Anna Smith', 'Jörgen Smithson'])
+        self.assertEqual(self.labels('jorg riv'), ['Jörgen Smithson'])
+        self.assertEqual(self.labels('lakeside'), ['Riverside Rovers vs Harbour United'])
+        # Names rank above details: the club first, then its fixture and players
+        self.assertEqual(self.labels('rovers')[0], 'Riverside Rovers')
+        self.assertEqual(self.labels('smi', kind='club'), [])
+        self.assertEqual(self.labels('"*) OR'), [])
+    
+    def test_index_follows_changes(self):
+        self.rovers.name = "Riverside Athletic"
+        self.rovers.save()
+        self.assertEqual(self.labels('athletic', kind='fixture'), ['Riverside Athletic vs Harbour United'])
+        self.assertEqual(self.labels('athletic', kind='player'), ['Jörgen Smithson'])
+        
+        MatchResult.objects.create(fixture=self.fixture, team1_goals=1, team2_goals=0)
+        response = self.client.get('/api/search/', {'q': 'lakeside'})
+        self.assertEqual(response.json()['results'][0]['url'], f'/match/{self.fixture.result.pk}/')
+        
+        self.player.delete()
+        self.assertEqual(self.labels('smithson'), [])
+    
+    def test_best_matches_survive_the_candidate_limit(self):
+        """Each tier keeps its best-ranked candidates, not the first ones in ID order"""
+        for number in range(CANDIDATES + 20):
+            Player.objects.create(first_name="Zedekiah", last_name=f"Fillerton {number}", position="MID",
+                                  club=self.united)
+        Player.objects.create(first_name="Zedd", last_name="Zeddson", position="FWD", club=self.rovers)
+        self.assertEqual(self.labels('zed', kind='player')[0], 'Zedd Zeddson')
+    
+    def test_player_list_search(self):
+        response = self.client.get('/players/list/', {'q': 'smithson'})
+        self.assertEqual([player.pk for player in response.context['players']], [self.player.pk])
+    
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 5 entries', out.getvalue())
+        self.assertEqual(self.labels('harb', kind='club'), ['Harbour United'])
+
+
+class PlayerAutocompleteTestCase(TestCase):
+    """Test the in-memory player name typeahead"""
+    
+    def setUp(self):
+        self.rovers = Club.objects.create(name="Riverside Rovers")
+        self.united = Club.objects.create(name="Harbour United")
+        self.player = Player.objects.create(first_name="Jörgen", last_name="Smithson", position="FWD", club=self.rovers)
+        Player.objects.create(first_name="Anna", last_name="Smith", position="DEF", club=self.united)
+        Player.objects.create(first_name="Sam", last_name="de Vries", position="MID", club=self.united)
+        player_index.build()
+    
+    def names(self, query, club_ids=None, limit=10):
+        return [f"{player['first_name']} {player['last_name']}" for player in player_index.lookup(query, club_ids, limit)]
+    
+    def test_lookup(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names('smi'), ['Anna Smith', 'Jörgen Smithson'])
+            self.assertEqual(self.names('SMI', [self.rovers.pk]), ['Jörgen Smithson'])
+            self.assertEqual(self.names('jorg'), ['Jörgen Smithson'])
+            self.assertEqual(self.names('anna sm'), ['Anna Smith'])
+            # Any word of the name, each player once
+            self.assertEqual(self.names('vr'), ['Sam de Vries'])
+            self.assertEqual(self.names('s'), ['Sam de Vries', 'Anna Smith', 'Jörgen Smithson'])
+            self.assertEqual(self.names('s', limit=1), ['Sam de Vries'])
+            self.assertEqual(self.names(''), [])
+        self.assertEqual(player_index.lookup('jorg')[0]['club__name'], 'Riverside Rovers')
+    
+    def test_index_follows_saves(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Player.objects.create(first_name="Ola", last_name="Smedby", position="GK", club=self.rovers)
+        self.assertEqual(self.names('sme'), ['Ola Smedby'])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.player.last_name = "Berg"
+            self.player.club = self.united
+            self.player.save()
+        self.assertEqual(self.names('smi'), ['Anna Smith'])
+        self.assertEqual(self.names('berg', [self.united.pk]), ['Jörgen Berg'])
+        self.assertEqual(self.names('berg', [self.rovers.pk]), [])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.united.name = "Harbour Athletic"
+            self.united.save()
+            self.player.delete()
+        self.assertEqual(self.names('berg'), [])
+        self.assertEqual(player_index.lookup('anna')[0]['club__name'], 'Harbour Athletic')
+    
+    def test_endpoint_notices_changes_from_other_processes(self):
+        response = self.client.get('/api/players/autocomplete/', {'q': 'smi', 'club': self.united.pk})
+        self.assertEqual([player['last_name'] for player in response.json()['players']], ['Smith'])
+        
+        # A change that bypassed this process's signals, seen through the data version
+        Player.objects.filter(pk=self.player.pk).update(club=self.united)
+        bump_versions(Player)
+        player_index.checked_at = None
+        response = self.client.get('/api/players/autocomplete/', {'q': 'smi', 'club': self.united.pk})
+        self.assertEqual([player['last_name'] for player in response.json()['players']], ['Smith', 'Smithson'])
+        
+        response = self.client.get('/api/players/autocomplete/', {'q': 'smi', 'club': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class SeasonTestCase(TestCase):
+    """Test that fixtures, results and standings are kept apart per season"""
+    
+    def setUp(self):
+        cache.clear()
+        league = Competition.objects.create(name=settings.LEAGUE_NAME)
+        self.old = Season.objects.create(competition=league, name="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+        self.new = Season.objects.create(competition=league, name="2025", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31))
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.striker = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.old_result = MatchResult.objects.create(
+                fixture=Fixture.objects.create(team1=self.club1, team2=self.club2,
+                                               date=timezone.make_aware(datetime(2024, 10, 6, 6, 0))),
+                team1_goals=0, team2_goals=3,
+            )
+            self.new_result = MatchResult.objects.create(
+                fixture=Fixture.objects.create(team1=self.club1, team2=self.club2,
+                                               date=timezone.make_aware(datetime(2025, 10, 5, 6, 0))),
+                team1_goals=2, team2_goals=0,
+            )
+            Goal.objects.create(match=self.new_result, scorer=self.striker, minute=10)
+    
+    def leader(self, season):
+        return calculate_table(season.pk)[0]['club']
+    
+    def test_fixtures_fall_in_the_season_of_their_date(self):
+        self.assertEqual((self.old_result.fixture.season, self.old_result.season), (self.old, self.old))
+        self.assertEqual(self.new_result.season, self.new)
+        self.assertEqual((self.leader(self.old), self.leader(self.new)), (self.club2, self.club1))
+        
+        # A date no season covers starts the calendar year's season
+        fixture = Fixture.objects.create(team1=self.club2, team2=self.club1,
+                                         date=timezone.make_aware(datetime(2023, 5, 1, 6, 0)))
+        self.assertEqual((fixture.season.competition.name, fixture.season.name), (settings.LEAGUE_NAME, "2023"))
+        
+        # ... unless a season already takes the year's name for other dates
+        Season.objects.filter(pk=self.old.pk).update(start_date=date(2024, 8, 1), end_date=date(2025, 5, 31))
+        with self.assertRaises(ValidationError):
+            Season.for_date(date(2024, 6, 1))
+        fixture = Fixture(team1=self.club2, team2=self.club1, date=timezone.make_aware(datetime(2024, 6, 1, 6, 0)))
+        with self.assertRaises(ValidationError) as raised:
+            fixture.full_clean()
+        self.assertIn('season', raised.exception.message_dict)
+        self.assertFalse(Season.objects.filter(start_date__lte=date(2024, 6, 1), end_date__gte=date(2024, 6, 1)).exists())
+    
+    def test_table_page_and_api_pick_the_season(self):
+        response = self.client.get('/table/')
+        self.assertEqual(response.context['season'], self.new)
+        self.assertEqual(response.context['table_data'][0]['club'], self.club1)
+        
+        response = self.client.get('/table/', {'season': self.old.pk})
+        self.assertEqual(response.context['table_data'][0]['club'], self.club2)
+        self.assertContains(response, f"<title>League Table - {self.old}")
+        
+        data = self.client.get('/api/table/', {'season': self.old.pk}).json()
+        self.assertEqual(data['order'], [self.club2.id, self.club1.id])
+        self.assertEqual(self.client.get('/api/table/', {'season': 'x'}).status_code, 400)
+    
+    def test_fixture_lists_pick_the_season(self):
+        response = self.client.get('/fixtures/')
+        self.assertEqual(list(response.context['fixtures']), [self.new_result.fixture])
+        self.assertEqual(list(response.context['past_fixtures']), [self.new_result.fixture])
+        self.assertEqual(list(self.client.get('/').context['recent_results']), [self.new_result])
+        
+        response = self.client.get('/fixtures/', {'season': self.old.pk})
+        self.assertEqual(list(response.context['fixtures']), [self.old_result.fixture])
+        self.assertEqual(list(response.context['past_fixtures']), [self.old_result.fixture])
+        self.assertContains(response, f'?filter=past&season={self.old.pk}')
+    
+    def test_edit_only_invalidates_its_season(self):
+        old_etag = self.client.get('/table/', {'season': self.old.pk})['ETag']
+        new_etag = self.client.get('/table/')['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.new_result.team1_goals = 5
+            self.new_result.save()
+        
+        response = self.client.get('/table/', {'season': self.old.pk}, HTTP_IF_NONE_MATCH=old_etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.client.get('/table/')['ETag'], new_etag)
+    
+    def test_moving_a_fixture_moves_its_result_and_stats(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            fixture = self.new_result.fixture
+            fixture.season = self.old
+            fixture.save()
+        
+        self.new_result.refresh_from_db()
+        self.assertEqual(self.new_result.season, self.old)
+        self.assertEqual(PlayerSeasonStats.objects.get(player=self.striker, season=self.old).goals, 1)
+        self.assertFalse(PlayerSeasonStats.objects.filter(season=self.new).exists())
+        self.assertEqual(calculate_table(self.new.pk), [])
+
+
+class SeasonArchiveTestCase(TestCase):
+    """Test archiving a finished season into a snapshot"""
+    
+    def setUp(self):
+        cache.clear()
+        league = Competition.objects.create(name=settings.LEAGUE_NAME)
+        self.old = Season.objects.create(competition=league, name="2024", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+        self.club1 = Club.objects.create(name="Team A")
+        self.club2 = Club.objects.create(name="Team B")
+        self.striker = Player.objects.create(first_name="John", last_name="Doe", position="FWD", club=self.club2)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = MatchResult.objects.create(
+                fixture=Fixture.objects.create(team1=self.club1, team2=self.club2,
+                                               date=timezone.make_aware(datetime(2024, 10, 6, 6, 0))),
+                team1_goals=0, team2_goals=1, man_of_match=self.striker,
+            )
+            Goal.objects.create(match=result, scorer=self.striker, minute=10)
+            Booking.objects.create(match=result, player=self.striker, card_type='yellow', minute=20)
+            self.live = Fixture.objects.create(team1=self.club2, team2=self.club1,
+                                               date=timezone.now() + timedelta(days=1))
+    
+    def test_archived_season_is_served_from_the_snapshot(self):
+        table = self.client.get('/table/', {'season': self.old.pk}).context['table_data']
+        standings = self.client.get('/api/table/', {'season': self.old.pk}).json()
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_season', str(self.old.pk), '--purge', stdout=StringIO())
+        cache.clear()
+        self.assertFalse(Fixture.objects.filter(season=self.old).exists())
+        self.assertFalse(Goal.objects.exists() or Booking.objects.exists())
+        self.assertFalse(PlayerSeasonStats.objects.filter(season=self.old).exists())
+        self.assertTrue(Fixture.objects.filter(pk=self.live.pk).exists())
+        
+        response = self.client.get('/table/', {'season': self.old.pk})
+        self.assertEqual(
+            [(row['club'], row['points'], row['form']) for row in response.context['table_data']],
+            [(row['club'], row['points'], row['form']) for row in table],
+        )
+        self.assertEqual(self.client.get('/api/table/', {'season': self.old.pk}).json()['rows'], standings['rows'])
+        
+        response = self.client.get('/statistics/', {'season': self.old.pk})
+        self.assertEqual(response.context['top_scorers'][0]['player']['last_name'], "Doe")
+        self.assertEqual(response.context['most_disciplined'][0]['total_cards'], 1)
+        self.assertContains(response, "John Doe")
+        
+        matches = self.client.get('/api/fixtures/', {'season': self.old.pk, 'club': self.club1.pk}).json()['fixtures']
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]['result']['goals'][0]['scorer']['id'], self.striker.pk)
+        self.assertEqual(matches[0]['result']['bookings'][0]['card_type'], 'yellow')
+    
+    def test_command_refuses_live_and_purged_seasons(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_season', str(self.live.season_id), stdout=StringIO())
+        
+        call_command('archive_season', str(self.old.pk), stdout=StringIO())
+        self.assertEqual(SeasonArchive.objects.get().matches, 1)
+        self.assertTrue(Fixture.objects.filter(season=self.old).exists())
+        
+        call_command('archive_season', str(self.old.pk), '--purge', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('archive_season', str(self.old.pk), stdout=StringIO())
+
+
+@override_settings(STANDINGS_CHECKPOINT_MATCHES=2)
+class StandingsAsOfTestCase(TestCase):
+    """Test tables as of a past date, replayed from checkpoints"""
+    
+    SCORES = [(2, 0), (1, 1), (0, 3), (2, 2), (1, 0), (0, 1), (4, 1), (1, 1)]
+    
+    def setUp(self):
+        self.clubs = [Club.objects.create(name=f"Team {letter}") for letter in "ABCD"]
+        self.players = [Player.objects.create(first_name="Sam", last_name=f"Player {club.name}", position="DEF", club=club)
+                        for club in self.clubs]
+        self.first_day = date(2025, 10, 5)
+        # Two matches every Sunday; each match day's table is recorded as results come in
+        self.expected = {}
+        self.results = []
+        for number, (team1_goals, team2_goals) in enumerate(self.SCORES):
+            home, away = self.clubs[number % 4], self.clubs[(number + 1 + number // 4) % 4]
+            day = self.first_day + timedelta(weeks=number // 2)
+            with self.captureOnCommitCallbacks(execute=True):
+                result = MatchResult.objects.create(
+                    fixture=Fixture.objects.create(team1=home, team2=away,
+                                                   date=timezone.make_aware(datetime.combine(day, time(6, number % 2)))),
+                    team1_goals=team1_goals, team2_goals=team2_goals,
+                )
+                if number % 3 == 0:
+                    Booking.objects.create(match=result, player=self.players[number % 4], card_type='yellow', minute=10)
+            self.results.append(result)
+            self.season = result.season_id
+            self.expected[day] = self.table(build_table_data(self.season))
+    
+    def table(self, table_data):
+        return [(row['club'].name, row['points'], row['goal_difference'], row['total_cards'], row['form'])
+                for row in table_data]
+    
+    def as_of(self, day):
+        return self.table(standings_as_of(self.season, parse_until(day.isoformat())))
+    
+    def test_matches_the_table_recomputed_at_each_date(self):
+        for day, table in self.expected.items():
+            self.assertEqual(self.as_of(day), table)
+        self.assertEqual(self.as_of(self.first_day - timedelta(days=1)), [])
+        self.assertEqual(StandingsCheckpoint.objects.filter(season=self.season).count(), len(self.SCORES) // 2)
+        
+        # Whatever the date, a table costs the same few queries once checkpoints exist
+        for day in (self.first_day, max(self.expected)):
+            with self.assertNumQueries(4):
+                standings_as_of(self.season, parse_until(f"{day.isoformat()}T06:01:00"))
+    
+    def test_edits_replace_stale_checkpoints(self):
+        self.as_of(max(self.expected))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.results[2].team1_goals = 5
+            self.results[2].save()
+        self.assertEqual(StandingsCheckpoint.objects.filter(season=self.season).count(), 1)
+        self.assertEqual(self.as_of(max(self.expected)), self.table(build_table_data(self.season)))
+        
+        self.players[0].club = self.clubs[1]
+        self.players[0].save()
+        self.assertFalse(StandingsCheckpoint.objects.exists())
+    
+    def test_endpoint_and_page(self):
+        day = self.first_day + timedelta(weeks=1)
+        data = self.client.get('/api/table/as-of/', {'date': day.isoformat()}).json()
+        self.assertEqual(data['season'], self.season)
+        self.assertEqual([(row['name'], row['points']) for row in data['rows']],
+                         [(name, points) for name, points, *_rest in self.expected[day]])
+        self.assertEqual(data['summary']['total_matches'], 4)
+        self.assertEqual(self.client.get('/api/table/as-of/', {'date': '2025-13-01'}).status_code, 400)
+        
+        response = self.client.get('/table/', {'season': self.season, 'date': day.isoformat()})
+        self.assertEqual(self.table(response.context['table_data']), self.expected[day])
+        self.assertContains(response, "Standings as of 12 October 2025")
@@ -0,0 +1,84 @@
+"""
+Write transactions for SQLite deployments.
+
+SQLite has one write lock. A transaction that reads and then writes has to
+upgrade its read lock, which in WAL mode fails at once when another writer
+got there first, instead of waiting busy_timeout. write_transaction()
+begins IMMEDIATE, taking the write lock up front; every other transaction
+stays DEFERRED, so reads (page views, job claiming, checkpoint lookups)
+never queue for the lock.
+"""
+import time
+from contextlib import contextmanager
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.urls import URLPattern, URLResolver
+
+
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+@contextmanager
+def write_transaction(using=None):
+    """transaction.atomic() for blocks that write; the outermost one takes SQLite's write lock as it begins"""
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # The mode is read from the settings when a connection opens, so open it
+    # first; it only matters for the BEGIN that atomic() issues on entry
+    connection.ensure_connection()
+    mode = connection.transaction_mode
+    connection.transaction_mode = 'IMMEDIATE'
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
+
+
+def serialized_writes(view):
+    """
+    Run a sync view's write requests in one write_transaction(), as
+    ATOMIC_REQUESTS would, and run them again after a short back-off when
+    the lock still cannot be had within busy_timeout, up to
+    SQLITE_WRITE_RETRIES times. Reads and coroutine views are left alone.
+    """
+    if iscoroutinefunction(view):
+        return view
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in WRITE_METHODS:
+            return view(request, *args, **kwargs)
+        retries = settings.SQLITE_WRITE_RETRIES
+        for attempt in range(retries + 1):
+            try:
+                with write_transaction():
+                    return view(request, *args, **kwargs)
+            except OperationalError as error:
+                if 'locked' not in str(error) or attempt == retries:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+
+    return wrapper
+
+
+def serialize_writes(urlpatterns):
+    """
+    Apply serialized_writes() to every view in a URLconf, included ones and
+    the admin's too, when the database is SQLite. Returns the patterns.
+    """
+    if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+        return urlpatterns
+    for pattern in urlpatterns:
+        if isinstance(pattern, URLResolver):
+            serialize_writes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            pattern.callback = serialized_writes(pattern.callback)
+    return urlpatterns
@@ -12,6 +12,7 @@ urlpatterns = [
     path('clubs/', views.ClubListView.as_view(), name='clubs'),
     path('players/list/', views.PlayerListView.as_view(), name='players'),
     path('statistics/', views.StatisticsView.as_view(), name='statistics'),
+    path('logos/<int:size>/<str:extension>/<path:name>', views.club_logo, name='club_logo'),
     
     # Authentication URLs
     path('login/', views.LoginPageView.as_view(), name='login'),
@@ -20,6 +21,15 @@ urlpatterns = [
     # API endpoints for dynamic forms
     path('api/fixture/<int:fixture_id>/players/', views.get_fixture_players, name='fixture_players_api'),
     path('api/club/<int:club_id>/players/', views.get_club_players, name='club_players_api'),
+    path('api/players/autocomplete/', views.player_autocomplete, name='player_autocomplete_api'),
     path('api/validate-form/', views.validate_form_data, name='validate_form_api'),
+    path('api/table/', views.get_standings, name='table_api'),
+    path('api/table/as-of/', views.get_standings_as_of, name='table_as_of_api'),
+    path('api/search/', views.search_api, name='search_api'),
+    path('api/fixtures/', views.get_fixture_timeline, name='fixture_timeline_api'),
+    
+    # Live updates (server-sent events)
+    path('live/', views.live_events, name='live_events'),
+    path('live/fixture/<int:fixture_id>/', views.live_events, name='live_fixture_events'),
     
 ]
@@ -2,12 +2,14 @@ from django.db import models
 from django.utils import timezone
 from collections import defaultdict
 import random
+from .aggregates import current_season
 from .models import Club, MatchResult, Goal, Booking
 
 
-def calculate_table():
+def calculate_table(season=None):
     """
-    Calculate league table with proper tiebreaker logic:
+    Calculate a season's league table (the current season's by default) with
+    proper tiebreaker logic:
     1. Points (3 for win, 1 for draw, 0 for loss)
     2. Goal difference
     3. Goals scored
@@ -34,8 +36,11 @@ def calculate_table():
         'total_cards': 0,
     })
     
-    # Get all completed match results
-    completed_results = MatchResult.objects.select_related('fixture__team1', 'fixture__team2')
+    if season is None:
+        season = current_season()
+    
+    # Get the season's completed match results
+    completed_results = MatchResult.objects.filter(season=season).select_related('fixture__team1', 'fixture__team2')
     
     # Loop through completed match results
     for result in completed_results:
@@ -83,7 +88,7 @@ def calculate_table():
         )
     
     # Calculate disciplinary points (yellow=1, red=3)
-    bookings = Booking.objects.select_related('match__fixture__team1', 'match__fixture__team2', 'player__club')
+    bookings = Booking.objects.filter(match__season=season).select_related('player__club')
     
     for booking in bookings:
         club = booking.player.club
@@ -101,7 +106,7 @@ def calculate_table():
             table_data.append(stats)
     
     # Sort using tiebreaker logic
-    sorted_table = apply_tiebreakers(table_data)
+    sorted_table = apply_tiebreakers(table_data, season)
     
     # Add position
     for i, club_data in enumerate(sorted_table, 1):
@@ -110,7 +115,7 @@ def calculate_table():
     return sorted_table
 
 
-def apply_tiebreakers(table_data):
+def apply_tiebreakers(table_data, season):
     """
     Apply comprehensive tiebreaker logic to league table
     """
@@ -128,7 +133,7 @@ def apply_tiebreakers(table_data):
         goals_for = club_data['goals_for']
         
         # Quaternary: Head-to-head record
-        h2h_points, h2h_gd = get_head_to_head_record(club, table_data)
+        h2h_points, h2h_gd = get_head_to_head_record(club, table_data, season)
         
         # Quinary: Fewer disciplinary points (ascending)
         disciplinary_points = club_data['total_cards']
@@ -142,9 +147,9 @@ def apply_tiebreakers(table_data):
     return sorted(table_data, key=tiebreaker_key)
 
 
-def get_head_to_head_record(club, table_data):
+def get_head_to_head_record(club, table_data, season):
     """
-    Calculate head-to-head record for a specific club
+    Calculate head-to-head record for a specific club within a season
     Returns (points, goal_difference)
     """
     home_wins = 0
@@ -163,7 +168,7 @@ def get_head_to_head_record(club, table_data):
         # Get results where these two teams played each other
         from .models import MatchResult, Fixture
         
-        h2h_results = MatchResult.objects.filter(
+        h2h_results = MatchResult.objects.filter(season=season).filter(
             models.Q(fixture__team1=club, fixture__team2=opponent) |
             models.Q(fixture__team1=opponent, fixture__team2=club)
         ).select_related('fixture')
@@ -195,12 +200,12 @@ def get_head_to_head_record(club, table_data):
     return total_points, total_goal_diff
 
 
-def get_recent_form(club, num_matches=5):
+def get_recent_form(club, season, num_matches=5):
     """
-    Get recent form for a club (last N matches)
+    Get recent form for a club (last N matches of the season)
     Returns a string like "WWDLW" or "DDLWL" showing only actual matches played
     """
-    recent_results = MatchResult.objects.filter(
+    recent_results = MatchResult.objects.filter(season=season).filter(
         models.Q(fixture__team1=club) | models.Q(fixture__team2=club)
     ).select_related('fixture').order_by('-fixture__date')[:num_matches]
     
@@ -236,3 +241,27 @@ def get_club_statistics(club_data):
         'avg_conceded_per_match': round(club_data['goals_against'] / max(club_data['matches_played'], 1), 2),
         'win_percentage': round((club_data['wins'] / max(club_data['matches_played'], 1)) * 100, 1),
     }
+
+
+def get_season_summary(table_data):
+    """
+    League-wide totals and leaders for the table page, computed once instead
+    of in template loops
+    """
+    return {
+        'total_clubs': len(table_data),
+        'total_matches': sum(club_data['matches_played'] for club_data in table_data) // 2,
+        'total_goals': sum(club_data['goals_for'] for club_data in table_data),
+        'most_points': max((club_data['points'] for club_data in table_data), default=0),
+        'best_goal_difference': max((club_data['goal_difference'] for club_data in table_data), default=0),
+        'fewest_cards': min((club_data['total_cards'] for club_data in table_data), default=0),
+    }
+
+
+def build_table_data(season):
+    """A season's league table rows with recent form and per-match averages, as shown on the table page"""
+    table_data = calculate_table(season)
+    for club_data in table_data:
+        club_data['form'] = get_recent_form(club_data['club'], season)
+        club_data.update(get_club_statistics(club_data))
+    return table_data
@@ -0,0 +1,167 @@
+import hashlib
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from .models import Club, Player, Fixture, DataVersion
+
+
+def version_label(item):
+    """DataVersion name of a model, or a label as given (see season_label)"""
+    return item if isinstance(item, str) else item._meta.label_lower
+
+
+def season_label(season):
+    """DataVersion name counting changes to one season's fixtures, results, goals and bookings"""
+    return f'matches.season:{season}'
+
+
+def bump_versions(*models):
+    """
+    Record that rows of these models (or a season, by its label) changed.
+    Called from model signals, and explicitly after bulk writes that bypass
+    them.
+    """
+    now = timezone.now()
+    for model in models:
+        label = version_label(model)
+        updated = DataVersion.objects.filter(name=label).update(version=F('version') + 1, updated_at=now)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    DataVersion.objects.create(name=label, version=1, updated_at=now)
+            except IntegrityError:
+                # Created concurrently by another request
+                DataVersion.objects.filter(name=label).update(version=F('version') + 1, updated_at=now)
+
+
+def _version_rows(models):
+    labels = [version_label(model) for model in models]
+    return DataVersion.objects.filter(name__in=labels).values_list('name', 'version', 'updated_at')
+
+
+def get_versions(models):
+    """Return {label: (version, updated_at)} for the given models and labels in one query"""
+    return {name: (version, updated_at) for name, version, updated_at in _version_rows(models)}
+
+
+async def aget_versions(models):
+    return {name: (version, updated_at) async for name, version, updated_at in _version_rows(models)}
+
+
+def versions_token(versions):
+    """Short token that changes whenever any of the given versions does"""
+    parts = [f"{name}:{version}" for name, (version, _updated_at) in sorted(versions.items())]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+
+def row_version(values):
+    """Digest of the values a template fragment displays, used as its cache key version"""
+    return hashlib.sha1(repr(values).encode()).hexdigest()
+
+
+def table_row_version(club_data):
+    """Version of a league table row; changes only when something shown in that row does"""
+    club = club_data['club']
+    shown = {key: value for key, value in club_data.items() if key not in ('club', 'row_version')}
+    return row_version((club.pk, club.name, club.logo.name, sorted(shown.items())))
+
+
+def fixture_card_version(fixture, versions):
+    """
+    Version of a fixture card: the fixture's and its result's last change
+    (results are touched when their goals or bookings change), plus the club
+    and player versions for names and logos shown on the card.
+    """
+    result = getattr(fixture, 'result', None)
+    return '-'.join(str(part) for part in (
+        fixture.updated_at.timestamp(),
+        result.updated_at.timestamp() if result else None,
+        versions.get(Club._meta.label_lower, (0, None))[0],
+        versions.get(Player._meta.label_lower, (0, None))[0],
+    ))
+
+
+def kickoff_marks(now=None):
+    """
+    The latest kick-off that has passed and the next one to come.
+
+    Pages that split fixtures into upcoming and past change when a kick-off
+    passes even though no data changed; these two index lookups capture that.
+    """
+    now = now or timezone.now()
+    previous = Fixture.objects.filter(date__lt=now).order_by('-date').values_list('date', flat=True).first()
+    upcoming = Fixture.objects.filter(date__gte=now).order_by('date').values_list('date', flat=True).first()
+    return previous, upcoming
+
+
+class ConditionalPageMixin:
+    """
+    Answer GET and HEAD requests with 304 Not Modified when the data a page is
+    built from has not changed since the client last fetched it.
+
+    Views list the models they read in `depends_on`; views that depend on the
+    clock (upcoming vs past fixtures) set `time_sensitive`. The ETag and
+    Last-Modified headers are derived from those versions before the view
+    runs, so an unchanged page costs one or two small queries and no
+    rendering.
+    """
+    depends_on = ()
+    time_sensitive = False
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or self._has_pending_messages(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.headers.setdefault('ETag', etag)
+                if last_modified:
+                    response.headers.setdefault('Last-Modified', http_date(last_modified))
+        self.patch_caching_headers(request, response)
+        return response
+
+    @staticmethod
+    def _has_pending_messages(request):
+        # Flash messages are shown once, so those pages must be rendered
+        return bool(len(messages.get_messages(request)))
+
+    def get_depends_on(self):
+        """Models and version labels the page is built from; season pages add their season's label"""
+        return self.depends_on
+
+    def get_validators(self, request):
+        """Return (etag, last_modified timestamp) for this request"""
+        depends_on = self.get_depends_on()
+        versions = get_versions(depends_on)
+        parts = [request.get_full_path(), str(request.user.pk or '')]
+        parts += [f"{name}:{versions.get(name, (0, None))[0]}" for name in sorted(
+            version_label(model) for model in depends_on
+        )]
+        changed = [updated_at for _version, updated_at in versions.values()]
+        if self.time_sensitive:
+            previous, upcoming = kickoff_marks()
+            parts += [str(previous), str(upcoming)]
+            if previous:
+                changed.append(previous)
+
+        etag = quote_etag(hashlib.sha1('|'.join(parts).encode()).hexdigest())
+        last_modified = int(max(changed).timestamp()) if changed else None
+        return etag, last_modified
+
+    def patch_caching_headers(self, request, response):
+        # Pages vary on login state (navigation, admin links)
+        patch_vary_headers(response, ['Cookie'])
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        else:
+            patch_cache_control(
+                response, public=True, max_age=0, must_revalidate=True,
+                s_maxage=settings.PAGE_PROXY_MAX_AGE,
+            )
@@ -1,42 +1,88 @@
-from django.shortcuts import render, get_object_or_404, redirect
-from django.contrib import messages
-from django.contrib.auth.forms import AuthenticationForm
-from django.contrib.auth.models import User
-from django.contrib.auth.views import LoginView, LogoutView
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.contrib.auth.decorators import login_required
-from django.views.generic import TemplateView, ListView, DetailView, CreateView
+from django.shortcuts import aget_object_or_404
+from django.conf import settings
+from django.contrib.auth.views import LoginView
+from django.views.generic import TemplateView, ListView, DetailView
 from django.utils import timezone
-from django.db.models import Q, Count
-from django.db import models
-from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.db.models import Q
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
-from .models import Club, Player, Fixture, MatchResult, Booking, Goal
-from .forms import (
-    FixtureForm, MatchResultForm, DynamicMatchResultForm, 
-    ClubForm, PlayerForm
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from .models import Club, Player, Season, SeasonArchive, Fixture, MatchResult, Booking, Goal, PlayerSeasonStats, DisciplinaryRecord
+from .utils import build_table_data, calculate_table, get_season_summary
+from .aggregates import acurrent_season, club_discipline, current_season, current_season_subquery, leaderboard
+from .assets import IMMUTABLE
+from .standings import (
+    astandings_version, remember_standings, serialize_row, standings_depends_on, standings_diff, standings_version,
 )
-from .utils import calculate_table, get_recent_form, get_club_statistics
+from .suspensions import asuspended_player_ids, suspended_player_ids
+from .versioning import ConditionalPageMixin, fixture_card_version, get_versions, season_label, table_row_version
 
+# Archives, past tables, search, live events, logos and autocomplete are
+# imported by the views that use them, so a worker boots without them
 
-class HomeView(TemplateView):
+
+def selected_season(request):
+    """The season picked with ?season=<id>, else the current one; None before any season exists"""
+    # The archive's snapshot is only loaded when a page is rendered
+    seasons = Season.objects.select_related('competition', 'archive').defer('archive__data')
+    season_id = request.GET.get('season', '')
+    season = seasons.filter(pk=season_id).first() if season_id.isdigit() else None
+    if season is None:
+        season = seasons.filter(pk=current_season_subquery()).first()
+    return season
+
+
+class SeasonPageMixin:
+    """Pages about one season; `self.season` is resolved before the conditional GET check"""
+    
+    def dispatch(self, request, *args, **kwargs):
+        self.season = selected_season(request)
+        return super().dispatch(request, *args, **kwargs)
+    
+    @property
+    def season_id(self):
+        return self.season.pk if self.season else None
+    
+    def get_snapshot(self):
+        """The season's archived snapshot, or None while the season is live"""
+        from .archive import load_snapshot, season_archive
+        archive = season_archive(self.season) if self.season else None
+        return load_snapshot(archive) if archive else None
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'season': self.season,
+            'seasons': Season.objects.select_related('competition'),
+            'season_title': str(self.season) if self.season else settings.LEAGUE_NAME,
+        })
+        return context
+
+
+class HomeView(SeasonPageMixin, ConditionalPageMixin, TemplateView):
     """Home page with links to main sections"""
     template_name = 'matches/home.html'
+    depends_on = (Club, Season, Fixture, MatchResult, Goal)
+    time_sensitive = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
+        season = self.season_id
+        
         # Get upcoming fixtures (only those without results) in chronological order
         upcoming_fixtures = Fixture.objects.filter(
-            date__gte=timezone.now()
+            season=season, date__gte=timezone.now()
         ).exclude(
             result__isnull=False
         ).select_related('team1', 'team2').order_by('date')[:5]
         
         # Get latest results
         recent_results = MatchResult.objects.filter(
+            season=season
         ).select_related(
             'fixture__team1', 'fixture__team2'
         ).order_by('-fixture__date')[:5]
@@ -45,10 +91,11 @@ class HomeView(TemplateView):
         from .models import Club, Goal, Booking
         from django.db.models import Count, Sum
         
+        # Totals and progress of the season
         total_clubs = Club.objects.count()
-        total_matches_played = MatchResult.objects.count()
-        total_goals_scored = Goal.objects.count()
-        total_fixtures = Fixture.objects.count()
+        total_matches_played = MatchResult.objects.filter(season=season).count()
+        total_goals_scored = Goal.objects.filter(match__season=season).count()
+        total_fixtures = Fixture.objects.filter(season=season).count()
         
         # Calculate season progress (matches played vs total fixtures)
         season_progress = 0
@@ -66,36 +113,53 @@ class HomeView(TemplateView):
         return context
 
 
-class TableView(TemplateView):
-    """Display league table with standings"""
+class TableView(SeasonPageMixin, ConditionalPageMixin, TemplateView):
+    """Display a season's league table with standings"""
     template_name = 'matches/league_table.html'
     
+    def get_depends_on(self):
+        return standings_depends_on(self.season_id)
+    
     def get_context_data(self, **kwargs):
+        from .archive import archived_table
+        from .history import parse_until, standings_as_of
         context = super().get_context_data(**kwargs)
-        table_data = calculate_table()
-        
-        # Add form data for each club
+        # Read the version first so the page is never older than the version it reports
+        version = standings_version(self.season_id)
+        snapshot = self.get_snapshot()
+        until = parse_until(self.request.GET.get('date', ''))
+        if until is not None:
+            # The table as it stood at the end of that day
+            table_data = standings_as_of(self.season_id, until, snapshot)
+        elif snapshot:
+            table_data = archived_table(snapshot)
+        else:
+            table_data = build_table_data(self.season_id)
+            remember_standings(self.season_id, version, table_data)
         for club_data in table_data:
-            club = club_data['club']
-            club_data['form'] = get_recent_form(club)
-            club_data.update(get_club_statistics(club_data))
+            club_data['row_version'] = table_row_version(club_data)
         
         context.update({
             'table_data': table_data,
-            'season_title': 'Wasl Village Premier League Season 3 - 2025',
+            'summary': get_season_summary(table_data),
+            'standings_version': version,
+            'as_of': timezone.localtime(until - timedelta(microseconds=1)).date() if until else None,
+            'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
         })
         return context
 
 
-class FixtureListView(ListView):
-    """List all fixtures, both upcoming and past"""
+class FixtureListView(SeasonPageMixin, ConditionalPageMixin, ListView):
+    """List a season's fixtures, both upcoming and past"""
     model = Fixture
     template_name = 'matches/fixtures.html'
     context_object_name = 'fixtures'
     paginate_by = 20
+    depends_on = (Club, Season, SeasonArchive, Fixture, MatchResult, Goal, Booking)
+    time_sensitive = True
     
     def get_queryset(self):
-        queryset = Fixture.objects.select_related(
+        queryset = Fixture.objects.filter(season=self.season_id).select_related(
             'team1', 'team2', 'result'
         )
         
@@ -122,29 +186,36 @@ class FixtureListView(ListView):
         
         # Upcoming fixtures (chronological order - earliest first)
         upcoming_fixtures = Fixture.objects.filter(
-            date__gte=now
+            season=self.season_id, date__gte=now
         ).exclude(
             result__isnull=False
         ).select_related('team1', 'team2').order_by('date')
         
         # Past fixtures (reverse chronological order - most recent first)
         past_fixtures = Fixture.objects.filter(
-            date__lt=now
+            season=self.season_id, date__lt=now
         ).select_related('team1', 'team2', 'result').order_by('-date')
         
+        # Cards are cached per fixture; goals and bookings are only loaded on a miss
+        versions = get_versions([Club, Player])
+        for fixture in context['fixtures']:
+            fixture.card_version = fixture_card_version(fixture, versions)
+        
         context.update({
             'filter': self.request.GET.get('filter', 'all'),
             'upcoming_fixtures': upcoming_fixtures,
             'past_fixtures': past_fixtures,
+            'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
         })
         return context
 
 
-class MatchDetailView(DetailView):
+class MatchDetailView(ConditionalPageMixin, DetailView):
     """Display detailed match information including result, goals, and bookings"""
     model = MatchResult
     template_name = 'matches/match_detail.html'
     context_object_name = 'match'
+    depends_on = (Club, Player, Fixture, MatchResult, Goal, Booking)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -211,11 +282,12 @@ class LoginPageView(LoginView):
         return '/'
 
 
-class ClubListView(ListView):
+class ClubListView(ConditionalPageMixin, ListView):
     """List all clubs with basic information"""
     model = Club
     template_name = 'matches/clubs.html'
     context_object_name = 'clubs'
+    depends_on = (Club, Player)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -232,14 +304,16 @@ class ClubListView(ListView):
         return context
 
 
-class PlayerListView(ListView):
+class PlayerListView(ConditionalPageMixin, ListView):
     """List all players with filtering options"""
     model = Player
     template_name = 'matches/players.html'
     context_object_name = 'players'
     paginate_by = 50
+    depends_on = (Club, Player, DisciplinaryRecord)
     
     def get_queryset(self):
+        from .search import matching_ids, search_terms
         queryset = Player.objects.select_related('club', 'club__manager', 'club__captain')
         
         # Filter by club
@@ -252,6 +326,18 @@ class PlayerListView(ListView):
         if position:
             queryset = queryset.filter(position=position)
         
+        # Search by name or club, through the search index where there is one
+        query = self.request.GET.get('q', '').strip()
+        if query:
+            ids = matching_ids('player', query)
+            if ids is not None:
+                queryset = queryset.filter(pk__in=ids)
+            else:
+                for term in search_terms(query):
+                    queryset = queryset.filter(
+                        Q(first_name__istartswith=term) | Q(last_name__istartswith=term) | Q(club__name__istartswith=term)
+                    )
+        
         return queryset.order_by('club', 'position', 'last_name')
     
     def get_context_data(self, **kwargs):
@@ -260,40 +346,52 @@ class PlayerListView(ListView):
         # Add clubs for filter dropdown
         context['clubs'] = Club.objects.all().order_by('name')
         context['positions'] = Player.POSITION_CHOICES
+        context['suspended_ids'] = suspended_player_ids(
+            current_season(), [player.id for player in context['players']]
+        )
         context.update({
             'selected_club': self.request.GET.get('club'),
             'selected_position': self.request.GET.get('position'),
+            'search_query': self.request.GET.get('q', ''),
         })
         
         return context
 
 
-class StatisticsView(TemplateView):
-    """Display league statistics and insights"""
+class StatisticsView(SeasonPageMixin, ConditionalPageMixin, TemplateView):
+    """Display a season's statistics and insights"""
     template_name = 'matches/statistics.html'
     
+    def get_depends_on(self):
+        return (Club, Player, Season, SeasonArchive, PlayerSeasonStats, season_label(self.season_id))
+    
     def get_context_data(self, **kwargs):
+        from .archive import archived_table
         context = super().get_context_data(**kwargs)
         
-        table_data = calculate_table()
+        season = self.season_id
+        snapshot = self.get_snapshot()
+        table_data = archived_table(snapshot) if snapshot else calculate_table(season)
         
         # Calculate league-wide statistics
         total_matches = sum([club['matches_played'] for club in table_data])
         total_goals = sum([club['goals_for'] for club in table_data])
         avg_goals_per_match = round(total_goals / max(total_matches, 1), 2)
         
-        # Top goalscorers
-        top_scorers = Goal.objects.values('scorer__first_name', 'scorer__last_name', 'scorer__club__name').annotate(
-            goals_count=Count('id')
-        ).order_by('-goals_count')[:10]
-        
-        # Most disciplinary points
-        booking_stats = Booking.objects.values('player__club__name').annotate(
-            yellow_cards=Count('id', filter=Q(card_type='yellow')),
-            red_cards=Count('id', filter=Q(card_type='red')),
-            total_cards=Count('id', filter=Q(card_type='yellow')) + 
-                      Count('id', filter=Q(card_type='red')) * 3
-        ).order_by('-total_cards')[:10]
+        if snapshot:
+            # Finished seasons are read from their archive
+            top_scorers = snapshot['leaderboards']['goals']
+            top_assists = snapshot['leaderboards']['assists']
+            top_motm = snapshot['leaderboards']['motm_awards']
+            booking_stats = snapshot['discipline']
+        else:
+            # Player leaderboards, read from the per-season stats table
+            top_scorers = leaderboard(season, 'goals')
+            top_assists = leaderboard(season, 'assists')
+            top_motm = leaderboard(season, 'motm_awards')
+            
+            # Most disciplinary points
+            booking_stats = club_discipline(season)
         
         context.update({
             'total_clubs': len(table_data),
@@ -301,6 +399,8 @@ class StatisticsView(TemplateView):
             'total_goals': total_goals,
             'avg_goals_per_match': avg_goals_per_match,
             'top_scorers': top_scorers,
+            'top_assists': top_assists,
+            'top_motm': top_motm,
             'most_disciplined': booking_stats,
             'table_data': table_data,
         })
@@ -309,60 +409,247 @@ class StatisticsView(TemplateView):
 
 
 # API endpoints for dynamic form functionality
-def get_fixture_players(request, fixture_id):
+async def get_fixture_players(request, fixture_id):
     """API endpoint to get players for a specific fixture"""
     try:
-        fixture = get_object_or_404(Fixture, id=fixture_id)
-        
-        # Get players for both teams
-        team1_players = Player.objects.filter(club=fixture.team1).values(
-            'id', 'first_name', 'last_name', 'position'
-        ).order_by('first_name', 'last_name')
-        
-        team2_players = Player.objects.filter(club=fixture.team2).values(
-            'id', 'first_name', 'last_name', 'position'
-        ).order_by('first_name', 'last_name')
+        fixture = await aget_object_or_404(Fixture.objects.select_related('team1', 'team2'), id=fixture_id)
         
-        # Combine all players for general dropdowns
-        all_players = Player.objects.filter(
-            Q(club=fixture.team1) | Q(club=fixture.team2)
+        # Both squads in one query, split by club
+        players = Player.objects.filter(
+            club_id__in=[fixture.team1_id, fixture.team2_id]
         ).values(
-            'id', 'first_name', 'last_name', 'position', 'club__name'
+            'id', 'first_name', 'last_name', 'position', 'club_id', 'club__name'
         ).order_by('first_name', 'last_name')
         
+        # Flag players serving a ban so the squad dropdowns can show it
+        suspended = await asuspended_player_ids(fixture.season_id)
+        all_players = []
+        team1_players, team2_players = [], []
+        async for player in players:
+            club_id = player.pop('club_id')
+            player['suspended'] = player['id'] in suspended
+            all_players.append(player)
+            squad_player = {key: value for key, value in player.items() if key != 'club__name'}
+            (team1_players if club_id == fixture.team1_id else team2_players).append(squad_player)
+        
         return JsonResponse({
             'team1': {
                 'name': fixture.team1.name,
-                'players': list(team1_players)
+                'players': team1_players
             },
             'team2': {
                 'name': fixture.team2.name,
-                'players': list(team2_players)
+                'players': team2_players
             },
-            'all_players': list(all_players)
+            'all_players': all_players
         })
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
 
-def get_club_players(request, club_id):
+async def get_club_players(request, club_id):
     """API endpoint to get players for a specific club"""
     try:
-        club = get_object_or_404(Club, id=club_id)
+        club = await aget_object_or_404(Club, id=club_id)
         players = Player.objects.filter(club=club).values(
             'id', 'first_name', 'last_name', 'position'
         ).order_by('first_name', 'last_name')
         
+        suspended = await asuspended_player_ids(await acurrent_season())
+        
         return JsonResponse({
             'club_name': club.name,
-            'players': list(players)
+            'players': [dict(player, suspended=player['id'] in suspended) async for player in players]
         })
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=400)
 
 
+async def player_autocomplete(request):
+    """Typeahead for scorer and booking fields: players whose name starts with the text typed so far"""
+    from .autocomplete import player_index
+    query = request.GET.get('q', '')[:100]
+    club_ids = request.GET.getlist('club')
+    if not all(club_id.isdigit() for club_id in club_ids):
+        return JsonResponse({'error': 'Invalid club'}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    if player_index.is_due():
+        await sync_to_async(player_index.refresh)()
+    players = player_index.lookup(query, [int(club_id) for club_id in club_ids] or None, limit)
+    return JsonResponse({'query': query, 'players': players})
+
+
+async def search_api(request):
+    """Typeahead: clubs, players and fixtures matching the words typed so far, best first"""
+    from .search import KINDS, search
+    query = request.GET.get('q', '')[:100]
+    kinds = request.GET.getlist('kind') or KINDS
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 25)
+    except ValueError:
+        limit = 10
+    results = await sync_to_async(search)(query, limit, kinds)
+    return JsonResponse({'query': query, 'results': results})
+
+
+async def get_standings(request):
+    """API endpoint returning a season's table rows changed since the client's version"""
+    since = request.GET.get('since')
+    season = request.GET.get('season', '')
+    if season and not season.isdigit():
+        return JsonResponse({'error': 'Invalid season'}, status=400)
+    season = int(season) if season else await acurrent_season()
+    version = await astandings_version(season)
+    if since == version:
+        return HttpResponseNotModified()
+    # Building the table is query and CPU heavy, so it runs in a worker thread
+    return JsonResponse(await sync_to_async(standings_diff)(season, since, version))
+
+
+async def get_standings_as_of(request):
+    """
+    API endpoint returning a season's table as it stood at the end of a day
+    (?date=YYYY-MM-DD) or just before a moment (an ISO date and time). The
+    season defaults to the league season covering the date.
+    """
+    from .archive import load_snapshot
+    from .history import parse_until, season_on, standings_as_of
+    until = parse_until(request.GET.get('date', ''))
+    if until is None:
+        return JsonResponse({'error': 'Invalid date'}, status=400)
+    season = request.GET.get('season', '')
+    if season and not season.isdigit():
+        return JsonResponse({'error': 'Invalid season'}, status=400)
+    day = timezone.localtime(until - timedelta(microseconds=1)).date()
+    season = int(season) if season else await sync_to_async(season_on)(day)
+    if season is None:
+        return JsonResponse({'error': 'No season covers that date'}, status=404)
+    
+    archive = await SeasonArchive.objects.filter(season_id=season, purged=True).afirst()
+    snapshot = load_snapshot(archive) if archive else None
+    table_data = await sync_to_async(standings_as_of)(season, until, snapshot)
+    return JsonResponse({
+        'season': season,
+        'until': until.isoformat(),
+        'rows': [serialize_row(club_data) for club_data in table_data],
+        'summary': get_season_summary(table_data),
+    })
+
+
+async def get_fixture_timeline(request):
+    """
+    API endpoint listing fixtures with their scores, upcoming or past,
+    optionally for one club or season. Archived seasons are listed from their
+    snapshot, with each match's goals and bookings.
+    """
+    from .archive import archived_matches, load_snapshot
+    now = timezone.now()
+    fixtures = Fixture.objects.select_related('team1', 'team2', 'result')
+    
+    season_id = request.GET.get('season')
+    archive = None
+    if season_id:
+        if not season_id.isdigit():
+            return JsonResponse({'error': 'Invalid season'}, status=400)
+        archive = await SeasonArchive.objects.filter(season_id=season_id).afirst()
+        fixtures = fixtures.filter(season_id=season_id)
+    
+    date_filter = request.GET.get('filter', 'all')
+    if date_filter == 'upcoming':
+        fixtures = fixtures.filter(date__gte=now, result__isnull=True).order_by('date')
+    elif date_filter == 'past':
+        fixtures = fixtures.filter(date__lt=now).order_by('-date')
+    else:
+        fixtures = fixtures.order_by('date')
+    
+    club_id = request.GET.get('club')
+    if club_id:
+        if not club_id.isdigit():
+            return JsonResponse({'error': 'Invalid club'}, status=400)
+        fixtures = fixtures.filter(Q(team1_id=club_id) | Q(team2_id=club_id))
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', 50)), 1), 200)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    
+    if archive is not None:
+        matches = archived_matches(load_snapshot(archive), date_filter, club_id and int(club_id), now)
+        return JsonResponse({'filter': date_filter, 'fixtures': matches[:limit]})
+    
+    timeline = []
+    async for fixture in fixtures[:limit]:
+        result = getattr(fixture, 'result', None)
+        timeline.append({
+            'id': fixture.id,
+            'date': fixture.date.isoformat(),
+            'venue': fixture.venue,
+            'team1': {'id': fixture.team1_id, 'name': fixture.team1.name},
+            'team2': {'id': fixture.team2_id, 'name': fixture.team2.name},
+            'result': {
+                'id': result.id,
+                'team1_goals': result.team1_goals,
+                'team2_goals': result.team2_goals,
+            } if result else None,
+        })
+    return JsonResponse({'filter': date_filter, 'fixtures': timeline})
+
+
+async def live_events(request, fixture_id=None):
+    """
+    Server-sent events stream of score, goal and booking updates for one
+    fixture, or for all fixtures. Async so that idle connections do not hold
+    a worker thread when served by the ASGI application.
+    """
+    from .live import event_stream
+    if fixture_id is not None and not await Fixture.objects.filter(pk=fixture_id).aexists():
+        raise Http404("Fixture not found")
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
+    
+    if 'wsgi.version' in request.META:
+        # A WSGI worker would be held for the whole stream, so send what is
+        # new and let the client's reconnects poll
+        stream = event_stream(fixture_id, last_event_id, follow=False)
+        response = HttpResponse(''.join([chunk async for chunk in stream]), content_type='text/event-stream')
+    else:
+        response = StreamingHttpResponse(
+            event_stream(fixture_id, last_event_id), content_type='text/event-stream'
+        )
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def club_logo(request, size, extension, name):
+    """
+    A club logo resized for display. Variants are written when the logo is
+    uploaded; one that is still missing is generated here and kept on disk.
+    """
+    from .logos import LOGO_FORMATS, LOGO_SIZES, generate_logo_variants, variant_name
+    if size not in LOGO_SIZES or extension not in LOGO_FORMATS or not Club.objects.filter(logo=name).exists():
+        raise Http404("Logo not found")
+    variant = variant_name(name, size, extension)
+    if not default_storage.exists(variant):
+        try:
+            generate_logo_variants(name)
+        except OSError:
+            # The original is missing or not an image Pillow can read
+            raise Http404("Logo not found")
+    response = FileResponse(default_storage.open(variant), content_type=LOGO_FORMATS[extension][2])
+    # Uploads never reuse a name, so a variant URL always means the same image
+    response['Cache-Control'] = IMMUTABLE
+    return response
+
+
 @csrf_exempt
 def validate_form_data(request):
     """API endpoint to validate form submission data on the server side"""
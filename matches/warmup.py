@@ -0,0 +1,139 @@
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.utils.http import urlencode
+from .models import Club, Player, Fixture, MatchResult, Booking, Goal, PlayerSeasonStats
+from .aggregates import current_season
+from .standings import standings_snapshot, standings_version
+from .versioning import get_versions, versions_token
+
+
+# Everything the public pages are built from
+PUBLIC_MODELS = (Club, Player, Fixture, MatchResult, Booking, Goal, PlayerSeasonStats)
+
+# Pages rendered by warm_caches, so their queries, templates and cached
+# fragments are warm before the first visitor arrives
+WARM_PAGES = [
+    ('home', {}),
+    ('table', {}),
+    ('statistics', {}),
+    ('fixtures', {}),
+    ('fixtures', {'filter': 'upcoming'}),
+    ('fixtures', {'filter': 'past'}),
+    ('clubs', {}),
+]
+
+# Cache key holding the data generation the caches were last warmed for
+WARM_KEY = 'warm:generation'
+
+# Cache backends that each process holds on its own
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def data_generation():
+    """Token that changes whenever any data shown on the public pages changes"""
+    return versions_token(get_versions(PUBLIC_MODELS))
+
+
+def shared_cache():
+    """Whether the default cache is shared by every process (memcached, Redis, database, files)"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def _warm_host():
+    """A host name the site accepts, for the internal requests"""
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
+
+
+def warm_caches():
+    """
+    Compute the current season's standings (with form) and render the
+    public pages once, so the league table, leaderboards and cached
+    fragments are ready for the current data, then record that generation
+    as warm.
+
+    Returns (generation, [(step, seconds)]).
+    """
+    # Read first, so the caches are never older than the generation recorded
+    generation = data_generation()
+    timings = []
+
+    started = time.perf_counter()
+    season = current_season()
+    standings_snapshot(season, standings_version(season))
+    timings.append(('standings', time.perf_counter() - started))
+
+    # The test client is the simplest in-process request runner, but its
+    # module is slow to import, so only warm-ups pay for it
+    from django.test import Client
+    client = Client(HTTP_HOST=_warm_host())
+    for name, params in WARM_PAGES:
+        path = reverse(f'matches:{name}') + (f"?{urlencode(params)}" if params else '')
+        started = time.perf_counter()
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        timings.append((path, time.perf_counter() - started))
+
+    cache.set(WARM_KEY, generation, settings.FRAGMENT_CACHE_TIMEOUT)
+    global _warmed_here
+    _warmed_here = generation
+    return generation, timings
+
+
+def readiness():
+    """
+    Whether the caches are warm; returns (ready, details).
+
+    With a shared cache, ready means warmed for the current data generation.
+    A local-memory cache belongs to one process and every save elsewhere
+    changes the generation, so there ready means this process (or the master
+    it was forked from) has warmed its caches once; later changes are
+    rebuilt as pages are requested.
+    """
+    generation = data_generation()
+    if shared_cache():
+        warmed = cache.get(WARM_KEY)
+        ready = warmed == generation
+    else:
+        warmed = _warmed_here
+        ready = warmed is not None
+    details = {'generation': generation, 'warmed': warmed, 'shared_cache': shared_cache()}
+    if _last_error:
+        details['error'] = _last_error
+    return ready, details
+
+
+_warming = threading.Lock()
+_last_error = None
+# Generation this process last warmed its caches for
+_warmed_here = None
+
+
+def warm_in_background():
+    """Start warming the caches in a thread, unless this process is already doing so"""
+    if not _warming.acquire(blocking=False):
+        return
+
+    def run():
+        global _last_error
+        try:
+            warm_caches()
+            _last_error = None
+        except Exception as error:
+            _last_error = str(error)
+        finally:
+            connection.close()
+            _warming.release()
+
+    threading.Thread(target=run, name='warm-caches', daemon=True).start()